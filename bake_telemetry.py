@@ -0,0 +1,294 @@
+"""
+Blender Python Animation: Bake and Render Telemetry
+Streams one JSON line per baked or rendered frame (timing, samples, memory, rigid bodies, rolling ETA)
+
+Each line is a JSON object, for example:
+    {"event": "frame", "phase": "bake", "frame": 42, "seconds": 0.31, "eta_seconds": 42.5, ...}
+
+The target is either a file path (lines are appended) or a local socket written as
+"unix:/tmp/telemetry.sock", so a job scheduler can watch a job while it is still running.
+
+Usage from the command line:
+    blender -b --python bake_telemetry.py -- dominoes --out telemetry.jsonl --render
+"""
+
+import json
+import os
+import socket
+import time
+from collections import deque
+
+import bpy
+from bpy.app.handlers import persistent
+
+# Stream currently receiving frame events, None when telemetry is off
+_active_stream = None
+
+def current_memory_mb():
+    """Resident memory of this Blender process in MB"""
+    try:
+        with open("/proc/self/statm") as f:
+            resident_pages = int(f.read().split()[1])
+        return resident_pages * os.sysconf("SC_PAGE_SIZE") / (1024 * 1024)
+    except (OSError, ValueError, IndexError):
+        # Not Linux: fall back to the peak resident size
+        import resource
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return peak / (1024 * 1024) if os.uname().sysname == "Darwin" else peak / 1024
+
+def render_samples(scene):
+    """Samples per pixel for the active render engine"""
+    if scene.render.engine == 'CYCLES':
+        return scene.cycles.samples
+    eevee = getattr(scene, "eevee", None)
+    return getattr(eevee, "taa_render_samples", None)
+
+def count_active_rigid_bodies(scene):
+    """Number of rigid bodies currently simulated (active and not kinematic)"""
+    world = scene.rigidbody_world
+    if not world or not world.collection:
+        return 0
+    count = 0
+    for obj in world.collection.objects:
+        body = obj.rigid_body
+        if body and body.type == 'ACTIVE' and not body.kinematic:
+            count += 1
+    return count
+
+class TelemetryStream:
+    """Writes frame events as JSON lines and keeps a rolling ETA"""
+
+    def __init__(self, target, job_id=None, window=12):
+        self.target = target
+        self.job_id = job_id
+        self.durations = deque(maxlen=window)  # Recent seconds per frame
+        self.phase = "idle"
+        self.frame_range = (0, 0)
+        self.last_time = None
+        self.render_started = None
+        self.render_stats = ""
+        self.file = None
+        self.sock = None
+        self._open()
+
+    def _open(self):
+        """Connect to a local socket or open the log file for appending"""
+        if self.target.startswith("unix:"):
+            self.sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+            self.sock.connect(self.target[len("unix:"):])
+        else:
+            path = bpy.path.abspath(self.target)
+            directory = os.path.dirname(path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            self.file = open(path, "a", buffering=1)
+
+    def close(self):
+        """Close the underlying file or socket"""
+        if self.file:
+            self.file.close()
+            self.file = None
+        if self.sock:
+            self.sock.close()
+            self.sock = None
+
+    def emit(self, record):
+        """Send one JSON line; telemetry must never break a bake or render"""
+        record.setdefault("time", round(time.time(), 3))
+        if self.job_id is not None:
+            record.setdefault("job", self.job_id)
+        line = json.dumps(record) + "\n"
+        try:
+            if self.file:
+                self.file.write(line)
+            elif self.sock:
+                self.sock.sendall(line.encode("utf-8"))
+        except OSError as error:
+            print(f"Telemetry: dropping stream ({error})")
+            self.close()
+
+    def begin_phase(self, phase, frame_start, frame_end):
+        """Reset timing for a new bake or render pass"""
+        self.phase = phase
+        self.frame_range = (frame_start, frame_end)
+        self.durations.clear()
+        self.last_time = time.perf_counter()
+        self.emit({"event": "start", "phase": phase, "frame_start": frame_start, "frame_end": frame_end})
+
+    def end_phase(self, status="done"):
+        """Report the end of the current pass"""
+        if self.phase != "idle":
+            self.emit({"event": status, "phase": self.phase, "memory_mb": round(current_memory_mb(), 1)})
+        self.phase = "idle"
+        self.last_time = None
+
+    def frame_done(self, scene, seconds):
+        """Record one finished frame and emit its telemetry line"""
+        self.durations.append(seconds)
+        frame = scene.frame_current
+        frame_start, frame_end = self.frame_range
+        remaining = max(frame_end - frame, 0) // max(scene.frame_step, 1)
+        average = sum(self.durations) / len(self.durations)
+        done = frame - frame_start + 1
+        total = max(frame_end - frame_start + 1, 1)
+        record = {
+            "event": "frame",
+            "phase": self.phase,
+            "frame": frame,
+            "seconds": round(seconds, 4),
+            "samples": render_samples(scene) if self.phase == "render" else None,
+            "memory_mb": round(current_memory_mb(), 1),
+            "active_rigid_bodies": count_active_rigid_bodies(scene),
+            "progress": round(min(max(done / total, 0.0), 1.0), 4),
+            "eta_seconds": round(average * remaining, 2),
+        }
+        if self.phase == "render" and self.render_stats:
+            record["render_stats"] = self.render_stats
+        self.emit(record)
+
+@persistent
+def _on_frame_change(scene, depsgraph=None):
+    """Handler: time bake/playback frames (render frames are timed by render_post)"""
+    stream = _active_stream
+    if stream is None or stream.phase in ("idle", "render") or stream.last_time is None:
+        return
+    now = time.perf_counter()
+    stream.frame_done(scene, now - stream.last_time)
+    stream.last_time = now
+
+@persistent
+def _on_render_pre(scene, depsgraph=None):
+    """Handler: a render frame is starting"""
+    stream = _active_stream
+    if stream is None:
+        return
+    if stream.phase != "render":
+        stream.begin_phase("render", scene.frame_start, scene.frame_end)
+    stream.render_started = time.perf_counter()
+
+@persistent
+def _on_render_post(scene, depsgraph=None):
+    """Handler: a render frame finished"""
+    stream = _active_stream
+    if stream is None or stream.render_started is None:
+        return
+    stream.frame_done(scene, time.perf_counter() - stream.render_started)
+    stream.render_started = None
+
+@persistent
+def _on_render_stats(stats):
+    """Handler: keep the latest render status line (samples, memory)"""
+    if _active_stream is not None:
+        _active_stream.render_stats = stats
+
+@persistent
+def _on_render_complete(scene, depsgraph=None):
+    """Handler: the whole render job finished"""
+    if _active_stream is not None and _active_stream.phase == "render":
+        _active_stream.end_phase("done")
+
+@persistent
+def _on_render_cancel(scene, depsgraph=None):
+    """Handler: the render job was cancelled"""
+    if _active_stream is not None and _active_stream.phase == "render":
+        _active_stream.end_phase("cancelled")
+
+def _on_phase(name, entering):
+    """Phase listener: follow the 'bake' phase marked in the animation scripts"""
+    stream = _active_stream
+    if stream is None or name != "bake":
+        return
+    if entering:
+        scene = bpy.context.scene
+        world = scene.rigidbody_world
+        if world and world.point_cache:
+            stream.begin_phase("bake", world.point_cache.frame_start, world.point_cache.frame_end)
+        else:
+            stream.begin_phase("bake", scene.frame_start, scene.frame_end)
+    else:
+        stream.end_phase("done")
+
+_HANDLERS = (
+    ("frame_change_post", _on_frame_change),
+    ("render_pre", _on_render_pre),
+    ("render_post", _on_render_post),
+    ("render_stats", _on_render_stats),
+    ("render_complete", _on_render_complete),
+    ("render_cancel", _on_render_cancel),
+)
+
+def start_telemetry(target, job_id=None, window=12):
+    """Register the telemetry handlers and start streaming to a file or socket"""
+    global _active_stream
+    stop_telemetry()
+    _active_stream = TelemetryStream(target, job_id=job_id, window=window)
+    for handler_name, handler in _HANDLERS:
+        getattr(bpy.app.handlers, handler_name).append(handler)
+    try:
+        import pipeline_profiler
+        pipeline_profiler.phase_listeners.append(_on_phase)
+    except ImportError:
+        pass
+    return _active_stream
+
+def stop_telemetry():
+    """Unregister the handlers and close the stream"""
+    global _active_stream
+    for handler_name, handler in _HANDLERS:
+        handlers = getattr(bpy.app.handlers, handler_name)
+        if handler in handlers:
+            handlers.remove(handler)
+    try:
+        import pipeline_profiler
+        if _on_phase in pipeline_profiler.phase_listeners:
+            pipeline_profiler.phase_listeners.remove(_on_phase)
+    except ImportError:
+        pass
+    if _active_stream is not None:
+        _active_stream.end_phase("stopped")
+        _active_stream.close()
+        _active_stream = None
+
+def bake_with_telemetry(scene=None):
+    """Bake all point caches while streaming per-frame progress"""
+    scene = scene or bpy.context.scene
+    stream = _active_stream
+    world = scene.rigidbody_world
+    if stream is not None:
+        if world and world.point_cache:
+            stream.begin_phase("bake", world.point_cache.frame_start, world.point_cache.frame_end)
+        else:
+            stream.begin_phase("bake", scene.frame_start, scene.frame_end)
+    try:
+        scene.frame_set(scene.frame_start)
+        bpy.ops.ptcache.bake_all(bake=True)
+    finally:
+        if stream is not None:
+            stream.end_phase("done")
+
+def main(argv=None):
+    """Command line entry: build a scenario and stream its bake (and render) telemetry"""
+    import argparse
+    import scenarios
+
+    parser = argparse.ArgumentParser(description="Stream bake/render telemetry as JSON lines")
+    parser.add_argument("scenario", choices=sorted(scenarios.SCENARIOS))
+    parser.add_argument("--out", default="telemetry.jsonl", help="File path or unix:/path/to/socket")
+    parser.add_argument("--job", default=None, help="Job id added to every line")
+    parser.add_argument("--render", action="store_true", help="Also render the animation")
+    args = parser.parse_args(scenarios.script_args() if argv is None else argv)
+
+    start_telemetry(args.out, job_id=args.job)
+    try:
+        scenarios.run_scenario(args.scenario)
+        if args.render:
+            bpy.ops.render.render(animation=True)
+    finally:
+        stop_telemetry()
+
+if __name__ == "__main__":
+    import sys
+    sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+    # Re-import so the phase listener sees the same module state as the scripts
+    import bake_telemetry
+    bake_telemetry.main()
@@ -0,0 +1,230 @@
+"""
+Blender Python Animation: Baked Transform Export
+Walks a baked simulation once and stores every rigid body's world transform in a memory-mapped NumPy array
+
+Layout of the .npy file: float32 array of shape (frames, objects, 10)
+    [:, :, 0:3]  location (x, y, z)
+    [:, :, 3:7]  rotation quaternion (w, x, y, z)
+    [:, :, 7:10] scale (x, y, z)
+A sidecar .json file holds the object names, frame range, fps and local bounding box half extents.
+
+Usage from the command line (on a saved, baked .blend or by building a scenario):
+    blender -b scene.blend --python baked_transforms.py -- --out transforms.npy
+    blender -b --python baked_transforms.py -- --scenario dominoes --out transforms.npy
+
+Reading outside Blender:
+    from baked_transforms import load_baked_transforms
+    transforms, index = load_baked_transforms("transforms.npy")
+    first_domino = transforms[:, index["names"].index("Domino_00")]
+"""
+
+import json
+import os
+
+import numpy as np
+
+try:
+    import bpy
+except ImportError:  # Loading and analysis work without Blender
+    bpy = None
+
+# Number of floats stored per object per frame
+TRANSFORM_WIDTH = 10
+TRANSFORM_LAYOUT = ["loc_x", "loc_y", "loc_z", "quat_w", "quat_x", "quat_y", "quat_z",
+                    "scale_x", "scale_y", "scale_z"]
+
+def rigid_body_objects(scene=None):
+    """All objects in the scene's rigid body world, sorted by name"""
+    scene = scene or bpy.context.scene
+    world = scene.rigidbody_world
+    if not world or not world.collection:
+        return []
+    return sorted(world.collection.objects, key=lambda obj: obj.name)
+
+def local_half_extents(objects):
+    """Half size of each object's local bounding box (before object scale)"""
+    extents = np.zeros((len(objects), 3), dtype=np.float32)
+    for i, obj in enumerate(objects):
+        corners = np.array([corner[:] for corner in obj.bound_box], dtype=np.float32)
+        extents[i] = (corners.max(axis=0) - corners.min(axis=0)) / 2
+    return extents
+
+def decompose_matrices(matrices):
+    """Split (N, 4, 4) row-major world matrices into location, quaternion (w, x, y, z) and scale"""
+    location = matrices[:, :3, 3]
+    basis = matrices[:, :3, :3]
+    scale = np.linalg.norm(basis, axis=1)
+    # Mirrored objects: carry the reflection on the X scale
+    scale[:, 0] *= np.where(np.linalg.det(basis) < 0, -1.0, 1.0)
+    rotation = basis / np.where(scale == 0, 1.0, scale)[:, None, :]
+    return location, matrix_to_quaternion(rotation), scale
+
+def matrix_to_quaternion(rotation):
+    """Convert (N, 3, 3) rotation matrices to (N, 4) quaternions (w, x, y, z)"""
+    m00, m01, m02 = rotation[:, 0, 0], rotation[:, 0, 1], rotation[:, 0, 2]
+    m10, m11, m12 = rotation[:, 1, 0], rotation[:, 1, 1], rotation[:, 1, 2]
+    m20, m21, m22 = rotation[:, 2, 0], rotation[:, 2, 1], rotation[:, 2, 2]
+    trace = m00 + m11 + m22
+
+    # Shepperd's method: pick the largest diagonal term for numerical stability
+    quat = np.empty((rotation.shape[0], 4), dtype=np.float64)
+    candidates = np.stack([trace, m00, m11, m22], axis=1)
+    choice = np.argmax(candidates, axis=1)
+
+    case = choice == 0
+    s = np.sqrt(np.maximum(trace[case] + 1.0, 1e-12)) * 2
+    quat[case] = np.stack([0.25 * s, (m21[case] - m12[case]) / s,
+                           (m02[case] - m20[case]) / s, (m10[case] - m01[case]) / s], axis=1)
+    case = choice == 1
+    s = np.sqrt(np.maximum(1.0 + m00[case] - m11[case] - m22[case], 1e-12)) * 2
+    quat[case] = np.stack([(m21[case] - m12[case]) / s, 0.25 * s,
+                           (m01[case] + m10[case]) / s, (m02[case] + m20[case]) / s], axis=1)
+    case = choice == 2
+    s = np.sqrt(np.maximum(1.0 + m11[case] - m00[case] - m22[case], 1e-12)) * 2
+    quat[case] = np.stack([(m02[case] - m20[case]) / s, (m01[case] + m10[case]) / s,
+                           0.25 * s, (m12[case] + m21[case]) / s], axis=1)
+    case = choice == 3
+    s = np.sqrt(np.maximum(1.0 + m22[case] - m00[case] - m11[case], 1e-12)) * 2
+    quat[case] = np.stack([(m10[case] - m01[case]) / s, (m02[case] + m20[case]) / s,
+                           (m12[case] + m21[case]) / s, 0.25 * s], axis=1)
+
+    # Keep w positive so consecutive frames stay comparable
+    quat *= np.where(quat[:, :1] < 0, -1.0, 1.0)
+    return quat
+
+def quaternion_to_matrix(quat):
+    """Convert (..., 4) quaternions (w, x, y, z) to (..., 3, 3) rotation matrices"""
+    w, x, y, z = quat[..., 0], quat[..., 1], quat[..., 2], quat[..., 3]
+    return np.stack([
+        np.stack([1 - 2 * (y * y + z * z), 2 * (x * y - w * z), 2 * (x * z + w * y)], axis=-1),
+        np.stack([2 * (x * y + w * z), 1 - 2 * (x * x + z * z), 2 * (y * z - w * x)], axis=-1),
+        np.stack([2 * (x * z - w * y), 2 * (y * z + w * x), 1 - 2 * (x * x + y * y)], axis=-1),
+    ], axis=-2)
+
+def tilt_angles(transforms):
+    """Angle in radians between each object's local Z axis and world Z, for (..., 10) transforms"""
+    qx = transforms[..., 4]
+    qy = transforms[..., 5]
+    # World Z component of the rotated local Z axis
+    up_z = 1.0 - 2.0 * (qx * qx + qy * qy)
+    return np.arccos(np.clip(up_z, -1.0, 1.0))
+
+def iter_frame_matrices(objects, frame_start, frame_end, scene=None):
+    """Step the scene once through a frame range, yielding (frame, (N, 4, 4) world matrices)"""
+    scene = scene or bpy.context.scene
+    count = len(objects)
+    buffer = np.empty(count * 16, dtype=np.float32)
+
+    # A private collection lets one foreach_get read every matrix at once
+    gather = bpy.data.collections.new("_TransformGather")
+    for obj in objects:
+        gather.objects.link(obj)
+    original_frame = scene.frame_current
+    try:
+        for frame in range(frame_start, frame_end + 1):
+            scene.frame_set(frame)
+            gather.objects.foreach_get("matrix_world", buffer)
+            # Blender stores matrices column by column; transpose to row-major
+            yield frame, buffer.reshape(count, 4, 4).transpose(0, 2, 1)
+    finally:
+        bpy.data.collections.remove(gather)
+        scene.frame_set(original_frame)
+
+def fill_transforms(out, objects, frame_start, frame_end, scene=None):
+    """Write (frames, objects, 10) transforms into an existing array (in memory or memory-mapped)"""
+    for frame, matrices in iter_frame_matrices(objects, frame_start, frame_end, scene):
+        location, quat, scale = decompose_matrices(matrices.astype(np.float64))
+        row = out[frame - frame_start]
+        row[:, 0:3] = location
+        row[:, 3:7] = quat
+        row[:, 7:10] = scale
+    return out
+
+def _frame_range(scene, frame_start, frame_end):
+    """Default to the rigid body cache range, then the scene range"""
+    world = scene.rigidbody_world
+    if world and world.point_cache:
+        default_start, default_end = world.point_cache.frame_start, world.point_cache.frame_end
+    else:
+        default_start, default_end = scene.frame_start, scene.frame_end
+    return (default_start if frame_start is None else frame_start,
+            default_end if frame_end is None else frame_end)
+
+def sample_baked_transforms(objects=None, frame_start=None, frame_end=None, scene=None):
+    """Read transforms into memory; returns (array, index) like load_baked_transforms"""
+    scene = scene or bpy.context.scene
+    objects = rigid_body_objects(scene) if objects is None else list(objects)
+    frame_start, frame_end = _frame_range(scene, frame_start, frame_end)
+    transforms = np.zeros((frame_end - frame_start + 1, len(objects), TRANSFORM_WIDTH), dtype=np.float32)
+    fill_transforms(transforms, objects, frame_start, frame_end, scene)
+    return transforms, _build_index(scene, objects, frame_start, frame_end)
+
+def _build_index(scene, objects, frame_start, frame_end):
+    """Name index and metadata stored next to the transform array"""
+    return {
+        "names": [obj.name for obj in objects],
+        "frame_start": frame_start,
+        "frame_end": frame_end,
+        "fps": scene.render.fps / scene.render.fps_base,
+        "layout": TRANSFORM_LAYOUT,
+        "half_extents": local_half_extents(objects).round(6).tolist(),
+    }
+
+def index_path(path):
+    """Sidecar JSON path for a transform array"""
+    return os.path.splitext(path)[0] + ".json"
+
+def export_baked_transforms(path, objects=None, frame_start=None, frame_end=None, scene=None):
+    """Walk the baked range once and write a memory-mapped (frames, objects, 10) float32 .npy"""
+    scene = scene or bpy.context.scene
+    path = bpy.path.abspath(path)
+    objects = rigid_body_objects(scene) if objects is None else list(objects)
+    frame_start, frame_end = _frame_range(scene, frame_start, frame_end)
+    shape = (frame_end - frame_start + 1, len(objects), TRANSFORM_WIDTH)
+
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    transforms = np.lib.format.open_memmap(path, mode="w+", dtype=np.float32, shape=shape)
+    fill_transforms(transforms, objects, frame_start, frame_end, scene)
+    transforms.flush()
+    del transforms
+
+    with open(index_path(path), "w") as f:
+        json.dump(_build_index(scene, objects, frame_start, frame_end), f)
+
+    print(f"Exported {shape[1]} objects x {shape[0]} frames to: {path}")
+    return path
+
+def load_baked_transforms(path, mode="r"):
+    """Open an exported transform array without loading it into RAM; returns (array, index)"""
+    transforms = np.load(path, mmap_mode=mode)
+    with open(index_path(path)) as f:
+        index = json.load(f)
+    return transforms, index
+
+def select_objects(index, prefix):
+    """Column indices of objects whose name starts with a prefix, in name order"""
+    return [i for i, name in enumerate(index["names"]) if name.startswith(prefix)]
+
+def main(argv=None):
+    """Command line entry: export the baked transforms of the open or built scene"""
+    import argparse
+    import scenarios
+
+    parser = argparse.ArgumentParser(description="Export baked rigid body transforms to .npy")
+    parser.add_argument("--scenario", choices=sorted(scenarios.SCENARIOS), default=None,
+                        help="Build and bake a scenario first instead of using the open file")
+    parser.add_argument("--out", default="transforms.npy")
+    parser.add_argument("--frame-start", type=int, default=None)
+    parser.add_argument("--frame-end", type=int, default=None)
+    args = parser.parse_args(scenarios.script_args() if argv is None else argv)
+
+    if args.scenario:
+        scenarios.run_scenario(args.scenario)
+    export_baked_transforms(args.out, frame_start=args.frame_start, frame_end=args.frame_end)
+
+if __name__ == "__main__":
+    import sys
+    sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+    main()
@@ -5,8 +5,23 @@ Complete script for creating a physics-based animation of a ball hitting an obst
 
 import bpy
 import math
+import os
+import numpy as np
 from mathutils import Vector
 
+try:
+    from pipeline_profiler import profile_phase
+except ImportError:
+    # Profiling is optional; without the helper module phases are no-ops
+    from contextlib import nullcontext as profile_phase
+
+try:
+    from image_cache import load_image
+except ImportError:
+    # Without the cache module, at least reuse an image that is already loaded
+    def load_image(image_path):
+        return bpy.data.images.load(image_path, check_existing=True)
+
 def clear_scene():
     """Clear all objects from the current scene"""
     bpy.ops.object.select_all(action='SELECT')
@@ -129,9 +144,9 @@ def create_textured_material(name, image_path):
     tex_coord = mat.node_tree.nodes.new(type='ShaderNodeTexCoord')
     image_tex = mat.node_tree.nodes.new(type='ShaderNodeTexImage')
     
-    # Load image
+    # Load image (once per session, at the active render profile's proxy size)
     try:
-        image = bpy.data.images.load(image_path)
+        image = load_image(image_path)
         image_tex.image = image
     except:
         print(f"Could not load image: {image_path}")
@@ -151,16 +166,37 @@ def create_textured_material(name, image_path):
     
     return mat
 
-def setup_ball_obstacle_scene():
-    """Create the ball, obstacle, and ground objects"""
-    # Create ground plane
+def setup_ground():
+    """Create the ground plane"""
     bpy.ops.mesh.primitive_plane_add(size=20, location=(0, 0, 0))
     ground = bpy.context.active_object
     ground.name = "Ground"
     
     # Create and apply ground material with nice color
-    ground_mat = create_material("GroundMaterial", (0.3, 0.35, 0.4, 1.0), roughness=0.8, metallic=0.0)
-    apply_material(ground, ground_mat)
+    with profile_phase("materials"):
+        ground_mat = create_material("GroundMaterial", (0.3, 0.35, 0.4, 1.0), roughness=0.8, metallic=0.0)
+        apply_material(ground, ground_mat)
+    return ground
+
+def setup_obstacle():
+    """Create the obstacle wall"""
+    # Create obstacle (wall) - positioned so bottom sits on ground
+    bpy.ops.mesh.primitive_cube_add(size=1, location=(0, 0, 0))
+    obstacle = bpy.context.active_object
+    obstacle.name = "Obstacle"
+    obstacle.scale = (2, 2, 4)  # Scale to make it a tall wall (height=4)
+    obstacle.location.z = 2  # Move up so bottom sits on ground (half of scaled height = 4/2 = 2)
+    
+    # Create and apply obstacle material - BRIGHT BLUE
+    with profile_phase("materials"):
+        obstacle_mat = create_material("ObstacleMaterial", (0.1, 0.3, 0.9, 1.0), roughness=0.4, metallic=0.1)
+        apply_material(obstacle, obstacle_mat)
+    return obstacle
+
+def setup_ball_obstacle_scene():
+    """Create the ball, obstacle, and ground objects"""
+    # Create ground plane
+    ground = setup_ground()
     
     # Create ball
     bpy.ops.mesh.primitive_uv_sphere_add(radius=1, location=(-8, 0, 1))
@@ -168,29 +204,22 @@ def setup_ball_obstacle_scene():
     ball.name = "Ball"
     
     # Create and apply ball material - STRIPED PATTERN (seperti bola basket/soccer)
-    ball_mat = create_striped_material(
-        "BallMaterial", 
-        color1=(0.95, 0.1, 0.1, 1.0),  # Bright red
-        color2=(1.0, 1.0, 1.0, 1.0),   # White
-        scale=15.0
-    )
-    apply_material(ball, ball_mat)
+    with profile_phase("materials"):
+        ball_mat = create_striped_material(
+            "BallMaterial", 
+            color1=(0.95, 0.1, 0.1, 1.0),  # Bright red
+            color2=(1.0, 1.0, 1.0, 1.0),   # White
+            scale=15.0
+        )
+        apply_material(ball, ball_mat)
     print(f"✅ Ball material applied: {ball_mat.name}")
     print(f"   Ball has {len(ball.data.materials)} material(s)")
     if len(ball.data.materials) > 0:
         print(f"   Material name: {ball.data.materials[0].name}")
         print(f"   Uses nodes: {ball.data.materials[0].use_nodes}")
     
-    # Create obstacle (wall) - positioned so bottom sits on ground
-    bpy.ops.mesh.primitive_cube_add(size=1, location=(0, 0, 0))
-    obstacle = bpy.context.active_object
-    obstacle.name = "Obstacle"
-    obstacle.scale = (2, 2, 4)  # Scale to make it a tall wall (height=4)
-    obstacle.location.z = 2  # Move up so bottom sits on ground (half of scaled height = 4/2 = 2)
-    
-    # Create and apply obstacle material - BRIGHT BLUE
-    obstacle_mat = create_material("ObstacleMaterial", (0.1, 0.3, 0.9, 1.0), roughness=0.4, metallic=0.1)
-    apply_material(obstacle, obstacle_mat)
+    # Create obstacle (wall)
+    obstacle = setup_obstacle()
     
     return ball, obstacle, ground
 
@@ -210,6 +239,10 @@ def setup_physics(ball, obstacle, ground):
     ball.rigid_body.use_margin = True
     ball.rigid_body.collision_margin = 0.01
     
+    setup_static_physics(obstacle, ground)
+
+def setup_static_physics(obstacle, ground):
+    """Set up passive rigid bodies for the obstacle and the ground"""
     # Add rigid body physics to obstacle (wall) - PASSIVE so it stays in place
     bpy.context.view_layer.objects.active = obstacle
     bpy.ops.rigidbody.object_add()
@@ -253,72 +286,213 @@ def animate_ball_collision():
     print("Setting up ball and obstacle animation...")
     
     # Clear and setup scene
-    clear_scene()
-    setup_scene()
-    
-    # Create objects
-    ball, obstacle, ground = setup_ball_obstacle_scene()
+    with profile_phase("clear"):
+        clear_scene()
+    with profile_phase("setup"):
+        setup_scene()
+        
+        # Create objects
+        ball, obstacle, ground = setup_ball_obstacle_scene()
     
     # Set up physics
-    setup_physics(ball, obstacle, ground)
+    with profile_phase("physics"):
+        setup_physics(ball, obstacle, ground)
     
     # Set up camera
-    setup_camera()
+    with profile_phase("camera"):
+        setup_camera()
     
     # Set animation range
     bpy.context.scene.frame_start = 1
     bpy.context.scene.frame_end = 120
     
-    # Animate ball using kinematic mode first, then switch to physics
-    ball.rigid_body.kinematic = True
-    
-    # Frame 1: Ball starts position
-    bpy.context.scene.frame_set(1)
-    ball.location = (-8, 0, 3)
-    ball.rotation_euler = (0, 0, 0)
-    ball.keyframe_insert(data_path="location", frame=1)
-    ball.keyframe_insert(data_path="rotation_euler", frame=1)
-    ball.rigid_body.keyframe_insert("kinematic", frame=1)
-    
-    # Frame 20: Ball rolling toward obstacle (still kinematic)
-    bpy.context.scene.frame_set(20)
-    ball.location = (-2, 0, 1.5)
-    ball.rotation_euler = (math.radians(180), 0, 0)
-    ball.keyframe_insert(data_path="location", frame=20)
-    ball.keyframe_insert(data_path="rotation_euler", frame=20)
-    ball.rigid_body.keyframe_insert("kinematic", frame=20)
-    
-    # Frame 21: Switch to physics simulation
-    bpy.context.scene.frame_set(21)
-    ball.rigid_body.kinematic = False
-    ball.rigid_body.keyframe_insert("kinematic", frame=21)
-    
-    # Set up rigid body world
-    if not bpy.context.scene.rigidbody_world:
-        bpy.ops.rigidbody.world_add()
-    
-    rigidbody_world = bpy.context.scene.rigidbody_world
-    rigidbody_world.collection.objects.link(ball)
-    rigidbody_world.collection.objects.link(obstacle)
-    rigidbody_world.collection.objects.link(ground)
-    
-    # Configure physics simulation
-    rigidbody_world.point_cache.frame_start = 1
-    rigidbody_world.point_cache.frame_end = 120
-    
-    # Set physics substeps for better accuracy
-    rigidbody_world.steps_per_second = 120
-    rigidbody_world.solver_iterations = 20
+    with profile_phase("physics"):
+        # Animate ball using kinematic mode first, then switch to physics
+        ball.rigid_body.kinematic = True
+        
+        # Frame 1: Ball starts position
+        bpy.context.scene.frame_set(1)
+        ball.location = (-8, 0, 3)
+        ball.rotation_euler = (0, 0, 0)
+        ball.keyframe_insert(data_path="location", frame=1)
+        ball.keyframe_insert(data_path="rotation_euler", frame=1)
+        ball.rigid_body.keyframe_insert("kinematic", frame=1)
+        
+        # Frame 20: Ball rolling toward obstacle (still kinematic)
+        bpy.context.scene.frame_set(20)
+        ball.location = (-2, 0, 1.5)
+        ball.rotation_euler = (math.radians(180), 0, 0)
+        ball.keyframe_insert(data_path="location", frame=20)
+        ball.keyframe_insert(data_path="rotation_euler", frame=20)
+        ball.rigid_body.keyframe_insert("kinematic", frame=20)
+        
+        # Frame 21: Switch to physics simulation
+        bpy.context.scene.frame_set(21)
+        ball.rigid_body.kinematic = False
+        ball.rigid_body.keyframe_insert("kinematic", frame=21)
+        
+        # Set up rigid body world
+        if not bpy.context.scene.rigidbody_world:
+            bpy.ops.rigidbody.world_add()
+        
+        rigidbody_world = bpy.context.scene.rigidbody_world
+        rigidbody_world.collection.objects.link(ball)
+        rigidbody_world.collection.objects.link(obstacle)
+        rigidbody_world.collection.objects.link(ground)
+        
+        # Configure physics simulation
+        rigidbody_world.point_cache.frame_start = 1
+        rigidbody_world.point_cache.frame_end = 120
+        
+        # Set physics substeps for better accuracy
+        rigidbody_world.steps_per_second = 120
+        rigidbody_world.solver_iterations = 20
     
     # Bake physics simulation
     print("Baking physics simulation...")
-    bpy.context.scene.frame_set(1)
-    bpy.ops.ptcache.bake_all(bake=True)
+    with profile_phase("bake"):
+        bpy.context.scene.frame_set(1)
+        bpy.ops.ptcache.bake_all(bake=True)
     
     print("Ball and obstacle animation setup complete!")
     print("Animation frames: 1-120")
     print("Press Spacebar to play the animation in Blender")
 
+def many_ball_paths(count, radius=0.2, seed=0, handoff_frame=20, handoff_spread=20, clearance=0.25):
+    """Start and handoff positions (N,3) and last kinematic frame (N,) for a field of balls"""
+    rng = np.random.default_rng(seed)
+    
+    # Lattice behind the obstacle, filled layer by layer from the ground up
+    spacing = 3.0 * radius
+    x_min, x_max = -9.5, -4.0
+    y_min, y_max = -4.0, 4.0
+    nx = max(int((x_max - x_min) // spacing), 1)
+    ny = max(int((y_max - y_min) // spacing), 1)
+    nz = -(-count // (nx * ny))
+    cells = np.stack(np.meshgrid(np.arange(nx), np.arange(ny), np.arange(nz), indexing="ij"), axis=-1).reshape(-1, 3)
+    cells = cells[np.argsort(cells[:, 2], kind="stable")][:count]
+    
+    starts = np.empty((count, 3), dtype=np.float64)
+    starts[:, 0] = x_min + (cells[:, 0] + 0.5) * spacing
+    starts[:, 1] = y_min + (cells[:, 1] + 0.5) * spacing
+    starts[:, 2] = radius + 0.05 + cells[:, 2] * spacing
+    jitter = 0.45 * (spacing - 2 * radius)  # Never enough to touch a neighbour
+    starts[:, :2] += rng.uniform(-jitter, jitter, (count, 2))
+    
+    # Staggered release, one shared velocity: kinematic balls never overlap each other,
+    # and the front row is still clear of the obstacle face (x = -1) at the last release
+    handoffs = handoff_frame + rng.integers(0, handoff_spread + 1, count)
+    front = -1.0 - radius - clearance
+    speed = max(front - starts[:, 0].max(), 0.0) / max(handoffs.max() - 1, 1)
+    ends = starts.copy()
+    ends[:, 0] += speed * (handoffs - 1)
+    return starts, ends, handoffs
+
+def _key_fcurve(action, data_path, frames, values, index=0, interpolation='LINEAR'):
+    """Write all keys of one F-curve in bulk"""
+    fcurve = action.fcurves.new(data_path, index=index)
+    fcurve.keyframe_points.add(len(frames))
+    coords = np.empty(len(frames) * 2, dtype=np.float32)
+    coords[0::2] = frames
+    coords[1::2] = values
+    fcurve.keyframe_points.foreach_set("co", coords)
+    for point in fcurve.keyframe_points:
+        point.interpolation = interpolation
+    fcurve.update()
+
+def animate_many_balls(count=500, radius=0.2, seed=0, handoff_frame=20, handoff_spread=20, frame_end=120):
+    """Many-body variant: a field of balls rolls into the obstacle and is handed to physics"""
+    print(f"Setting up {count} balls against the obstacle...")
+    
+    with profile_phase("clear"):
+        clear_scene()
+    with profile_phase("setup"):
+        setup_scene()
+        ground = setup_ground()
+        obstacle = setup_obstacle()
+        starts, ends, handoffs = many_ball_paths(count, radius, seed, handoff_frame, handoff_spread)
+        
+        # One low-poly sphere mesh shared by every ball
+        bpy.ops.mesh.primitive_uv_sphere_add(radius=radius, segments=16, ring_count=8, location=(0, 0, 0))
+        template = bpy.context.active_object
+        mesh = template.data
+        mesh.name = "BallMesh"
+        mesh.polygons.foreach_set("use_smooth", np.ones(len(mesh.polygons), dtype=bool))
+        bpy.data.objects.remove(template)
+        with profile_phase("materials"):
+            ball_mat = create_striped_material(
+                "BallMaterial",
+                color1=(0.95, 0.1, 0.1, 1.0),
+                color2=(1.0, 1.0, 1.0, 1.0),
+                scale=15.0
+            )
+            mesh.materials.append(ball_mat)
+        
+        balls_collection = bpy.data.collections.new("Balls")
+        bpy.context.scene.collection.children.link(balls_collection)
+        balls = []
+        for i in range(count):
+            ball = bpy.data.objects.new(f"Ball_{i:04d}", mesh)
+            ball.location = starts[i]
+            balls_collection.objects.link(ball)
+            balls.append(ball)
+    
+    with profile_phase("physics"):
+        setup_static_physics(obstacle, ground)
+        
+        # Rigid bodies for all balls in one operator call
+        for obj in bpy.context.view_layer.objects.selected:
+            obj.select_set(False)
+        for ball in balls:
+            ball.select_set(True)
+        bpy.context.view_layer.objects.active = balls[0]
+        bpy.ops.rigidbody.objects_add(type='ACTIVE')
+        mass = 2.0 * radius ** 3  # Same density as the single ball
+        for ball in balls:
+            rigid_body = ball.rigid_body
+            rigid_body.mass = mass
+            rigid_body.friction = 0.5
+            rigid_body.restitution = 0.8
+            rigid_body.linear_damping = 0.1
+            rigid_body.angular_damping = 0.1
+            rigid_body.collision_shape = 'SPHERE'
+            rigid_body.use_margin = True
+            rigid_body.collision_margin = 0.01
+            rigid_body.kinematic = True
+        
+        # Kinematic approach keyed up to each ball's handoff frame, dynamic from the next one
+        rolled = (ends[:, 0] - starts[:, 0]) / radius  # Rolling angle about Y
+        for i, ball in enumerate(balls):
+            action = bpy.data.actions.new(name=f"{ball.name}Action")
+            ball.animation_data_create().action = action
+            frames = (1, handoffs[i])
+            for axis in range(3):
+                _key_fcurve(action, "location", frames, (starts[i, axis], ends[i, axis]), index=axis)
+            _key_fcurve(action, "rotation_euler", frames, (0.0, rolled[i]), index=1)
+            _key_fcurve(action, "rigid_body.kinematic", (1, handoffs[i], handoffs[i] + 1), (1, 1, 0),
+                        interpolation='CONSTANT')
+        
+        scene = bpy.context.scene
+        scene.frame_start = 1
+        scene.frame_end = frame_end
+        rigidbody_world = scene.rigidbody_world
+        rigidbody_world.point_cache.frame_start = 1
+        rigidbody_world.point_cache.frame_end = frame_end
+        rigidbody_world.steps_per_second = 120
+        rigidbody_world.solver_iterations = 10
+    
+    with profile_phase("camera"):
+        setup_camera()
+    
+    print("Baking physics simulation...")
+    with profile_phase("bake"):
+        bpy.context.scene.frame_set(1)
+        bpy.ops.ptcache.bake_all(bake=True)
+    
+    print(f"Many-ball animation setup complete: {count} balls, released between frames "
+          f"{handoffs.min() + 1} and {handoffs.max() + 1}")
+    return balls
+
 def setup_render_settings():
     """Configure render settings for output"""
     # Set render engine
@@ -342,9 +516,21 @@ def setup_render_settings():
     # Set output path
     bpy.context.scene.render.filepath = "//ball_obstacle_animation.mp4"
 
-def render_animation():
-    """Render the animation to file"""
+def render_animation(cache_dir=None, resumable=False):
+    """Render the animation to file (as a cached or resumable frame sequence on request)"""
     setup_render_settings()
+    video_path = bpy.path.abspath(bpy.context.scene.render.filepath)
+    frames_dir = os.path.splitext(video_path)[0] + "_frames"
+    if cache_dir:
+        # PNG sequence that skips frames whose visible state was rendered before
+        from render_cache import render_with_cache
+        render_with_cache(frames_dir, cache_dir)
+        return
+    if resumable:
+        # Frame files that survive a crash, encoded to the video while rendering
+        from sequence_render import render_sequence
+        render_sequence(frames_dir, video_path=video_path)
+        return
     print("Rendering animation... This may take a while.")
     bpy.ops.render.render(animation=True)
     print(f"Animation rendered to: {bpy.context.scene.render.filepath}")
@@ -0,0 +1,172 @@
+"""
+Blender Python Animation: Chain Reaction Analytics
+Scores a baked domino run: topple frame per domino, topple order, wave speed, stalls, early falls
+
+Works on the (frames, objects, 10) transform arrays from baked_transforms.py, so it runs
+inside Blender right after a bake or outside Blender on an exported .npy file.
+
+Usage outside Blender:
+    python chain_analytics.py transforms.npy --report chain_report.json
+
+Usage inside Blender (on the open, baked scene):
+    blender -b scene.blend --python chain_analytics.py -- --report chain_report.json
+"""
+
+import json
+import math
+import os
+
+import numpy as np
+
+def topple_frames(transforms, columns=None, threshold=math.radians(45.0), chunk=4096):
+    """Frame offset at which each object's tilt first passes the threshold (-1 if it never does)
+
+    Reads the array in column chunks so memory-mapped inputs never load fully into RAM.
+    """
+    from baked_transforms import tilt_angles
+
+    columns = np.arange(transforms.shape[1]) if columns is None else np.asarray(columns)
+    result = np.full(len(columns), -1, dtype=np.int64)
+    for start in range(0, len(columns), chunk):
+        block = columns[start:start + chunk]
+        tilt = tilt_angles(np.asarray(transforms[:, block], dtype=np.float32))  # (F, n)
+        fallen = tilt > threshold
+        first = np.argmax(fallen, axis=0)
+        result[start:start + len(block)] = np.where(fallen.any(axis=0), first, -1)
+    return result
+
+def chain_distances(positions):
+    """Distance along the chain (in chain order) from the first domino, for (N, 3) rest positions"""
+    steps = np.linalg.norm(np.diff(positions[:, 0:2], axis=0), axis=1)
+    return np.concatenate([[0.0], np.cumsum(steps)])
+
+def analyze_chain(transforms, index, prefix="Domino_", threshold_deg=45.0, trigger_frame=None,
+                  stall_factor=3.0, early_tolerance=2):
+    """Build the chain report for the objects whose names start with a prefix (chain order = name order)"""
+    from baked_transforms import select_objects
+
+    columns = np.array(select_objects(index, prefix), dtype=np.int64)
+    names = [index["names"][c] for c in columns]
+    fps = float(index.get("fps", 24.0))
+    frame_start = int(index.get("frame_start", 1))
+    count = len(columns)
+    if count == 0:
+        raise ValueError(f"No objects named '{prefix}*' in the transform index")
+
+    frames = topple_frames(transforms, columns, threshold=math.radians(threshold_deg))
+    toppled = frames >= 0
+    rest_positions = np.asarray(transforms[0, columns, 0:3], dtype=np.float64)
+    distance = chain_distances(rest_positions)
+
+    # Chain propagation: the prefix of dominoes reached without a break
+    unreached = np.flatnonzero(~toppled)
+    reached_count = int(unreached[0]) if len(unreached) else count
+
+    # Delays between neighbours along the chain
+    delays = np.diff(frames).astype(np.float64)
+    both = toppled[:-1] & toppled[1:]
+    typical_delay = float(np.median(delays[both & (delays > 0)])) if np.any(both & (delays > 0)) else 0.0
+
+    stalls = []
+    for i in np.flatnonzero(toppled[:-1] & ~toppled[1:]):
+        stalls.append({"after": names[i], "index": int(i), "reason": "next domino never fell"})
+    if typical_delay > 0:
+        for i in np.flatnonzero(both & (delays > stall_factor * typical_delay)):
+            stalls.append({"after": names[i], "index": int(i), "reason": "slow hand-off",
+                           "delay_frames": int(delays[i])})
+
+    # Early falls: toppled clearly before the wave reached them
+    early = []
+    for i in np.flatnonzero(both & (delays < -early_tolerance)):
+        early.append({"name": names[i + 1], "index": int(i + 1), "frame": int(frames[i + 1]) + frame_start,
+                      "before_predecessor_frames": int(-delays[i])})
+    if trigger_frame is not None and toppled[0] and frames[0] + frame_start < trigger_frame:
+        early.insert(0, {"name": names[0], "index": 0, "frame": int(frames[0]) + frame_start,
+                         "before_trigger_frames": int(trigger_frame - frames[0] - frame_start)})
+    early_names = {entry["name"] for entry in early}
+    isolated = np.flatnonzero(toppled)
+    for i in isolated[isolated >= reached_count]:
+        # Fell although the chain broke before reaching it
+        if names[i] not in early_names:
+            early.append({"name": names[i], "index": int(i), "frame": int(frames[i]) + frame_start,
+                          "reason": "fell beyond a chain break"})
+
+    # Wave speed: least-squares slope of chain distance over topple time for the reached prefix
+    wave_speed = None
+    if reached_count >= 2:
+        times = frames[:reached_count] / fps
+        if np.ptp(times) > 0:
+            wave_speed = float(np.polyfit(times, distance[:reached_count], 1)[0])
+
+    order = np.argsort(np.where(toppled, frames, np.iinfo(np.int64).max), kind="stable")
+    first_frame = int(frames[toppled].min()) if toppled.any() else None
+    last_frame = int(frames[toppled].max()) if toppled.any() else None
+    return {
+        "dominoes": count,
+        "toppled": int(toppled.sum()),
+        "complete": bool(toppled.all()),
+        "completion_fraction": float(toppled.mean()),
+        "reached_without_break": reached_count,
+        "threshold_deg": threshold_deg,
+        "topple_order": [names[i] for i in order if toppled[i]],
+        "topple_frames": {names[i]: (int(frames[i]) + frame_start if toppled[i] else None) for i in range(count)},
+        "first_topple_frame": None if first_frame is None else first_frame + frame_start,
+        "last_topple_frame": None if last_frame is None else last_frame + frame_start,
+        "completion_seconds": None if first_frame is None else (last_frame - first_frame) / fps,
+        "typical_delay_frames": typical_delay,
+        "wave_speed": wave_speed,  # Chain length per second
+        "chain_length": float(distance[-1]),
+        "stalls": stalls,
+        "early": early,
+    }
+
+def print_report(report):
+    """Short human readable summary"""
+    print("=" * 60)
+    status = "COMPLETE" if report["complete"] else "INCOMPLETE"
+    print(f"Chain reaction {status}: {report['toppled']}/{report['dominoes']} dominoes toppled")
+    if report["completion_seconds"] is not None:
+        print(f"  Frames {report['first_topple_frame']}-{report['last_topple_frame']}"
+              f" ({report['completion_seconds']:.2f}s)")
+    if report["wave_speed"] is not None:
+        print(f"  Wave speed: {report['wave_speed']:.2f} m/s over {report['chain_length']:.2f} m")
+    for stall in report["stalls"]:
+        print(f"  Stall after {stall['after']}: {stall['reason']}")
+    for entry in report["early"]:
+        print(f"  Early fall: {entry['name']} at frame {entry['frame']}")
+    print("=" * 60)
+
+def main(argv=None):
+    """Command line entry: analyze an exported .npy or the open baked scene"""
+    import argparse
+    import sys
+
+    if argv is None:
+        argv = sys.argv[sys.argv.index("--") + 1:] if "--" in sys.argv else sys.argv[1:]
+    parser = argparse.ArgumentParser(description="Chain reaction analytics for baked dominoes")
+    parser.add_argument("transforms", nargs="?", default=None, help="Exported .npy (default: read the open scene)")
+    parser.add_argument("--prefix", default="Domino_")
+    parser.add_argument("--threshold", type=float, default=45.0, help="Tilt in degrees that counts as toppled")
+    parser.add_argument("--trigger-frame", type=int, default=None, help="First frame the trigger can hit")
+    parser.add_argument("--report", default=None, help="Write the full report as JSON")
+    args = parser.parse_args(argv)
+
+    if args.transforms:
+        from baked_transforms import load_baked_transforms
+        transforms, index = load_baked_transforms(args.transforms)
+    else:
+        from baked_transforms import sample_baked_transforms
+        transforms, index = sample_baked_transforms()
+
+    report = analyze_chain(transforms, index, prefix=args.prefix, threshold_deg=args.threshold,
+                           trigger_frame=args.trigger_frame)
+    print_report(report)
+    if args.report:
+        with open(args.report, "w") as f:
+            json.dump(report, f, indent=2)
+    return report
+
+if __name__ == "__main__":
+    import sys
+    sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+    main()
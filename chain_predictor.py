@@ -0,0 +1,217 @@
+"""
+Blender Python Animation: Analytic Chain Reaction Predictor
+Pure NumPy rigid-rod model of domino toppling, for chain timing and a geometric pre-bake screen
+
+Each domino is a rigid block pivoting about its front bottom edge. Falling domino i gains
+energy until it strikes domino i+1; the strike is modelled as a collision between the two
+rotating blocks (effective masses at the contact point, restitution e), which gives i+1 its
+starting spin. The striker keeps leaning on i+1 afterwards, so its remaining kinetic energy
+and the gravity work it does while i+1 rotates to its balance point are added as a push.
+A domino only topples if that energy carries it over its balance point or into the next
+domino. Time is integrated over the tilt angle, all layouts at once. Layouts whose dominoes
+overlap (they would interpenetrate and blow apart in Bullet) fail at the first domino.
+
+The energy model is not calibrated against bakes. For the default domino proportions it
+reduces to "gap smaller than the domino height" and is insensitive to mass, so treat it as
+a geometric screen: what it rejects cannot chain, what it accepts still needs a bake.
+
+Parameters follow setup_domino_scene/animate_falling_dominoes: spacing (centre to centre),
+domino_height, domino_width (thickness in the falling direction), domino_depth, mass.
+Any of them can be a scalar, one value per layout (L,) or one value per domino (L, N).
+
+Usage:
+    from chain_predictor import predict_chains
+    prediction = predict_chains({"spacing": np.linspace(0.4, 1.6, 5000)})
+    plausible = prediction["completes"]
+"""
+
+import math
+
+import numpy as np
+
+GRAVITY = 9.81
+
+# Values of the hand-tuned scene in falling_dominoes_animation.py
+DEFAULT_LAYOUT = {
+    "num_dominoes": 15,
+    "spacing": 0.65,
+    "domino_width": 0.3,
+    "domino_height": 2.0,
+    "domino_depth": 0.8,
+    "mass": 0.5,
+    "restitution": 0.1,
+    "ball_mass": 2.0,
+    "ball_kinematic": True,  # The trigger ball is still animation driven when it touches
+    "ball_height": 1.0,
+    "ball_start_offset": 3.0,
+    "ball_contact_frame": 25,
+    "fps": 24,
+}
+
+def _per_domino(value, layouts, dominoes):
+    """Broadcast a scalar, (L,) or (L, N) parameter to (L, N)"""
+    value = np.asarray(value, dtype=np.float64)
+    if value.ndim == 1:
+        value = value[:, None]
+    return np.broadcast_to(value, (layouts, dominoes))
+
+def _layout_count(params):
+    """Number of layouts implied by the parameter shapes"""
+    count = 1
+    for value in params.values():
+        shape = np.shape(value)
+        if shape:
+            count = max(count, shape[0])
+    return count
+
+def _fall_time(omega0_sq, stiffness, alpha, theta_end, samples=48):
+    """Seconds to rotate from upright to theta_end given the starting spin (all arrays (L,))
+
+    Uses omega(theta)^2 = omega0^2 + stiffness * (cos(alpha) - cos(theta - alpha)).
+    """
+    fractions = np.linspace(0.0, 1.0, samples)
+    theta = theta_end[:, None] * fractions[None, :]
+    omega_sq = omega0_sq[:, None] + stiffness[:, None] * (np.cos(alpha)[:, None] - np.cos(theta - alpha[:, None]))
+    omega = np.sqrt(np.maximum(omega_sq, 1e-6))
+    return np.trapezoid(1.0 / omega, theta, axis=1) if hasattr(np, "trapezoid") else np.trapz(1.0 / omega, theta, axis=1)
+
+def predict_chains(layouts=None, **overrides):
+    """Predict completion and duration for many layouts at once
+
+    Returns a dict of (L,) arrays: completes, reached (dominoes toppled), chain_seconds
+    (first impact until the last domino lands) and first_failure (-1 when complete).
+    """
+    params = dict(DEFAULT_LAYOUT)
+    params.update(layouts or {})
+    params.update(overrides)
+
+    count = _layout_count(params)
+    num = np.broadcast_to(np.asarray(params["num_dominoes"], dtype=np.int64), (count,))
+    max_num = int(num.max())
+
+    height = _per_domino(params["domino_height"], count, max_num)
+    width = _per_domino(params["domino_width"], count, max_num)
+    mass = _per_domino(params["mass"], count, max_num)
+    spacing = _per_domino(params["spacing"], count, max_num)
+    restitution = np.broadcast_to(np.asarray(params["restitution"], dtype=np.float64), (count,))
+
+    # Block about its edge: centre-of-mass radius, lean angle and moment of inertia
+    radius = 0.5 * np.sqrt(height ** 2 + width ** 2)
+    alpha = np.arctan2(width, height)
+    inertia = mass * (height ** 2 + width ** 2) / 3.0
+    stiffness = 2.0 * mass * GRAVITY * radius / inertia
+
+    # Trigger ball: kinematic push from its start offset to the contact frame
+    fps = float(np.asarray(params["fps"]).flat[0])
+    travel = np.asarray(params["ball_start_offset"], dtype=np.float64) - 0.6
+    # At least one frame of travel: contact on frame 1 is still a push, not an infinitely fast hit
+    duration = np.maximum(np.asarray(params["ball_contact_frame"], dtype=np.float64) - 1, 1.0) / fps
+    ball_speed = np.broadcast_to(travel / duration, (count,))
+    ball_mass = np.broadcast_to(np.asarray(params["ball_mass"], dtype=np.float64), (count,))
+    hit_height = np.minimum(np.broadcast_to(np.asarray(params["ball_height"], dtype=np.float64), (count,)),
+                            height[:, 0])
+    struck_mass = inertia[:, 0] / hit_height ** 2
+    kinematic = np.broadcast_to(np.asarray(params["ball_kinematic"], dtype=bool), (count,))
+    # A kinematic ball acts like an infinite mass
+    share = np.where(kinematic, 1.0, ball_mass / (ball_mass + struck_mass))
+    velocity = (1 + restitution) * share * ball_speed
+    omega0_sq = (velocity / hit_height) ** 2
+
+    alive = np.ones(count, dtype=bool)
+    reached = np.zeros(count, dtype=np.int64)
+    chain_seconds = np.zeros(count)
+    first_failure = np.full(count, -1, dtype=np.int64)
+    # Toppled dominoes behind the striker that still lean on it (they cannot lie flat when gap < h)
+    leaning = np.zeros(count)
+
+    # Overlapping neighbours interpenetrate at the first simulation step: nothing chains
+    if max_num > 1:
+        gaps = spacing[:, :-1] - 0.5 * (width[:, :-1] + width[:, 1:])
+        pairs = np.arange(max_num - 1)[None, :] < (num - 1)[:, None]
+        overlapping = ((gaps <= 0) & pairs).any(axis=1)
+        alive &= ~overlapping
+        first_failure[overlapping] = 0
+
+    for i in range(max_num):
+        in_chain = alive & (i < num)
+        h, t, a, k = height[:, i], width[:, i], alpha[:, i], stiffness[:, i]
+        last = i == num - 1
+
+        # Geometry of the strike on the next domino
+        if i + 1 < max_num:
+            gap = spacing[:, i] - 0.5 * (t + width[:, i + 1])
+            next_height = height[:, i + 1]
+        else:
+            gap = np.full(count, np.inf)
+            next_height = h
+        reaches = gap < h
+        tip_angle = np.arcsin(np.clip(gap / h, 0.0, 1.0))
+        # If the tip would pass above the next domino, the striker's face hits its top corner
+        over_top = h * np.cos(tip_angle) > next_height
+        contact_angle = np.where(over_top, np.arctan2(gap, next_height), tip_angle)
+        striker_arm = np.where(over_top, np.hypot(gap, next_height), h)
+        struck_arm = np.where(over_top, next_height, h * np.cos(tip_angle))
+
+        # Last domino (or no neighbour in reach): fall until it lands
+        end_angle = np.where(last | ~reaches, 0.5 * math.pi, contact_angle)
+
+        # Does the spin carry it over the balance point (or into the next domino first)?
+        barrier_angle = np.minimum(a, end_angle)
+        omega_at_barrier_sq = omega0_sq + k * (np.cos(a) - np.cos(barrier_angle - a))
+        topples = omega_at_barrier_sq > 0
+
+        toppled_now = in_chain & topples
+        reached += toppled_now
+        chain_seconds += np.where(toppled_now, _fall_time(omega0_sq, k, a, end_angle), 0.0)
+
+        failed = in_chain & (~topples | (~reaches & ~last))
+        first_failure = np.where(failed & (first_failure < 0), np.where(topples, i + 1, i), first_failure)
+        alive &= ~failed & ~last
+        if i + 1 >= max_num:
+            break
+
+        # Collision: effective masses at the contact point, tip velocity normal to the face
+        omega_c = np.sqrt(np.maximum(omega0_sq + k * (np.cos(a) - np.cos(contact_angle - a)), 0.0))
+        striker_mass = inertia[:, i] / striker_arm ** 2
+        struck_mass = inertia[:, i + 1] / np.maximum(struck_arm, 1e-6) ** 2
+        tip_velocity = omega_c * striker_arm * np.cos(contact_angle)
+        struck_velocity = (1 + restitution) * striker_mass / (striker_mass + struck_mass) * tip_velocity
+        struck_energy = 0.5 * inertia[:, i + 1] * (struck_velocity / np.maximum(struck_arm, 1e-6)) ** 2
+
+        # Push: the striker stays in contact while i+1 rotates up to its balance point
+        striker_velocity = tip_velocity * (striker_mass - restitution * struck_mass) / (striker_mass + struck_mass)
+        push_energy = 0.5 * striker_mass * np.maximum(striker_velocity, 0.0) ** 2
+        follow = struck_arm * alpha[:, i + 1] / np.maximum(striker_arm * np.cos(contact_angle), 1e-6)
+        follow = np.minimum(follow, 0.5 * math.pi - contact_angle)
+        gravity_work = mass[:, i] * GRAVITY * radius[:, i] * (
+            np.cos(contact_angle - a) - np.cos(contact_angle + follow - a))
+        # Below its own balance point (contact_angle < a) the striker gives back about what it
+        # takes, but the stack leaning on it is past its balance points and keeps pushing: each
+        # leaning domino rests about one contact angle beyond balance and turns with the striker
+        lean_angle = a + contact_angle
+        stack_work = leaning * mass[:, i] * GRAVITY * radius[:, i] * (
+            np.cos(lean_angle - a) - np.cos(lean_angle + follow - a))
+
+        energy = struck_energy + push_energy + np.maximum(gravity_work, 0.0) + stack_work
+        leaning = np.where(reaches, leaning + 1, 0.0)
+        omega0_sq = 2.0 * energy / inertia[:, i + 1]
+
+    completes = reached >= num
+    first_failure = np.where(completes, -1, np.maximum(first_failure, 0))
+    return {
+        "completes": completes,
+        "reached": reached,
+        "chain_seconds": chain_seconds,
+        "first_failure": first_failure,
+    }
+
+def filter_layouts(layouts, min_fraction=1.0):
+    """Boolean mask of layouts predicted to reach at least min_fraction of their dominoes"""
+    prediction = predict_chains(layouts)
+    num = np.broadcast_to(np.asarray(dict(DEFAULT_LAYOUT, **layouts)["num_dominoes"]), prediction["reached"].shape)
+    return prediction["reached"] >= np.ceil(min_fraction * num)
+
+def layouts_from_runs(runs):
+    """Stack sweep runs (parameter_sweep.make_runs) into predictor layout arrays"""
+    keys = [key for key in DEFAULT_LAYOUT if any(key in run["params"] for run in runs)]
+    return {key: np.array([run["params"].get(key, DEFAULT_LAYOUT[key]) for run in runs]) for key in keys}
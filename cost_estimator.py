@@ -0,0 +1,360 @@
+"""
+Blender Python Animation: Cost Estimator
+Predicts bake time, render time per frame and peak memory of a scene before the job is submitted
+
+The estimate comes from scene statistics: rigid bodies and their collision shapes, substeps,
+solver iterations, frame range, polygons, particles, texture size, resolution and samples.
+They are turned into a few work measures, such as body steps (frames x substeps x active
+bodies) or pixel samples. A linear model per host maps those measures to seconds and
+megabytes. It is fitted by least squares (non-negative) to runs measured on that host and
+stored in cost_calibration/<host>.json. With fewer runs than terms, only the scale of
+built-in rough coefficients is fitted; without any run the rough coefficients are used and
+the estimate says so.
+
+Given a budget, the estimator warns about every limit that would be exceeded. With
+downgrade, it also steps the render profile down (render_profiles.py) until the render
+fits. Physics settings are never changed; it suggests the substeps that would fit instead.
+
+Usage from the command line:
+    blender -b scene.blend --python cost_estimator.py -- --calibrate
+    blender -b scene.blend --python cost_estimator.py -- --render-budget 3600 --memory-budget 8000 --downgrade
+    blender -b --python cost_estimator.py -- --scenario dominoes --calibrate   (builds and bakes first)
+
+A scenario always bakes while it is built, so for a true pre-flight estimate open a .blend
+saved before its bake.
+"""
+
+import json
+import os
+import socket
+import time
+
+import numpy as np
+
+try:
+    import bpy
+except ImportError:  # Models can be fitted and inspected outside Blender
+    bpy = None
+
+CALIBRATION_DIR = "cost_calibration"
+
+# Work measures per target; "constant" is the fixed cost
+BAKE_TERMS = ("constant", "body_steps", "solver_work", "mesh_collision_steps", "particle_frames")
+RENDER_TERMS = ("constant", "pixel_samples", "light_pixel_samples", "scene_polygons", "blur_pixel_samples")
+MEMORY_TERMS = ("constant", "scene_polygons", "particles", "texture_pixels", "pixels", "rigid_bodies")
+TERMS = {"bake_seconds": BAKE_TERMS, "render_seconds_per_frame": RENDER_TERMS, "peak_memory_mb": MEMORY_TERMS}
+
+# Rough coefficients for a typical desktop CPU, used until the host is calibrated
+PRIOR = {
+    "bake_seconds": {"constant": 0.5, "body_steps": 2e-6, "solver_work": 1e-7, "mesh_collision_steps": 5e-7,
+                     "particle_frames": 1e-6},
+    "render_seconds_per_frame": {"constant": 1.0, "pixel_samples": 0.15, "light_pixel_samples": 0.02,
+                                 "scene_polygons": 1.5, "blur_pixel_samples": 0.05},
+    "peak_memory_mb": {"constant": 400.0, "scene_polygons": 250.0, "particles": 0.5, "texture_pixels": 16.0,
+                       "pixels": 60.0, "rigid_bodies": 2.0},
+}
+# Profiles tried, in order, when the render does not fit the budget
+DOWNGRADE_ORDER = ("final", "preview", "draft")
+
+def scene_stats(scene=None):
+    """Counts and settings of a scene that drive its cost"""
+    scene = scene or bpy.context.scene
+    render = scene.render
+    stats = {"engine": render.engine}
+
+    world = scene.rigidbody_world
+    bodies = [obj for obj in world.collection.objects if obj.rigid_body] if world and world.collection else []
+    active = [obj for obj in bodies if obj.rigid_body.type == 'ACTIVE']
+    stats["rigid_bodies"] = len(bodies)
+    stats["active_bodies"] = len(active)
+    shapes = {}
+    mesh_collision = 0
+    for obj in bodies:
+        shape = obj.rigid_body.collision_shape
+        shapes[shape] = shapes.get(shape, 0) + 1
+        if shape == 'MESH' and obj.type == 'MESH':
+            mesh_collision += len(obj.data.polygons)
+        elif shape == 'CONVEX_HULL' and obj.type == 'MESH':
+            mesh_collision += len(obj.data.vertices) // 4  # Hull support points cost far less than triangles
+    stats["collision_shapes"] = shapes
+    stats["mesh_collision_polygons"] = mesh_collision
+    if world:
+        fps = render.fps / render.fps_base
+        substeps = getattr(world, "substeps_per_frame", None)
+        if substeps is None:
+            substeps = world.steps_per_second / fps  # Older Blender: steps per second
+        stats["substeps"] = float(substeps)
+        stats["solver_iterations"] = world.solver_iterations
+        stats["bake_frames"] = world.point_cache.frame_end - world.point_cache.frame_start + 1
+    else:
+        stats["substeps"] = 0.0
+        stats["solver_iterations"] = 0
+        stats["bake_frames"] = 0
+
+    # Geometry the renderer sees, with particle instances counted once per particle
+    polygons = 0
+    particles = 0
+    for obj in scene.objects:
+        if obj.hide_render:
+            continue
+        if obj.type == 'MESH':
+            polygons += len(obj.data.polygons)
+        for system in getattr(obj, "particle_systems", []):
+            settings = system.settings
+            particles += settings.count
+            instance = settings.instance_object
+            if settings.render_type == 'OBJECT' and instance is not None and instance.type == 'MESH':
+                polygons += settings.count * len(instance.data.polygons)
+    stats["polygons"] = polygons
+    stats["particles"] = particles
+    stats["lights"] = sum(1 for obj in scene.objects if obj.type == 'LIGHT' and not obj.hide_render)
+    used_images = {node.image for material in bpy.data.materials if material.use_nodes
+                   for node in material.node_tree.nodes if getattr(node, "image", None) is not None}
+    stats["texture_pixels"] = sum(image.size[0] * image.size[1] for image in used_images)
+
+    scale = render.resolution_percentage / 100
+    stats["pixels"] = int(render.resolution_x * scale) * int(render.resolution_y * scale)
+    from bake_telemetry import render_samples
+    stats["samples"] = render_samples(scene) or 1
+    stats["motion_blur"] = bool(render.use_motion_blur)
+    stats["render_frames"] = scene.frame_end - scene.frame_start + 1
+    return stats
+
+def work_terms(stats):
+    """Work measures of a scene (the model's inputs), in convenient units"""
+    steps = stats["bake_frames"] * stats["substeps"]
+    body_steps = steps * stats["active_bodies"]
+    pixel_samples = stats["pixels"] * stats["samples"] / 1e6
+    return {
+        "constant": 1.0,
+        "body_steps": body_steps,
+        "solver_work": body_steps * stats["solver_iterations"],
+        "mesh_collision_steps": steps * stats["mesh_collision_polygons"],
+        "particle_frames": stats["bake_frames"] * stats["particles"],
+        "pixel_samples": pixel_samples,
+        "light_pixel_samples": pixel_samples * stats["lights"],
+        "scene_polygons": stats["polygons"] / 1e6,
+        "blur_pixel_samples": pixel_samples if stats["motion_blur"] else 0.0,
+        "particles": stats["particles"] / 1e3,
+        "texture_pixels": stats["texture_pixels"] / 1e6,
+        "pixels": stats["pixels"] / 1e6,
+        "rigid_bodies": stats["rigid_bodies"] / 1e3,
+    }
+
+def fit_nonnegative(features, targets):
+    """Least squares with non-negative coefficients (drop the most negative term and refit)"""
+    active = list(range(features.shape[1]))
+    coefficients = np.zeros(features.shape[1])
+    while active:
+        solution = np.linalg.lstsq(features[:, active], targets, rcond=None)[0]
+        if np.all(solution >= 0):
+            coefficients[active] = solution
+            break
+        active.pop(int(np.argmin(solution)))
+    return coefficients
+
+def fit_model(runs):
+    """Per-target coefficients from measured runs; returns the model dict"""
+    model = {"runs": len(runs), "targets": {}}
+    for target, terms in TERMS.items():
+        rows = [run for run in runs if run.get(target) is not None]
+        if target == "render_seconds_per_frame":
+            engine = rows[-1]["stats"]["engine"] if rows else None
+            rows = [run for run in rows if run["stats"]["engine"] == engine]
+        prior = np.array([PRIOR[target][term] for term in terms])
+        entry = {"terms": list(terms), "coefficients": prior.tolist(), "calibrated": False, "samples": len(rows)}
+        if rows:
+            features = np.array([[work_terms(run["stats"])[term] for term in terms] for run in rows])
+            targets = np.array([run[target] for run in rows], dtype=np.float64)
+            # Scale columns so the solve is not dominated by the units of each term
+            scale = np.maximum(np.abs(features).max(axis=0), 1e-12)
+            if len(rows) > len(terms):
+                coefficients = fit_nonnegative(features / scale, targets) / scale
+            else:
+                # Too few runs for every term: only fit the overall scale of the prior
+                predicted = features @ prior
+                coefficients = prior * float(predicted @ targets / max(predicted @ predicted, 1e-12))
+            residual = features @ coefficients - targets
+            entry.update({"coefficients": coefficients.tolist(), "calibrated": True,
+                          "relative_error": float(np.sqrt(np.mean((residual / np.maximum(targets, 1e-9)) ** 2)))})
+            if target == "render_seconds_per_frame":
+                entry["engine"] = engine
+        model["targets"][target] = entry
+    return model
+
+def calibration_path(directory=CALIBRATION_DIR, host=None):
+    """Calibration file of a host"""
+    return os.path.join(directory, f"{host or socket.gethostname()}.json")
+
+def load_calibration(path=None):
+    """Measured runs of this host (empty list when none are recorded)"""
+    path = path or calibration_path()
+    if not os.path.exists(path):
+        return []
+    with open(path) as f:
+        return json.load(f)["runs"]
+
+def record_run(run, path=None):
+    """Append one measured run to the host's calibration file"""
+    path = path or calibration_path()
+    runs = load_calibration(path) + [run]
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    with open(path + ".partial", "w") as f:
+        json.dump({"host": socket.gethostname(), "runs": runs}, f, indent=1)
+    os.replace(path + ".partial", path)
+    return len(runs)
+
+def peak_memory_mb():
+    """Peak resident memory of this process in MB"""
+    import resource
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / (1024 * 1024) if os.uname().sysname == "Darwin" else peak / 1024
+
+def measure_run(scene=None, render_frames=1):
+    """Bake the scene from scratch and render a few frames, timing both; returns a run record"""
+    scene = scene or bpy.context.scene
+    stats = scene_stats(scene)
+    run = {"time": time.strftime("%Y-%m-%dT%H:%M:%S"), "blender": bpy.app.version_string, "stats": stats}
+
+    if scene.rigidbody_world:
+        scene.frame_set(scene.frame_start)
+        bpy.ops.ptcache.free_bake_all()
+        started = time.perf_counter()
+        bpy.ops.ptcache.bake_all(bake=True)
+        run["bake_seconds"] = time.perf_counter() - started
+
+    if render_frames:
+        middle = (scene.frame_start + scene.frame_end) // 2
+        seconds = []
+        for frame in range(middle, min(middle + render_frames, scene.frame_end + 1)):
+            scene.frame_set(frame)
+            started = time.perf_counter()
+            bpy.ops.render.render()
+            seconds.append(time.perf_counter() - started)
+        run["render_seconds_per_frame"] = sum(seconds) / len(seconds)
+    run["peak_memory_mb"] = peak_memory_mb()
+    return run
+
+def predict(stats, model):
+    """Estimated bake seconds, render seconds per frame and total, and peak memory"""
+    terms = work_terms(stats)
+    estimate = {}
+    for target, entry in model["targets"].items():
+        value = sum(coefficient * terms[term] for term, coefficient in zip(entry["terms"], entry["coefficients"]))
+        estimate[target] = value if target != "bake_seconds" or stats["bake_frames"] else 0.0
+    estimate["render_seconds"] = estimate["render_seconds_per_frame"] * stats["render_frames"]
+    render_entry = model["targets"]["render_seconds_per_frame"]
+    estimate["calibrated"] = all(entry["calibrated"] for entry in model["targets"].values()) and \
+        render_entry.get("engine") in (None, stats["engine"])
+    return estimate
+
+def estimate_costs(scene=None, model=None):
+    """Statistics and cost estimate for a scene, using this host's calibration"""
+    scene = scene or bpy.context.scene
+    model = model or fit_model(load_calibration())
+    stats = scene_stats(scene)
+    return stats, predict(stats, model)
+
+def check_budget(stats, estimate, model, bake_budget=None, render_budget=None, memory_budget=None):
+    """Warnings for every budget the estimate exceeds"""
+    warnings = []
+    if bake_budget is not None and estimate["bake_seconds"] > bake_budget:
+        # Bake work grows with substeps; suggest what would fit instead of changing the physics
+        fixed = sum(coefficient * work_terms(stats)[term] for term, coefficient in
+                    zip(model["targets"]["bake_seconds"]["terms"], model["targets"]["bake_seconds"]["coefficients"])
+                    if term in ("constant", "particle_frames"))
+        per_substep = (estimate["bake_seconds"] - fixed) / max(stats["substeps"], 1e-9)
+        fitting = int((bake_budget - fixed) / per_substep) if per_substep > 0 else 0
+        warnings.append(f"Bake: {estimate['bake_seconds']:.0f}s over the {bake_budget:.0f}s budget"
+                        + (f"; {fitting} substeps per frame would fit" if fitting >= 1 else ""))
+    if render_budget is not None and estimate["render_seconds"] > render_budget:
+        warnings.append(f"Render: {estimate['render_seconds']:.0f}s for {stats['render_frames']} frames, "
+                        f"over the {render_budget:.0f}s budget")
+    if memory_budget is not None and estimate["peak_memory_mb"] > memory_budget:
+        warnings.append(f"Memory: {estimate['peak_memory_mb']:.0f} MB peak, over the {memory_budget:.0f} MB budget")
+    return warnings
+
+def downgrade_to_budget(scene=None, model=None, render_budget=None, memory_budget=None):
+    """Step down the render profile until render time and memory fit; returns the profile or None"""
+    from render_profiles import active_profile_name, apply_profile
+
+    scene = scene or bpy.context.scene
+    model = model or fit_model(load_calibration())
+    current = active_profile_name(scene)
+    start = DOWNGRADE_ORDER.index(current) if current in DOWNGRADE_ORDER else 0
+    for name in DOWNGRADE_ORDER[start:]:
+        if name != current:
+            apply_profile(name, scene)
+        stats, estimate = estimate_costs(scene, model)
+        render_ok = render_budget is None or estimate["render_seconds"] <= render_budget
+        memory_ok = memory_budget is None or estimate["peak_memory_mb"] <= memory_budget
+        if render_ok and memory_ok:
+            return name
+    return None
+
+def print_estimate(stats, estimate):
+    """Print the scene statistics and the estimate"""
+    print("=" * 60)
+    print("COST ESTIMATE" + ("" if estimate["calibrated"] else " (uncalibrated: rough coefficients)"))
+    print("=" * 60)
+    shapes = ", ".join(f"{count} {shape.lower()}" for shape, count in sorted(stats["collision_shapes"].items()))
+    print(f"  Rigid bodies:  {stats['rigid_bodies']} ({shapes or 'none'}), {stats['substeps']:g} substeps, "
+          f"{stats['bake_frames']} frames")
+    print(f"  Render:        {stats['engine']}, {stats['pixels'] / 1e6:.2f} MP x {stats['samples']} samples, "
+          f"{stats['polygons']} polygons, {stats['particles']} particles, {stats['lights']} lights")
+    print(f"  Bake:          {estimate['bake_seconds']:.1f}s")
+    print(f"  Render:        {estimate['render_seconds_per_frame']:.2f}s per frame, "
+          f"{estimate['render_seconds'] / 60:.1f} min for {stats['render_frames']} frames")
+    print(f"  Peak memory:   {estimate['peak_memory_mb']:.0f} MB")
+    print("=" * 60)
+
+def main(argv=None):
+    """Command line entry: estimate (or calibrate) the open or built scene"""
+    import argparse
+    import scenarios
+
+    parser = argparse.ArgumentParser(description="Pre-flight bake, render and memory estimate")
+    parser.add_argument("--scenario", choices=sorted(scenarios.SCENARIOS), default=None)
+    parser.add_argument("--calibration", default=None, help="Calibration file (default: cost_calibration/<host>.json)")
+    parser.add_argument("--calibrate", action="store_true", help="Measure this scene and add it to the calibration")
+    parser.add_argument("--render-frames", type=int, default=1, help="Frames rendered while calibrating")
+    parser.add_argument("--bake-budget", type=float, default=None, help="Seconds")
+    parser.add_argument("--render-budget", type=float, default=None, help="Seconds for the whole frame range")
+    parser.add_argument("--memory-budget", type=float, default=None, help="MB")
+    parser.add_argument("--downgrade", action="store_true", help="Lower the render profile until it fits")
+    parser.add_argument("--report", default=None, help="Write statistics and estimate as JSON")
+    parser.add_argument("--save", default=None, help="Save the .blend afterwards")
+    args = parser.parse_args(scenarios.script_args() if argv is None else argv)
+
+    if args.scenario:
+        scenarios.run_scenario(args.scenario)
+    path = args.calibration or calibration_path()
+    if args.calibrate:
+        run = measure_run(render_frames=args.render_frames)
+        count = record_run(run, path)
+        print(f"Calibration: run {count} recorded in {path}")
+
+    model = fit_model(load_calibration(path))
+    stats, estimate = estimate_costs(model=model)
+    print_estimate(stats, estimate)
+    warnings = check_budget(stats, estimate, model, args.bake_budget, args.render_budget, args.memory_budget)
+    for warning in warnings:
+        print(f"WARNING: {warning}")
+    if warnings and args.downgrade and (args.render_budget is not None or args.memory_budget is not None):
+        profile = downgrade_to_budget(model=model, render_budget=args.render_budget, memory_budget=args.memory_budget)
+        if profile:
+            stats, estimate = estimate_costs(model=model)
+            print(f"Downgraded to the '{profile}' profile: {estimate['render_seconds'] / 60:.1f} min render, "
+                  f"{estimate['peak_memory_mb']:.0f} MB")
+        else:
+            print("Even the draft profile does not fit the budget")
+    if args.report:
+        with open(args.report, "w") as f:
+            json.dump({"stats": stats, "estimate": estimate, "warnings": warnings}, f, indent=2)
+    if args.save:
+        bpy.ops.wm.save_as_mainfile(filepath=bpy.path.abspath(args.save))
+
+if __name__ == "__main__":
+    import sys
+    sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+    main()
@@ -5,9 +5,23 @@ Complete script for creating a physics-based domino chain reaction animation
 
 import bpy
 import math
+import os
 import random
 from mathutils import Vector
 
+try:
+    from pipeline_profiler import profile_phase
+except ImportError:
+    # Profiling is optional; without the helper module phases are no-ops
+    from contextlib import nullcontext as profile_phase
+
+try:
+    from image_cache import load_image
+except ImportError:
+    # Without the cache module, at least reuse an image that is already loaded
+    def load_image(image_path):
+        return bpy.data.images.load(image_path, check_existing=True)
+
 def clear_scene():
     """Clear all objects from the current scene"""
     bpy.ops.object.select_all(action='SELECT')
@@ -52,6 +66,14 @@ def create_material(name, color, roughness=0.5, metallic=0.0):
     
     return mat
 
+def dust_material():
+    """The shared semi-transparent dust material, created on first use"""
+    mat = bpy.data.materials.get("DustMaterial")
+    if mat is None:
+        mat = create_material("DustMaterial", (0.6, 0.5, 0.4, 0.5))
+        mat.blend_method = 'BLEND'
+    return mat
+
 def apply_material(obj, material):
     """Apply material to object"""
     if obj.data.materials:
@@ -73,9 +95,9 @@ def create_textured_material(name, image_path):
     tex_coord = mat.node_tree.nodes.new(type='ShaderNodeTexCoord')
     image_tex = mat.node_tree.nodes.new(type='ShaderNodeTexImage')
     
-    # Load image
+    # Load image (once per session, at the active render profile's proxy size)
     try:
-        image = bpy.data.images.load(image_path)
+        image = load_image(image_path)
         image_tex.image = image
     except:
         print(f"Could not load image: {image_path}")
@@ -125,31 +147,31 @@ def create_gradient_material(name, color1, color2):
     
     return mat
 
-def setup_domino_scene():
+def setup_domino_scene(num_dominoes=15, spacing=0.65, domino_width=0.3, domino_height=2.0, domino_depth=0.8):
     """Create dominoes and ground"""
     # Create FLAT ground (no tilt to prevent dominoes falling by themselves)
-    bpy.ops.mesh.primitive_plane_add(size=20, location=(0, 0, 0))
+    # Grow the ground for long layouts so the last dominoes still land on it
+    ground_size = max(20, 2 * (abs(-5 + num_dominoes * spacing) + 5))
+    bpy.ops.mesh.primitive_plane_add(size=ground_size, location=(0, 0, 0))
     ground = bpy.context.active_object
     ground.name = "Ground"
     ground.rotation_euler = (0, 0, 0)  # Ensure ground is perfectly flat
     
     # Create and apply ground material
-    try:
-        ground_mat = create_textured_material("GroundMaterial", "//wood_texture.jpg")
-    except:
-        ground_mat = create_gradient_material("GroundMaterial", 
-                                            (0.15, 0.1, 0.05, 1.0), 
-                                            (0.25, 0.15, 0.1, 1.0))
-        ground_mat.node_tree.nodes.get('Principled BSDF').inputs['Roughness'].default_value = 0.8
-    apply_material(ground, ground_mat)
+    with profile_phase("materials"):
+        try:
+            ground_mat = create_textured_material("GroundMaterial", "//wood_texture.jpg")
+        except:
+            ground_mat = create_gradient_material("GroundMaterial", 
+                                                (0.15, 0.1, 0.05, 1.0), 
+                                                (0.25, 0.15, 0.1, 1.0))
+            ground_mat.node_tree.nodes.get('Principled BSDF').inputs['Roughness'].default_value = 0.8
+        apply_material(ground, ground_mat)
     
     # Create dominoes in a STRAIGHT line (no curve to prevent instability)
+    # Defaults: spacing 0.65 (closer spacing for reliable chain reaction),
+    # 15 dominoes (reduced for better performance)
     dominoes = []
-    domino_width = 0.3
-    domino_height = 2.0
-    domino_depth = 0.8
-    spacing = 0.65  # Closer spacing for reliable chain reaction
-    num_dominoes = 15  # Reduced for better performance
     
     for i in range(num_dominoes):
         x_pos = -5 + i * spacing
@@ -180,28 +202,32 @@ def setup_domino_scene():
             1.0
         )
         
-        domino_mat = create_material(f"DominoMaterial_{i:02d}", color, roughness=0.3, metallic=0.1)
-        apply_material(domino, domino_mat)
+        with profile_phase("materials"):
+            domino_mat = create_material(f"DominoMaterial_{i:02d}", color, roughness=0.3, metallic=0.1)
+            apply_material(domino, domino_mat)
         
         dominoes.append(domino)
     
     return dominoes, ground
 
-def setup_physics(dominoes, ground):
+def setup_physics(dominoes, ground, mass=0.5, mass_jitter=0.1, friction=0.4, seed=None):
     """Set up rigid body physics for all objects"""
+    # Repeatable mass variation when a seed is given (parameter sweeps)
+    rng = random.Random(seed) if seed is not None else random
+    
     # Add rigid body physics to all dominoes
     for i, domino in enumerate(dominoes):
         bpy.context.view_layer.objects.active = domino
         bpy.ops.rigidbody.object_add()
         domino.rigid_body.type = 'ACTIVE'
-        domino.rigid_body.mass = 0.5
-        domino.rigid_body.friction = 0.4
+        domino.rigid_body.mass = mass
+        domino.rigid_body.friction = friction
         domino.rigid_body.restitution = 0.1  # Low bounciness for realistic dominoes
         domino.rigid_body.linear_damping = 0.1
         domino.rigid_body.angular_damping = 0.1
         
         # Vary mass slightly for more interesting dynamics
-        domino.rigid_body.mass = 0.4 + random.random() * 0.2
+        domino.rigid_body.mass = mass - mass_jitter + rng.random() * 2 * mass_jitter
     
     # Add rigid body physics to ground
     bpy.context.view_layer.objects.active = ground
@@ -254,9 +280,10 @@ def create_trigger_ball():
     ball.name = "TriggerBall"
     
     # Create ball material
-    ball_mat = create_material("TriggerBallMaterial", (0.8, 0.2, 0.2, 1.0), 
-                              roughness=0.1, metallic=0.3)
-    apply_material(ball, ball_mat)
+    with profile_phase("materials"):
+        ball_mat = create_material("TriggerBallMaterial", (0.8, 0.2, 0.2, 1.0), 
+                                  roughness=0.1, metallic=0.3)
+        apply_material(ball, ball_mat)
     
     # Add physics to ball with higher mass for more impact
     bpy.ops.rigidbody.object_add()
@@ -268,88 +295,105 @@ def create_trigger_ball():
     
     return ball
 
-def animate_falling_dominoes():
-    """Main animation function"""
+def animate_falling_dominoes(num_dominoes=15, spacing=0.65, domino_width=0.3, domino_height=2.0,
+                             domino_depth=0.8, mass=0.5, mass_jitter=0.1, friction=0.4, substeps=10,
+                             ball_start_offset=3.0, ball_contact_frame=25, frame_end=180, seed=None,
+                             impact_dust=False):
+    """Main animation function (defaults reproduce the hand-tuned scene)"""
     print("Setting up falling dominoes animation...")
     
     # Clear and setup scene
-    clear_scene()
-    setup_scene()
-    
-    # Create objects
-    dominoes, ground = setup_domino_scene()
-    
-    # Create trigger ball
-    trigger_ball = create_trigger_ball()
+    with profile_phase("clear"):
+        clear_scene()
+    with profile_phase("setup"):
+        setup_scene()
+        
+        # Create objects
+        dominoes, ground = setup_domino_scene(num_dominoes, spacing, domino_width, domino_height, domino_depth)
+        
+        # Create trigger ball
+        trigger_ball = create_trigger_ball()
     
     # Set up physics
-    setup_physics(dominoes, ground)
+    with profile_phase("physics"):
+        setup_physics(dominoes, ground, mass=mass, mass_jitter=mass_jitter, friction=friction, seed=seed)
     
     # Set up camera
-    setup_camera()
+    with profile_phase("camera"):
+        setup_camera()
     
     # Set animation range
     bpy.context.scene.frame_start = 1
-    bpy.context.scene.frame_end = 180
-    
-    # Animate trigger ball with kinematic/physics hybrid approach
-    # Get first domino position for accurate targeting
-    first_domino = dominoes[0]
-    domino_x = first_domino.location.x
-    domino_y = first_domino.location.y
-    
-    # Use kinematic animation to push ball HORIZONTALLY on flat ground
-    trigger_ball.rigid_body.kinematic = True
+    bpy.context.scene.frame_end = frame_end
+    
+    with profile_phase("physics"):
+        # Animate trigger ball with kinematic/physics hybrid approach
+        # Get first domino position for accurate targeting
+        first_domino = dominoes[0]
+        domino_x = first_domino.location.x
+        domino_y = first_domino.location.y
+        
+        # Use kinematic animation to push ball HORIZONTALLY on flat ground
+        trigger_ball.rigid_body.kinematic = True
+        
+        bpy.context.scene.frame_set(1)
+        trigger_ball.location = (domino_x - ball_start_offset, domino_y, 1.0)  # Same height as domino base
+        trigger_ball.keyframe_insert(data_path="location", frame=1)
+        trigger_ball.rigid_body.keyframe_insert("kinematic", frame=1)
+        
+        # Ball rolls HORIZONTALLY toward the domino (no vertical drop)
+        bpy.context.scene.frame_set(ball_contact_frame)
+        trigger_ball.location = (domino_x - 0.6, domino_y, 1.0)  # Horizontal movement only
+        trigger_ball.keyframe_insert(data_path="location", frame=ball_contact_frame)
+        trigger_ball.rigid_body.keyframe_insert("kinematic", frame=ball_contact_frame)
+        
+        # Switch to physics simulation after the contact frame
+        bpy.context.scene.frame_set(ball_contact_frame + 1)
+        trigger_ball.rigid_body.kinematic = False
+        trigger_ball.rigid_body.keyframe_insert("kinematic", frame=ball_contact_frame + 1)
+        
+        # Set up rigid body world
+        if not bpy.context.scene.rigidbody_world:
+            bpy.ops.rigidbody.world_add()
+        
+        rigidbody_world = bpy.context.scene.rigidbody_world
+        
+        # Safely add objects to rigid body world (check if already added)
+        if trigger_ball.name not in rigidbody_world.collection.objects:
+            rigidbody_world.collection.objects.link(trigger_ball)
+        for domino in dominoes:
+            if domino.name not in rigidbody_world.collection.objects:
+                rigidbody_world.collection.objects.link(domino)
+        if ground.name not in rigidbody_world.collection.objects:
+            rigidbody_world.collection.objects.link(ground)
+        
+        # Configure physics simulation
+        rigidbody_world.point_cache.frame_start = 1
+        rigidbody_world.point_cache.frame_end = frame_end
+        
+        # Set physics substeps for better accuracy (Blender 4.3+ attributes)
+        rigidbody_world.substeps_per_frame = substeps
+        rigidbody_world.solver_iterations = 20
     
-    bpy.context.scene.frame_set(1)
-    trigger_ball.location = (domino_x - 3.0, domino_y, 1.0)  # Same height as domino base
-    trigger_ball.keyframe_insert(data_path="location", frame=1)
-    trigger_ball.rigid_body.keyframe_insert("kinematic", frame=1)
-    
-    # Ball rolls HORIZONTALLY toward the domino (no vertical drop)
-    bpy.context.scene.frame_set(25)
-    trigger_ball.location = (domino_x - 0.6, domino_y, 1.0)  # Horizontal movement only
-    trigger_ball.keyframe_insert(data_path="location", frame=25)
-    trigger_ball.rigid_body.keyframe_insert("kinematic", frame=25)
-    
-    # Switch to physics simulation after frame 25
-    bpy.context.scene.frame_set(26)
-    trigger_ball.rigid_body.kinematic = False
-    trigger_ball.rigid_body.keyframe_insert("kinematic", frame=26)
-    
-    # Set up rigid body world
-    if not bpy.context.scene.rigidbody_world:
-        bpy.ops.rigidbody.world_add()
-    
-    rigidbody_world = bpy.context.scene.rigidbody_world
-    
-    # Safely add objects to rigid body world (check if already added)
-    if trigger_ball.name not in rigidbody_world.collection.objects:
-        rigidbody_world.collection.objects.link(trigger_ball)
-    for domino in dominoes:
-        if domino.name not in rigidbody_world.collection.objects:
-            rigidbody_world.collection.objects.link(domino)
-    if ground.name not in rigidbody_world.collection.objects:
-        rigidbody_world.collection.objects.link(ground)
-    
-    # Configure physics simulation
-    rigidbody_world.point_cache.frame_start = 1
-    rigidbody_world.point_cache.frame_end = 180
-    
-    # Set physics substeps for better accuracy (Blender 4.3+ attributes)
-    rigidbody_world.substeps_per_frame = 10
-    rigidbody_world.solver_iterations = 20
-    
-    # Add some visual effects
-    add_particle_effects()
+    # Add some visual effects (impact dust is added after the bake instead)
+    if not impact_dust:
+        with profile_phase("particles"):
+            add_particle_effects()
     
     # Bake physics simulation
     print("Baking physics simulation...")
-    bpy.context.scene.frame_set(1)
-    bpy.ops.ptcache.bake_all(bake=True)
+    with profile_phase("bake"):
+        bpy.context.scene.frame_set(1)
+        bpy.ops.ptcache.bake_all(bake=True)
+    
+    if impact_dust:
+        # Dust bursts only where dominoes actually land (needs the baked result)
+        with profile_phase("particles"):
+            from impact_dust import add_impact_dust
+            add_impact_dust(dominoes)
     
     print("Falling dominoes animation setup complete!")
-    print("Animation frames: 1-180")
+    print(f"Animation frames: 1-{frame_end}")
     print("Press Spacebar to play the animation in Blender")
 
 def add_particle_effects():
@@ -389,9 +433,8 @@ def add_particle_effects():
     settings.size_random = 0.5
     
     # Create dust material
-    dust_mat = create_material("DustMaterial", (0.6, 0.5, 0.4, 0.5))
-    dust_mat.blend_method = 'BLEND'
-    apply_material(dust_plane, dust_mat)
+    with profile_phase("materials"):
+        apply_material(dust_plane, dust_material())
 
 def setup_render_settings():
     """Configure render settings for output"""
@@ -424,9 +467,21 @@ def setup_render_settings():
         os.makedirs(output_dir)
     bpy.context.scene.render.filepath = os.path.join(output_dir, "falling_dominoes_animation.mp4")
 
-def render_animation():
-    """Render the animation to file"""
+def render_animation(cache_dir=None, resumable=False):
+    """Render the animation to file (as a cached or resumable frame sequence on request)"""
     setup_render_settings()
+    video_path = bpy.path.abspath(bpy.context.scene.render.filepath)
+    frames_dir = os.path.splitext(video_path)[0] + "_frames"
+    if cache_dir:
+        # PNG sequence that skips frames whose visible state was rendered before
+        from render_cache import render_with_cache
+        render_with_cache(frames_dir, cache_dir)
+        return
+    if resumable:
+        # Frame files that survive a crash, encoded to the video while rendering
+        from sequence_render import render_sequence
+        render_sequence(frames_dir, video_path=video_path)
+        return
     print("Rendering animation... This may take a while.")
     bpy.ops.render.render(animation=True)
     print(f"Animation rendered to: {bpy.context.scene.render.filepath}")
@@ -0,0 +1,238 @@
+"""
+Blender Python Animation: Wavefront Follow Camera
+Fits a smooth, low-key-count camera path that keeps the falling dominoes in frame
+
+The solver reads the baked domino transforms once (see baked_transforms.py), finds the
+dominoes that are currently toppling in every frame, smooths the centre and spread of that
+wavefront and keeps only the keyframes needed to stay within a position tolerance.
+The camera looks at an animated "CameraTarget" empty through a Track To constraint.
+
+Usage from the command line:
+    blender -b --python follow_camera.py -- --scenario dominoes --save dominoes_follow.blend
+"""
+
+import math
+import os
+
+import numpy as np
+
+try:
+    import bpy
+except ImportError:  # The solver itself runs on plain arrays
+    bpy = None
+
+def wavefront_track(transforms, fps=24.0, speed_threshold=math.radians(20.0), min_tilt=math.radians(3.0)):
+    """Per-frame centre (F, 3) and spread (F,) of the objects that are currently toppling
+
+    Frames where nothing is toppling get NaN and are filled in afterwards.
+    """
+    from baked_transforms import tilt_angles
+
+    tilt = tilt_angles(transforms.astype(np.float32))  # (F, N)
+    # Angular speed in radians per second with central differences
+    speed = np.abs(np.gradient(tilt, axis=0)) * fps
+    moving = (speed > speed_threshold) & (tilt > min_tilt)
+
+    weights = moving.astype(np.float32)
+    counts = weights.sum(axis=1)
+    positions = transforms[:, :, 0:3].astype(np.float32)
+
+    centre = np.full((tilt.shape[0], 3), np.nan, dtype=np.float64)
+    active = counts > 0
+    centre[active] = (positions[active] * weights[active, :, None]).sum(axis=1) / counts[active, None]
+
+    # Spread: largest horizontal distance of a moving object from the centre
+    offsets = positions[:, :, 0:2] - np.nan_to_num(centre[:, None, 0:2])
+    distance = np.where(moving, np.linalg.norm(offsets, axis=2), 0.0)
+    spread = np.where(active, distance.max(axis=1), np.nan)
+    return centre, spread
+
+def fill_gaps(values, fallback_start, fallback_end):
+    """Linearly interpolate NaN rows; hold the fallbacks before the first and after the last value"""
+    values = np.array(values, dtype=np.float64)
+    flat = values.reshape(len(values), -1)
+    valid = ~np.isnan(flat).any(axis=1)
+    frames = np.arange(len(values))
+    if not valid.any():
+        flat[:] = np.asarray(fallback_start, dtype=np.float64).reshape(1, -1)
+        return values
+    first, last = frames[valid][0], frames[valid][-1]
+    for column in range(flat.shape[1]):
+        flat[:, column] = np.interp(frames, frames[valid], flat[valid, column])
+    flat[:first] = np.asarray(fallback_start, dtype=np.float64).reshape(1, -1)
+    flat[last + 1:] = flat[last] if fallback_end is None else np.asarray(fallback_end).reshape(1, -1)
+    return values
+
+def smooth(values, radius):
+    """Gaussian smoothing along the frame axis with edge padding"""
+    if radius <= 0:
+        return values
+    offsets = np.arange(-3 * radius, 3 * radius + 1)
+    kernel = np.exp(-0.5 * (offsets / radius) ** 2)
+    kernel /= kernel.sum()
+    flat = values.reshape(len(values), -1)
+    padded = np.pad(flat, ((3 * radius, 3 * radius), (0, 0)), mode="edge")
+    result = np.stack([np.convolve(padded[:, c], kernel, mode="valid") for c in range(flat.shape[1])], axis=1)
+    return result.reshape(values.shape)
+
+def simplify_keys(points, tolerance):
+    """Ramer-Douglas-Peucker on a (F, D) curve; returns the frame offsets worth keying"""
+    keep = np.zeros(len(points), dtype=bool)
+    keep[0] = keep[-1] = True
+    stack = [(0, len(points) - 1)]
+    while stack:
+        start, end = stack.pop()
+        if end - start < 2:
+            continue
+        # Distance of each in-between point from the straight (linear in time) segment
+        t = (np.arange(start + 1, end) - start) / (end - start)
+        line = points[start] + t[:, None] * (points[end] - points[start])
+        error = np.linalg.norm(points[start + 1:end] - line, axis=1)
+        worst = int(np.argmax(error))
+        if error[worst] > tolerance:
+            split = start + 1 + worst
+            keep[split] = True
+            stack.append((start, split))
+            stack.append((split, end))
+    return np.flatnonzero(keep)
+
+def world_half_extents(transforms, half_extents):
+    """World-space (axis-aligned) half sizes (F, N, 3) of each object's box for (F, N, 10) transforms"""
+    from baked_transforms import quaternion_to_matrix
+
+    rotation = np.abs(quaternion_to_matrix(transforms[..., 3:7].astype(np.float64)))
+    extents = np.asarray(half_extents, dtype=np.float64)[None, :, :] * transforms[..., 7:10]
+    return np.einsum("fnij,fnj->fni", rotation, np.abs(extents))
+
+def solve_camera_path(transforms, half_extents, fps=24.0, angle_x=math.radians(50.0), angle_y=math.radians(30.0),
+                      view_direction=(0.0, -0.9, 0.45), margin=1.5, min_distance=6.0,
+                      smoothing=6, tolerance=0.15):
+    """Camera and look-at paths (F, 3) for (frames, objects, 10) transforms, plus the keyed frame offsets
+
+    half_extents: (N, 3) local half sizes of the objects, as stored in the transform index.
+    """
+    centre, spread = wavefront_track(transforms, fps=fps)
+    start_position = transforms[0, 0, 0:3]
+    centre = fill_gaps(centre, start_position, None)
+    spread = fill_gaps(spread, [0.0], None)
+
+    centre = smooth(centre, smoothing)
+    spread = smooth(spread, smoothing * 2)
+
+    # Pull back far enough that the spread and the object boxes (plus margin) fit both field-of-view axes
+    extents = world_half_extents(transforms, half_extents)
+    half_width = spread + smooth(extents[:, :, 0:2].max(axis=(1, 2)), smoothing) + margin
+    half_height = smooth(extents[:, :, 2].max(axis=1), smoothing) + margin
+    distance = np.maximum(half_width / math.tan(angle_x / 2), half_height / math.tan(angle_y / 2))
+    distance = np.maximum(distance, min_distance)
+
+    direction = np.asarray(view_direction, dtype=np.float64)
+    direction /= np.linalg.norm(direction)
+    target = centre.copy()
+    camera = target + distance[:, None] * direction[None, :]
+
+    keys = simplify_keys(np.concatenate([camera, target], axis=1), tolerance)
+    return camera, target, keys
+
+def _key_vector_fcurves(obj, data_path, frames, values):
+    """Insert linear keyframes for a 3-component property in bulk
+
+    Linear, because simplify_keys measured its tolerance against straight segments between
+    the kept keys; Bezier handles would bend the path away from what was checked.
+    """
+    anim = obj.animation_data or obj.animation_data_create()
+    if anim.action is None:
+        anim.action = bpy.data.actions.new(name=f"{obj.name}Action")
+    action = anim.action
+    for axis in range(3):
+        fcurve = action.fcurves.find(data_path, index=axis)
+        if fcurve is not None:
+            action.fcurves.remove(fcurve)
+        fcurve = action.fcurves.new(data_path, index=axis)
+        fcurve.keyframe_points.add(len(frames))
+        coords = np.empty(len(frames) * 2, dtype=np.float32)
+        coords[0::2] = frames
+        coords[1::2] = values[:, axis]
+        fcurve.keyframe_points.foreach_set("co", coords)
+        for point in fcurve.keyframe_points:
+            point.interpolation = 'LINEAR'
+        fcurve.update()
+
+def apply_follow_camera(camera=None, transforms=None, index=None, prefix="Domino_", scene=None, **solver_args):
+    """Replace the hand-placed camera keys with a path that follows the toppling wavefront"""
+    from baked_transforms import sample_baked_transforms, select_objects
+
+    scene = scene or bpy.context.scene
+    camera = camera or scene.camera
+    if transforms is None:
+        world = scene.rigidbody_world
+        objects = [obj for obj in world.collection.objects if obj.name.startswith(prefix)]
+        objects.sort(key=lambda obj: obj.name)
+        transforms, index = sample_baked_transforms(objects, scene=scene)
+        half_extents = np.asarray(index["half_extents"])
+    else:
+        columns = select_objects(index, prefix)
+        transforms = np.asarray(transforms[:, columns])
+        half_extents = np.asarray(index["half_extents"])[columns]
+
+    solver_args.setdefault("fps", index["fps"])
+    solver_args.setdefault("angle_x", camera.data.angle_x)
+    solver_args.setdefault("angle_y", camera.data.angle_y)
+    camera_path, target_path, keys = solve_camera_path(transforms, half_extents, **solver_args)
+    frames = index["frame_start"] + keys
+
+    # Look-at target the camera tracks
+    target = bpy.data.objects.get("CameraTarget")
+    if target is None:
+        target = bpy.data.objects.new("CameraTarget", None)
+        scene.collection.objects.link(target)
+    _key_vector_fcurves(target, "location", frames, target_path[keys])
+
+    # Drop the old rotation keys; orientation now comes from the constraint
+    if camera.animation_data and camera.animation_data.action:
+        for fcurve in list(camera.animation_data.action.fcurves):
+            if fcurve.data_path == "rotation_euler":
+                camera.animation_data.action.fcurves.remove(fcurve)
+    _key_vector_fcurves(camera, "location", frames, camera_path[keys])
+
+    track = camera.constraints.get("FollowWavefront")
+    if track is None:
+        track = camera.constraints.new(type='TRACK_TO')
+        track.name = "FollowWavefront"
+    track.target = target
+    track.track_axis = 'TRACK_NEGATIVE_Z'
+    track.up_axis = 'UP_Y'
+
+    print(f"Follow camera: {len(keys)} keyframes over {len(camera_path)} frames")
+    return camera, target
+
+def main(argv=None):
+    """Command line entry: solve the follow camera for the open or built domino scene"""
+    import argparse
+    import time
+    import scenarios
+
+    parser = argparse.ArgumentParser(description="Fit a camera path to the baked domino wavefront")
+    parser.add_argument("--scenario", choices=sorted(scenarios.SCENARIOS), default=None)
+    parser.add_argument("--transforms", default=None, help="Use an exported .npy instead of reading the scene")
+    parser.add_argument("--tolerance", type=float, default=0.15, help="Allowed path error in metres")
+    parser.add_argument("--save", default=None, help="Save the .blend afterwards")
+    args = parser.parse_args(scenarios.script_args() if argv is None else argv)
+
+    if args.scenario:
+        scenarios.run_scenario(args.scenario)
+    transforms = index = None
+    if args.transforms:
+        from baked_transforms import load_baked_transforms
+        transforms, index = load_baked_transforms(args.transforms)
+
+    started = time.perf_counter()
+    apply_follow_camera(transforms=transforms, index=index, tolerance=args.tolerance)
+    print(f"Camera solved in {time.perf_counter() - started:.2f}s")
+    if args.save:
+        bpy.ops.wm.save_as_mainfile(filepath=bpy.path.abspath(args.save))
+
+if __name__ == "__main__":
+    import sys
+    sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+    main()
@@ -0,0 +1,225 @@
+"""
+Blender Python Animation: Camera Frustum Culling
+Keys hide_render/hide_viewport so objects outside the animated camera's view leave the render and viewport
+
+For every frame the camera frustum (view frame, clip range and a safety margin for shadows
+and reflections) is tested against every mesh object's oriented bounding box, all objects
+at once. Visibility is keyed only on the frames where it changes, so a field of thousands
+of dominoes or targets only costs BVH time and memory for what the camera can see.
+
+Run it after the bake: rigid bodies hidden from the viewport drop out of an unbaked simulation.
+Particle emitters and particle instance objects are never culled.
+
+Usage from the command line:
+    blender -b scene.blend --python frustum_culling.py -- --margin 1.5 --save culled.blend
+    blender -b --python frustum_culling.py -- --scenario dominoes --save culled.blend
+"""
+
+import os
+
+import numpy as np
+
+try:
+    import bpy
+except ImportError:  # The intersection math runs on plain arrays
+    bpy = None
+
+def frustum_planes(camera_matrix, view_frame, clip_start, clip_end, orthographic=False):
+    """Inward world-space planes (6, 4) as (normal, offset): inside when normal . p + offset >= 0
+
+    camera_matrix: (4, 4) row-major world matrix; view_frame: (4, 3) camera-space frame corners.
+    """
+    corners = np.asarray(view_frame, dtype=np.float64)
+    centre = corners.mean(axis=0)
+    planes = []
+    for i in range(4):
+        a, b = corners[i], corners[(i + 1) % 4]
+        # Side planes contain an edge of the view frame and the viewing direction
+        direction = np.array([0.0, 0.0, -1.0]) if orthographic else a
+        normal = np.cross(b - a, direction)
+        if np.dot(normal, centre - a) < 0:
+            normal = -normal
+        planes.append((normal / np.linalg.norm(normal), a))
+    planes.append((np.array([0.0, 0.0, -1.0]), np.array([0.0, 0.0, -clip_start])))
+    planes.append((np.array([0.0, 0.0, 1.0]), np.array([0.0, 0.0, -clip_end])))
+
+    rotation = camera_matrix[:3, :3]
+    result = np.empty((6, 4))
+    for i, (normal, point) in enumerate(planes):
+        world_normal = rotation @ normal
+        world_normal /= np.linalg.norm(world_normal)
+        world_point = camera_matrix[:3, :3] @ point + camera_matrix[:3, 3]
+        result[i, :3] = world_normal
+        result[i, 3] = -np.dot(world_normal, world_point)
+    return result
+
+def boxes_in_frustum(planes, matrices, box_centres, box_half_extents, margin=1.0):
+    """Which oriented boxes touch the frustum grown by a margin
+
+    planes: (6, 4); matrices: (N, 4, 4) row-major world matrices;
+    box_centres, box_half_extents: (N, 3) local bounding box centre and half size.
+    """
+    basis = matrices[:, :3, :3]
+    centres = np.einsum("nij,nj->ni", basis, box_centres) + matrices[:, :3, 3]
+    # Projected radius of each box onto each plane normal
+    spans = np.abs(np.einsum("pi,nik->npk", planes[:, :3], basis))
+    radius = (spans * box_half_extents[:, None, :]).sum(axis=2)
+    distance = centres @ planes[:, :3].T + planes[:, 3]
+    return np.all(distance >= -radius - margin, axis=1)
+
+def dilate_visibility(visible, frames):
+    """Keep objects visible a few frames before and after they are in view (motion blur, no popping)"""
+    result = visible.copy()
+    for step in range(1, frames + 1):
+        result[step:] |= visible[:-step]
+        result[:-step] |= visible[step:]
+    return result
+
+def cullable_objects(scene):
+    """Mesh objects that can safely be hidden (not particle emitters, particle instances or LOD levels)"""
+    protected = set()
+    for obj in scene.objects:
+        for system in obj.particle_systems:
+            protected.add(obj.name)
+            if system.settings.instance_object is not None:
+                protected.add(system.settings.instance_object.name)
+    # LOD levels and their collision proxies key their own visibility (see mesh_lod.py)
+    return sorted((obj for obj in scene.objects if obj.type == 'MESH' and obj.name not in protected
+                   and "lod_level" not in obj and "lod_proxy" not in obj), key=lambda obj: obj.name)
+
+def compute_visibility(objects, camera=None, frame_start=None, frame_end=None, scene=None, margin=1.0):
+    """(frames, objects) boolean visibility of objects for the animated camera"""
+    from baked_transforms import iter_frame_matrices
+
+    scene = scene or bpy.context.scene
+    camera = camera or scene.camera
+    frame_start = scene.frame_start if frame_start is None else frame_start
+    frame_end = scene.frame_end if frame_end is None else frame_end
+
+    bounds = np.array([[corner[:] for corner in obj.bound_box] for obj in objects], dtype=np.float64)
+    box_centres = (bounds.max(axis=1) + bounds.min(axis=1)) / 2
+    box_half_extents = (bounds.max(axis=1) - bounds.min(axis=1)) / 2
+
+    visible = np.zeros((frame_end - frame_start + 1, len(objects)), dtype=bool)
+    # The camera rides along in the same matrix read as the objects
+    for frame, matrices in iter_frame_matrices([camera] + list(objects), frame_start, frame_end, scene):
+        matrices = matrices.astype(np.float64)
+        data = camera.data
+        view_frame = [corner[:] for corner in data.view_frame(scene=scene)]
+        planes = frustum_planes(matrices[0], view_frame, data.clip_start, data.clip_end,
+                                orthographic=data.type == 'ORTHO')
+        visible[frame - frame_start] = boxes_in_frustum(planes, matrices[1:], box_centres, box_half_extents, margin)
+    return visible
+
+def key_constant_fcurve(obj, data_path, frames, values):
+    """Replace a property's keys with constant (stepped) keys"""
+    anim = obj.animation_data or obj.animation_data_create()
+    if anim.action is None:
+        anim.action = bpy.data.actions.new(name=f"{obj.name}Action")
+    action = anim.action
+    fcurve = action.fcurves.find(data_path)
+    if fcurve is not None:
+        action.fcurves.remove(fcurve)
+    fcurve = action.fcurves.new(data_path)
+    fcurve.keyframe_points.add(len(frames))
+    coords = np.empty(len(frames) * 2, dtype=np.float32)
+    coords[0::2] = frames
+    coords[1::2] = values
+    fcurve.keyframe_points.foreach_set("co", coords)
+    for point in fcurve.keyframe_points:
+        point.interpolation = 'CONSTANT'
+    fcurve.update()
+
+def _clear_culling_keys(obj):
+    """Remove the hide_render/hide_viewport keys culling added"""
+    action = obj.animation_data.action if obj.animation_data else None
+    if action is not None:
+        for data_path in ("hide_render", "hide_viewport"):
+            fcurve = action.fcurves.find(data_path)
+            if fcurve is not None:
+                action.fcurves.remove(fcurve)
+
+def _save_visibility(obj):
+    """Remember an object's own visibility the first time it is culled"""
+    if "culling_hide_render" not in obj:
+        obj["culling_hide_render"] = obj.hide_render
+        obj["culling_hide_viewport"] = obj.hide_viewport
+
+def remove_culling(objects):
+    """Drop culling keys and give the objects back the visibility they had before culling"""
+    for obj in objects:
+        _clear_culling_keys(obj)
+        obj.hide_render = bool(obj.get("culling_hide_render", False))
+        obj.hide_viewport = bool(obj.get("culling_hide_viewport", False))
+        for key in ("culling_hide_render", "culling_hide_viewport"):
+            if key in obj:
+                del obj[key]
+
+def apply_frustum_culling(objects=None, camera=None, frame_start=None, frame_end=None, scene=None,
+                          margin=1.0, pad_frames=1, viewport=True):
+    """Key hide_render (and hide_viewport) where each object enters or leaves the camera view"""
+    scene = scene or bpy.context.scene
+    world = scene.rigidbody_world
+    if world and world.enabled and world.point_cache and not world.point_cache.is_baked:
+        raise RuntimeError("Bake the rigid body simulation before culling (hidden bodies leave the simulation)")
+    objects = cullable_objects(scene) if objects is None else list(objects)
+    frame_start = scene.frame_start if frame_start is None else frame_start
+    frame_end = scene.frame_end if frame_end is None else frame_end
+
+    # Measure with everything shown so old culling keys do not hide objects from the matrix read
+    for obj in objects:
+        _save_visibility(obj)
+        _clear_culling_keys(obj)
+        obj.hide_render = False
+        obj.hide_viewport = False
+    visible = compute_visibility(objects, camera, frame_start, frame_end, scene, margin)
+    visible = dilate_visibility(visible, pad_frames)
+    # Objects hidden before culling stay hidden and get no keys for that property
+    hidden_render = np.array([bool(obj["culling_hide_render"]) for obj in objects], dtype=bool)
+    hidden_viewport = np.array([bool(obj["culling_hide_viewport"]) for obj in objects], dtype=bool)
+    for obj, render_hidden, viewport_hidden in zip(objects, hidden_render, hidden_viewport):
+        obj.hide_render = bool(render_hidden)
+        obj.hide_viewport = bool(viewport_hidden)
+
+    frames = np.arange(frame_start, frame_end + 1)
+    changes = np.zeros_like(visible)
+    changes[0] = True
+    changes[1:] = visible[1:] != visible[:-1]
+    keyed = 0
+    for i in np.flatnonzero(~visible.all(axis=0)):
+        rows = np.flatnonzero(changes[:, i])
+        hidden = (~visible[rows, i]).astype(np.float32)
+        if not hidden_render[i]:
+            key_constant_fcurve(objects[i], "hide_render", frames[rows], hidden)
+        if viewport and not hidden_viewport[i]:
+            key_constant_fcurve(objects[i], "hide_viewport", frames[rows], hidden)
+        keyed += not (hidden_render[i] and (hidden_viewport[i] or not viewport))
+
+    counts = visible.sum(axis=1)
+    print(f"Frustum culling: {keyed}/{len(objects)} objects keyed, "
+          f"{counts.mean():.0f} visible per frame on average (max {counts.max()}, min {counts.min()})")
+    return visible
+
+def main(argv=None):
+    """Command line entry: cull the open or built scene against its camera"""
+    import argparse
+    import scenarios
+
+    parser = argparse.ArgumentParser(description="Key object visibility from the camera frustum")
+    parser.add_argument("--scenario", choices=sorted(scenarios.SCENARIOS), default=None)
+    parser.add_argument("--margin", type=float, default=1.0, help="Extra distance around the frustum (shadows)")
+    parser.add_argument("--pad-frames", type=int, default=1, help="Frames to stay visible before/after")
+    parser.add_argument("--render-only", action="store_true", help="Leave viewport visibility alone")
+    parser.add_argument("--save", default=None, help="Save the .blend afterwards")
+    args = parser.parse_args(scenarios.script_args() if argv is None else argv)
+
+    if args.scenario:
+        scenarios.run_scenario(args.scenario)
+    apply_frustum_culling(margin=args.margin, pad_frames=args.pad_frames, viewport=not args.render_only)
+    if args.save:
+        bpy.ops.wm.save_as_mainfile(filepath=bpy.path.abspath(args.save))
+
+if __name__ == "__main__":
+    import sys
+    sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+    main()
@@ -0,0 +1,119 @@
+"""
+Blender Python Animation: Image Cache
+Loads each texture file once per session and serves half, quarter or eighth size proxies for drafts
+
+The first request for a texture at a reduced level writes all three proxies (1/2, 1/4, 1/8)
+to disk in one go, named by the file's content hash and modification time, so an edited
+texture gets fresh proxies and unchanged ones are never rebuilt. Which level a material
+gets comes from the active render profile (render_profiles.py); switching profiles swaps
+the images already in use.
+
+Usage inside Blender:
+    from image_cache import load_image
+    image = load_image("//wood_texture.jpg")          # Level from the active profile
+    image = load_image("//wood_texture.jpg", level=2)  # Quarter size
+"""
+
+import hashlib
+import os
+
+try:
+    import bpy
+except ImportError:  # Keeps the module importable outside Blender
+    bpy = None
+
+# Proxy levels: level n is 1 / 2**n of the full size
+PROXY_LEVELS = (1, 2, 3)
+
+# (absolute path, level) -> image name, for the images loaded in this session
+_session_images = {}
+# (absolute path, mtime, size) -> content key, so a file is hashed once per session
+_file_keys = {}
+
+def file_key(path):
+    """Content hash plus modification time of a file"""
+    stat = os.stat(path)
+    identity = (path, stat.st_mtime_ns, stat.st_size)
+    if identity not in _file_keys:
+        digest = hashlib.blake2b(digest_size=12)
+        with open(path, "rb") as f:
+            for block in iter(lambda: f.read(1 << 20), b""):
+                digest.update(block)
+        _file_keys[identity] = f"{digest.hexdigest()}_{stat.st_mtime_ns}"
+    return _file_keys[identity]
+
+def proxy_path(path, level, proxy_dir=None):
+    """Where the proxy of a texture at a level lives on disk"""
+    directory = proxy_dir or os.path.join(os.path.dirname(path), "proxies")
+    stem, extension = os.path.splitext(os.path.basename(path))
+    return os.path.join(directory, f"{stem}_{file_key(path)}_{2 ** level}{extension}")
+
+def build_proxies(path, proxy_dir=None):
+    """Write the missing proxies of a texture from one load of the full image"""
+    missing = [level for level in PROXY_LEVELS if not os.path.exists(proxy_path(path, level, proxy_dir))]
+    if not missing:
+        return
+    os.makedirs(os.path.dirname(proxy_path(path, missing[0], proxy_dir)), exist_ok=True)
+    source = bpy.data.images.load(path, check_existing=False)
+    width, height = source.size
+    try:
+        for level in missing:
+            proxy = source.copy()
+            proxy.scale(max(width >> level, 1), max(height >> level, 1))
+            target = proxy_path(path, level, proxy_dir)
+            partial = target + ".partial" + os.path.splitext(target)[1]
+            proxy.filepath_raw = partial
+            proxy.file_format = source.file_format
+            proxy.save()
+            os.replace(partial, target)  # Other workers never see a half-written proxy
+            bpy.data.images.remove(proxy)
+    finally:
+        bpy.data.images.remove(source)
+    print(f"Image cache: built {len(missing)} proxies for {os.path.basename(path)}")
+
+def load_image(image_path, level=None, proxy_dir=None):
+    """Texture at a proxy level (default: the active render profile's), loaded once per session"""
+    path = os.path.normpath(bpy.path.abspath(image_path))
+    if level is None:
+        from render_profiles import active_profile
+        level = active_profile()["texture_level"]
+
+    cached = _session_images.get((path, level))
+    if cached is not None and cached in bpy.data.images:
+        return bpy.data.images[cached]
+    if not os.path.exists(path):
+        raise FileNotFoundError(f"Texture not found: {image_path}")
+
+    if level == 0:
+        image = bpy.data.images.load(path, check_existing=True)
+    else:
+        build_proxies(path, proxy_dir)
+        image = bpy.data.images.load(proxy_path(path, level, proxy_dir), check_existing=True)
+        image.name = f"{os.path.basename(path)}@1/{2 ** level}"
+    image["source_path"] = path
+    image["proxy_level"] = level
+    _session_images[(path, level)] = image.name
+    return image
+
+def refresh_images(scene=None, level=None):
+    """Swap cached textures in all materials to a level (default: the active profile's)"""
+    if level is None:
+        from render_profiles import active_profile
+        level = active_profile(scene)["texture_level"]
+    swapped = 0
+    for material in bpy.data.materials:
+        if not material.use_nodes:
+            continue
+        for node in material.node_tree.nodes:
+            image = getattr(node, "image", None)
+            if image is None or "source_path" not in image or image.get("proxy_level") == level:
+                continue
+            node.image = load_image(image["source_path"], level)
+            swapped += 1
+    if swapped:
+        print(f"Image cache: {swapped} textures switched to 1/{2 ** level} size")
+    return swapped
+
+def clear_session():
+    """Forget the session's images (for example after loading another .blend)"""
+    _session_images.clear()
@@ -0,0 +1,223 @@
+"""
+Blender Python Animation: Impact Driven Dust
+Emits small dust bursts only where and when dominoes actually hit the ground
+
+The baked domino transforms give, for every domino, the first frame it lands (its top edge
+reaches the ground, or its fall is stopped abruptly by the domino it leans on) and where
+its top edge is at that moment, projected to the floor. All bursts come from ONE emitter object with ONE particle settings
+block: the emitter mesh has one small quad per impact, and a particle texture mapped to
+emission time (one pixel per quad, read through the quad's UVs) delays each quad's
+particles to its own impact frame. The particle count scales with real impacts instead
+of floor area.
+
+Usage inside Blender after a bake:
+    from impact_dust import add_impact_dust
+    add_impact_dust()
+
+or let the domino script do it: animate_falling_dominoes(impact_dust=True)
+"""
+
+import math
+import os
+
+import numpy as np
+
+try:
+    import bpy
+except ImportError:  # Contact detection runs on plain arrays
+    bpy = None
+
+def find_impacts(transforms, half_extents, contact_height=0.15, landing_tilt=math.radians(45.0),
+                 stop_ratio=0.25, chunk=2048):
+    """First impact frame offset (-1 if none) and floor position for each object
+
+    An impact is the top face reaching the floor, or a fall that stops abruptly (angular speed
+    dropping below stop_ratio of its peak after tilting past landing_tilt).
+    transforms: (F, N, 10) baked transforms; half_extents: (N, 3) local half sizes.
+    """
+    from baked_transforms import quaternion_to_matrix, tilt_angles
+
+    frame_count, count = transforms.shape[0], transforms.shape[1]
+    frames = np.full(count, -1, dtype=np.int64)
+    positions = np.zeros((count, 3), dtype=np.float64)
+    half_extents = np.asarray(half_extents, dtype=np.float64)
+    # The four corners of the top face in local (unscaled) coordinates
+    signs = np.array([[1, 1], [1, -1], [-1, 1], [-1, -1]], dtype=np.float64)
+
+    for start in range(0, count, chunk):
+        block = slice(start, min(start + chunk, count))
+        data = np.asarray(transforms[:, block], dtype=np.float64)  # (F, n, 10)
+        rotation = quaternion_to_matrix(data[..., 3:7])  # (F, n, 3, 3)
+        extents = half_extents[block] * data[..., 7:10]  # (F, n, 3) scaled half sizes
+        corners = np.empty(data.shape[:2] + (4, 3))
+        corners[..., 0] = signs[:, 0] * extents[..., None, 0]
+        corners[..., 1] = signs[:, 1] * extents[..., None, 1]
+        corners[..., 2] = extents[..., None, 2]
+        world = data[..., None, 0:3] + np.einsum("fnij,fnkj->fnki", rotation, corners)  # (F, n, 4, 3)
+
+        lowest = world[..., 2].argmin(axis=2)  # (F, n)
+        lowest_z = np.take_along_axis(world[..., 2], lowest[..., None], axis=2)[..., 0]
+
+        # Landing on the floor, or on the domino in front
+        tilt = tilt_angles(data)
+        speed = np.abs(np.gradient(tilt, axis=0))
+        peak = np.maximum.accumulate(speed, axis=0)
+        stopped = (tilt > landing_tilt) & (speed < stop_ratio * peak) & (peak > 0.02)
+        touching = (lowest_z < contact_height) | stopped
+        hit = touching.any(axis=0)
+        first = np.argmax(touching, axis=0)
+
+        columns = np.arange(data.shape[1])
+        corner = lowest[first, columns]
+        frames[block] = np.where(hit, first, -1)
+        positions[block] = world[first, columns, corner]
+    positions[:, 2] = 0.0
+    return frames, positions
+
+def _build_emitter_mesh(name, positions, size):
+    """One small ground quad per impact, each with its UVs on its own pixel column"""
+    count = len(positions)
+    half = size / 2
+    offsets = np.array([[-half, -half], [half, -half], [half, half], [-half, half]])
+    vertices = np.zeros((count, 4, 3), dtype=np.float32)
+    vertices[:, :, 0:2] = positions[:, None, 0:2] + offsets[None]
+    vertices[:, :, 2] = 0.01  # Just above the ground, like the old DustPlane
+
+    mesh = bpy.data.meshes.new(name)
+    mesh.vertices.add(count * 4)
+    mesh.vertices.foreach_set("co", vertices.ravel())
+    mesh.loops.add(count * 4)
+    mesh.loops.foreach_set("vertex_index", np.arange(count * 4, dtype=np.int32))
+    mesh.polygons.add(count)
+    mesh.polygons.foreach_set("loop_start", np.arange(0, count * 4, 4, dtype=np.int32))
+    mesh.polygons.foreach_set("loop_total", np.full(count, 4, dtype=np.int32))
+    mesh.update(calc_edges=True)
+
+    uv_layer = mesh.uv_layers.new(name="UVMap")
+    uvs = np.zeros((count, 4, 2), dtype=np.float32)
+    uvs[:, :, 0] = ((np.arange(count) + 0.5) / count)[:, None]
+    uvs[:, :, 1] = 0.5
+    uv_layer.data.foreach_set("uv", uvs.ravel())
+    return mesh
+
+def _emission_time_texture(name, times):
+    """n x 1 float image holding each quad's emission time (0..1 of the emission window)"""
+    image = bpy.data.images.new(name, width=len(times), height=1, float_buffer=True)
+    image.file_format = 'OPEN_EXR'  # Keep full precision when packed
+    pixels = np.ones((len(times), 4), dtype=np.float32)
+    pixels[:, 0:3] = np.asarray(times, dtype=np.float32)[:, None]
+    image.pixels.foreach_set(pixels.ravel())
+    image.pack()
+
+    texture = bpy.data.textures.new(name, type='IMAGE')
+    texture.image = image
+    texture.use_interpolation = False  # Each quad must read exactly its own pixel
+    texture.extension = 'EXTEND'
+    return texture
+
+def _setup_dust_particles(emitter, impact_frames, particles_per_impact, lifetime):
+    """Particle system on the emitter whose texture delays every quad to its own impact frame"""
+    # Emission window covers all impacts; each quad's texture value picks its moment in it
+    frame_start = int(impact_frames.min())
+    frame_end = int(impact_frames.max()) + 1
+    times = (impact_frames - frame_start) / (frame_end - frame_start)
+
+    modifier = emitter.modifiers.new("ImpactDust", type='PARTICLE_SYSTEM')
+    settings = modifier.particle_system.settings
+    settings.name = "ImpactDustSettings"
+    settings.type = 'EMITTER'
+    settings.count = int(len(impact_frames) * particles_per_impact)
+    settings.frame_start = frame_start
+    settings.frame_end = frame_end
+    settings.lifetime = lifetime
+    settings.lifetime_random = 0.3
+    settings.emit_from = 'FACE'
+    settings.use_even_distribution = True  # Equal quads -> equal bursts
+    settings.use_emit_random = True
+    settings.normal_factor = 1.0
+    settings.factor_random = 0.6
+    settings.physics_type = 'NEWTON'
+    settings.particle_size = 0.02
+    settings.size_random = 0.5
+
+    slot = settings.texture_slots.add()
+    slot.texture = _emission_time_texture("ImpactDustTimes", times)
+    slot.texture_coords = 'UV'
+    slot.uv_layer = "UVMap"
+    slot.use_map_time = True
+    slot.use_map_density = False
+    slot.time_factor = 1.0
+
+    # Same look as the old floor dust
+    from falling_dominoes_animation import dust_material
+    emitter.data.materials.append(dust_material())
+    return settings
+
+def add_impact_dust(objects=None, transforms=None, index=None, prefix="Domino_", particles_per_impact=25,
+                    quad_size=0.3, contact_height=0.15, lifetime=40, scene=None):
+    """Replace floor-wide dust with bursts at the baked ground impacts; returns the emitter (or None)"""
+    from baked_transforms import local_half_extents, sample_baked_transforms, select_objects
+
+    scene = scene or bpy.context.scene
+    if transforms is None:
+        if objects is None:
+            world = scene.rigidbody_world
+            objects = [obj for obj in world.collection.objects if obj.name.startswith(prefix)]
+        objects = sorted(objects, key=lambda obj: obj.name)
+        transforms, index = sample_baked_transforms(objects, scene=scene)
+        half_extents = local_half_extents(objects)
+    else:
+        columns = select_objects(index, prefix)
+        transforms = transforms[:, columns]
+        half_extents = np.asarray(index["half_extents"])[columns]
+
+    frames, positions = find_impacts(transforms, half_extents, contact_height=contact_height)
+    hit = frames >= 0
+    if not hit.any():
+        print("Impact dust: no ground impacts found, no dust added")
+        return None
+    impact_frames = frames[hit] + index["frame_start"]
+    impact_positions = positions[hit]
+
+    # The old floor-wide emitter is no longer needed
+    old_plane = bpy.data.objects.get("DustPlane")
+    if old_plane is not None:
+        bpy.data.objects.remove(old_plane, do_unlink=True)
+
+    mesh = _build_emitter_mesh("ImpactDustMesh", impact_positions, quad_size)
+    emitter = bpy.data.objects.new("ImpactDust", mesh)
+    emitter.show_instancer_for_render = False  # Show the dust, not the quads
+    scene.collection.objects.link(emitter)
+    try:
+        settings = _setup_dust_particles(emitter, impact_frames, particles_per_impact, lifetime)
+    except Exception:
+        # Do not leave a half-built emitter behind
+        bpy.data.objects.remove(emitter, do_unlink=True)
+        bpy.data.meshes.remove(mesh)
+        raise
+
+    print(f"Impact dust: {len(impact_frames)} impacts, {settings.count} particles "
+          f"(frames {settings.frame_start:.0f}-{settings.frame_end:.0f})")
+    return emitter
+
+def main(argv=None):
+    """Command line entry: add impact dust to the open (or freshly built) domino scene"""
+    import argparse
+    import scenarios
+
+    parser = argparse.ArgumentParser(description="Add impact driven dust to a baked domino scene")
+    parser.add_argument("--scenario", choices=sorted(scenarios.SCENARIOS), default=None)
+    parser.add_argument("--per-impact", type=int, default=25, help="Particles per ground impact")
+    parser.add_argument("--save", default=None, help="Save the .blend afterwards")
+    args = parser.parse_args(scenarios.script_args() if argv is None else argv)
+
+    if args.scenario:
+        scenarios.run_scenario(args.scenario)
+    add_impact_dust(particles_per_impact=args.per_impact)
+    if args.save:
+        bpy.ops.wm.save_as_mainfile(filepath=bpy.path.abspath(args.save))
+
+if __name__ == "__main__":
+    import sys
+    sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+    main()
@@ -0,0 +1,334 @@
+"""
+Blender Python Animation: Batch Job Orchestrator
+Runs many scenario jobs as stage graphs so one job bakes while another renders
+
+Each job is a small graph of stages, every stage its own background Blender process:
+
+    bake (build + bake, save .blend) -> render (resumable frame sequence + video)
+                                     -> transforms (optional .npy export)
+
+Stages from different jobs run at the same time on a bounded pool. A stage starts once
+its dependencies are done, the machine has room and then a slot is free: the 1 minute load
+average is below the limit and /proc/meminfo's MemAvailable covers the stage's memory
+estimate on top of what recently started stages will still claim. Failed or timed-out
+stages are retried; renders resume from their manifest, so a retry only renders the
+frames that are missing. The load limit counts other work on the machine only: the CPU
+the orchestrator's own stages use is taken off the load average, so a render using every
+core does not hold back the next bake. The batch then takes about as long as its longest
+stage chain instead of the sum of all stages.
+
+Batch spec (JSON):
+    {"jobs": [
+        {"scenario": "dominoes", "params": {"num_dominoes": 30}, "frame_end": 120},
+        {"name": "balls", "scenario": "many_balls", "params": {"count": 800}, "transforms": true},
+        {"scenario": "tank", "video": false, "retries": 2, "profile": "draft", "engine": "BLENDER_EEVEE"}
+    ]}
+
+Every stage runs with --factory-startup, so the bake stage first applies the scenario
+script's own render settings (setup_render_settings, where the script has one). A job's
+"profile" (default: RENDER_PROFILE of the orchestrator's environment) is passed to every
+stage as RENDER_PROFILE and applied on top in the bake stage, together with "engine", so
+the saved .blend renders with them.
+
+Usage (plain Python, launches Blender itself):
+    python job_orchestrator.py batch.json --jobs 3 --out batch/
+"""
+
+import asyncio
+import json
+import os
+import sys
+import time
+
+# Default per-stage memory estimate (MB) and timeout (seconds)
+STAGE_MEMORY_MB = {"bake": 1024, "render": 2048, "transforms": 512}
+STAGE_TIMEOUT = {"bake": 3600, "render": 4 * 3600, "transforms": 600}
+# Batch used when no spec file is given
+DEFAULT_BATCH = {"jobs": [{"scenario": "dominoes"}, {"scenario": "ball"}, {"scenario": "tank"}]}
+# Seconds during which a started stage is assumed not to have claimed its memory yet
+MEMORY_RAMP_SECONDS = 30.0
+
+def available_memory_mb():
+    """MemAvailable from /proc/meminfo in MB, or None where it is not available"""
+    try:
+        with open("/proc/meminfo") as f:
+            for line in f:
+                if line.startswith("MemAvailable:"):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    return None
+
+def load_average():
+    """1 minute load average, or None where the platform has none"""
+    try:
+        return os.getloadavg()[0]
+    except (AttributeError, OSError):
+        return None
+
+def process_cpu_seconds(pid):
+    """User + system CPU time of a process from /proc/<pid>/stat, or None where it is not available"""
+    try:
+        with open(f"/proc/{pid}/stat") as f:
+            fields = f.read().rsplit(")", 1)[1].split()
+    except (OSError, IndexError):
+        return None
+    return (int(fields[11]) + int(fields[12])) / os.sysconf("SC_CLK_TCK")
+
+def job_stages(job, index, out_dir, blender="blender"):
+    """Stage dicts (name, deps, command, env, timeout, retries, memory) for one job"""
+    scripts = os.path.dirname(os.path.abspath(__file__))
+    name = job.get("name") or f"{job['scenario']}_{index}"
+    job_dir = os.path.abspath(os.path.join(out_dir, name))
+    blend = os.path.join(job_dir, "scene.blend")
+    retries = job.get("retries", 1)
+    profile = job.get("profile", os.environ.get("RENDER_PROFILE"))
+
+    def stage(kind, command, deps=()):
+        return {"name": f"{name}:{kind}", "job": name, "kind": kind, "deps": [f"{name}:{dep}" for dep in deps],
+                "command": command, "log": os.path.join(job_dir, f"{kind}.log"),
+                "timeout": job.get("timeouts", {}).get(kind, STAGE_TIMEOUT[kind]), "retries": retries,
+                "memory_mb": job.get("memory_mb", {}).get(kind, STAGE_MEMORY_MB[kind]),
+                "env": {"RENDER_PROFILE": profile} if profile else {}}
+
+    stages = [stage("bake", [blender, "-b", "--factory-startup", "--python", os.path.abspath(__file__), "--",
+                             "--bake", json.dumps({"scenario": job["scenario"], "params": job.get("params", {}),
+                                                   "profile": profile, "engine": job.get("engine")}),
+                             "--blend", blend])]
+    if job.get("frames", True):
+        command = [blender, "-b", "--factory-startup", blend, "--python",
+                   os.path.join(scripts, "sequence_render.py"), "--", "--out", os.path.join(job_dir, "frames")]
+        if job.get("video", True):
+            command += ["--video", os.path.join(job_dir, f"{name}.mp4")]
+        if job.get("frame_start") is not None:
+            command += ["--start", str(job["frame_start"])]
+        if job.get("frame_end") is not None:
+            command += ["--end", str(job["frame_end"])]
+        stages.append(stage("render", command, deps=["bake"]))
+    if job.get("transforms"):
+        stages.append(stage("transforms", [blender, "-b", "--factory-startup", blend, "--python",
+                                           os.path.join(scripts, "baked_transforms.py"), "--",
+                                           "--out", os.path.join(job_dir, "transforms.npy")], deps=["bake"]))
+    return stages
+
+def bake_in_blender(job, blend_path):
+    """Inside Blender: build and bake one scenario, then save it for the later stages"""
+    import bpy
+    import scenarios
+
+    scenarios.run_scenario(job["scenario"], job.get("params"))
+    scene = bpy.context.scene
+    # Factory startup gives default render settings: start from the script's own, the profile goes on top
+    scenarios.apply_render_settings(job["scenario"])
+    if job.get("engine"):
+        scene.render.engine = job["engine"]
+    if job.get("profile"):
+        from render_profiles import apply_profile
+        apply_profile(job["profile"], scene)
+    os.makedirs(os.path.dirname(os.path.abspath(blend_path)), exist_ok=True)
+    bpy.ops.wm.save_as_mainfile(filepath=os.path.abspath(blend_path))
+
+class Orchestrator:
+    """Runs stage graphs on a bounded pool of processes with resource-aware admission"""
+
+    def __init__(self, stages, jobs=2, max_load=1.0, min_free_mb=1024, poll_seconds=2.0, retry_delay=5.0):
+        self.stages = {stage["name"]: stage for stage in stages}
+        for stage in stages:
+            missing = [dep for dep in stage["deps"] if dep not in self.stages]
+            if missing:
+                raise ValueError(f"Stage {stage['name']} depends on unknown stages: {', '.join(missing)}")
+        self.jobs = jobs
+        self.max_load = max_load * (os.cpu_count() or 1)
+        self.min_free_mb = min_free_mb
+        self.poll_seconds = poll_seconds
+        self.retry_delay = retry_delay
+        self.results = {}
+        self.running = {}  # Stage name -> (start time, memory estimate)
+        self.processes = {}  # Stage name -> (pid, start time) of the running attempt
+
+    def _own_load(self):
+        """CPUs the running stage processes use on average since they started"""
+        now = time.monotonic()
+        load = 0.0
+        for pid, started in list(self.processes.values()):
+            seconds = process_cpu_seconds(pid)
+            if seconds is not None and now > started:
+                load += seconds / (now - started)
+        return load
+
+    def _has_room(self, stage):
+        """Whether the machine can take another stage now (always true when nothing runs)"""
+        if not self.running:
+            return True
+        load = load_average()
+        if load is not None and load - self._own_load() >= self.max_load:
+            return False
+        available = available_memory_mb()
+        if available is None:
+            return True
+        now = time.monotonic()
+        ramping = sum(memory for started, memory in self.running.values() if now - started < MEMORY_RAMP_SECONDS)
+        return available - ramping >= stage["memory_mb"] + self.min_free_mb
+
+    async def _admit(self, stage):
+        """Wait until the admission rules let a stage start"""
+        while not self._has_room(stage):
+            await asyncio.sleep(self.poll_seconds)
+
+    async def _acquire(self, stage, slots):
+        """Take a slot once the admission rules let the stage start
+
+        Stages wait for admission without holding a slot, so a stage blocked on load or memory
+        does not keep a ready one from running. The rules are checked again with the slot held,
+        since another stage may have started in between.
+        """
+        while True:
+            await self._admit(stage)
+            await slots.acquire()
+            if self._has_room(stage):
+                return
+            slots.release()
+            await asyncio.sleep(self.poll_seconds)
+
+    async def _attempt(self, stage):
+        """Run a stage's process once; returns (status, return code)"""
+        os.makedirs(os.path.dirname(stage["log"]), exist_ok=True)
+        with open(stage["log"], "ab") as log:
+            log.write(f"\n=== {time.strftime('%Y-%m-%d %H:%M:%S')} {' '.join(stage['command'])}\n".encode())
+            log.flush()
+            env = dict(os.environ, **stage.get("env", {}))
+            process = await asyncio.create_subprocess_exec(*stage["command"], stdout=log, stderr=log, env=env)
+            self.processes[stage["name"]] = (process.pid, time.monotonic())
+            try:
+                code = await asyncio.wait_for(process.wait(), timeout=stage["timeout"])
+            except asyncio.TimeoutError:
+                process.kill()
+                await process.wait()
+                return "timeout", None
+            finally:
+                del self.processes[stage["name"]]
+        return ("ok" if code == 0 else "failed"), code
+
+    async def _run_stage(self, stage, done, slots):
+        """Wait for dependencies, then run a stage with retries"""
+        name = stage["name"]
+        await asyncio.gather(*(done[dep].wait() for dep in stage["deps"]))
+        failed_deps = [dep for dep in stage["deps"] if self.results[dep]["status"] != "ok"]
+        if failed_deps:
+            self.results[name] = {"status": "skipped", "attempts": 0, "seconds": 0.0, "waiting_on": failed_deps}
+            print(f"[skip] {name} (needs {', '.join(failed_deps)})")
+            done[name].set()
+            return
+
+        attempts = 0
+        started = None
+        status, code = "failed", None
+        while attempts <= stage["retries"]:
+            attempts += 1
+            await self._acquire(stage, slots)
+            try:
+                started = started or time.monotonic()
+                attempt_start = time.monotonic()
+                self.running[name] = (attempt_start, stage["memory_mb"])
+                print(f"[start] {name} (attempt {attempts})")
+                try:
+                    status, code = await self._attempt(stage)
+                finally:
+                    del self.running[name]
+            finally:
+                slots.release()
+            print(f"[{status}] {name} after {time.monotonic() - attempt_start:.1f}s")
+            if status == "ok":
+                break
+            if attempts <= stage["retries"]:
+                await asyncio.sleep(self.retry_delay * attempts)
+
+        self.results[name] = {"status": status, "attempts": attempts, "return_code": code,
+                              "start": started - self.started, "end": time.monotonic() - self.started,
+                              "seconds": time.monotonic() - started}
+        done[name].set()
+
+    async def run(self):
+        """Run every stage; returns the per-stage results"""
+        self.started = time.monotonic()
+        slots = asyncio.Semaphore(self.jobs)
+        done = {name: asyncio.Event() for name in self.stages}
+        await asyncio.gather(*(self._run_stage(stage, done, slots) for stage in self.stages.values()))
+        self.wall = time.monotonic() - self.started
+        return self.results
+
+    def critical_path_seconds(self):
+        """Duration of the longest dependency chain, from the measured stage times"""
+        finish = {}
+
+        def chain(name):
+            if name not in finish:
+                stage = self.stages[name]
+                finish[name] = self.results[name]["seconds"] + max((chain(dep) for dep in stage["deps"]), default=0.0)
+            return finish[name]
+        return max((chain(name) for name in self.stages), default=0.0)
+
+    def summary(self):
+        """Batch wall time next to the serial sum and the longest chain"""
+        return {
+            "wall_seconds": round(self.wall, 2),
+            "serial_seconds": round(sum(result["seconds"] for result in self.results.values()), 2),
+            "critical_path_seconds": round(self.critical_path_seconds(), 2),
+            "failed": sorted(name for name, result in self.results.items() if result["status"] != "ok"),
+            "stages": self.results,
+        }
+
+def run_batch(batch, out_dir="batch", jobs=2, blender="blender", **options):
+    """Run a batch spec and write <out_dir>/batch_report.json; returns the summary"""
+    stages = []
+    for index, job in enumerate(batch["jobs"]):
+        stages.extend(job_stages(job, index, out_dir, blender))
+    orchestrator = Orchestrator(stages, jobs=jobs, **options)
+    print(f"Batch: {len(batch['jobs'])} jobs, {len(stages)} stages on {jobs} slots")
+    asyncio.run(orchestrator.run())
+
+    summary = orchestrator.summary()
+    os.makedirs(out_dir, exist_ok=True)
+    report_path = os.path.join(out_dir, "batch_report.json")
+    with open(report_path + ".partial", "w") as f:
+        json.dump(summary, f, indent=2)
+    os.replace(report_path + ".partial", report_path)
+    print(f"Batch finished in {summary['wall_seconds']:.1f}s (stages back to back: {summary['serial_seconds']:.1f}s, "
+          f"longest chain: {summary['critical_path_seconds']:.1f}s)")
+    if summary["failed"]:
+        print(f"Failed or skipped: {', '.join(summary['failed'])}")
+    return summary
+
+def main(argv=None):
+    """Command line entry: run a batch, or (inside Blender) one bake stage"""
+    import argparse
+
+    if argv is None:
+        argv = sys.argv[sys.argv.index("--") + 1:] if "--" in sys.argv else sys.argv[1:]
+    parser = argparse.ArgumentParser(description="Pipelined bake/render orchestrator for scenario batches")
+    parser.add_argument("batch", nargs="?", default=None, help="Batch spec JSON (default: one job per scenario)")
+    parser.add_argument("--out", default="batch", help="Directory for every job's files and the report")
+    parser.add_argument("--jobs", type=int, default=max((os.cpu_count() or 2) // 2, 1),
+                        help="Stages running at the same time")
+    parser.add_argument("--blender", default=os.environ.get("BLENDER", "blender"))
+    parser.add_argument("--max-load", type=float, default=1.0, help="Load average limit per CPU, not counting the batch's own stages")
+    parser.add_argument("--min-free-mb", type=float, default=1024, help="Memory to keep free")
+    parser.add_argument("--bake", default=None, help=argparse.SUPPRESS)
+    parser.add_argument("--blend", default=None, help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    if args.bake:
+        bake_in_blender(json.loads(args.bake), args.blend)
+        return
+
+    batch = DEFAULT_BATCH
+    if args.batch:
+        with open(args.batch) as f:
+            batch = json.load(f)
+    summary = run_batch(batch, args.out, jobs=args.jobs, blender=args.blender,
+                        max_load=args.max_load, min_free_mb=args.min_free_mb)
+    sys.exit(1 if summary["failed"] else 0)
+
+if __name__ == "__main__":
+    sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+    main()
@@ -0,0 +1,383 @@
+"""
+Blender Python Animation: Layered Render
+Renders the static background once per camera pose and only the moving objects every frame
+
+Objects are split by how they move over the frame range:
+    - foreground: active rigid bodies, particle emitters and objects that move in many frames
+    - background: everything else (ground, walls, passive objects, a tank body between turret moves)
+    - shared: lights, the camera and the shadow receivers (ground and passive rigid bodies)
+The background view layer is rendered once for every distinct camera pose / background state
+(a locked-camera shot renders it exactly once) and cached as a linear EXR. Each frame then
+renders only the foreground view layer: static objects are holdouts so they still hide what
+is behind them and still cast shadows onto the moving objects, and shadow receivers become
+shadow catchers. The catcher pass then holds the static shadows too, which the cached
+background already shows; so each background state also caches the catcher pass of the
+static objects alone, and the compositor multiplies the background by the ratio of the two
+passes (only what the moving objects add) before laying the foreground over it.
+
+Needs Cycles (shadow catchers). Usage from the command line:
+    blender -b scene.blend --python layered_render.py -- --out frames/
+    blender -b --python layered_render.py -- --scenario tank --out frames/
+"""
+
+import hashlib
+import os
+import time
+
+import numpy as np
+
+try:
+    import bpy
+except ImportError:  # Keeps the module importable outside Blender
+    bpy = None
+
+try:
+    from pipeline_profiler import profile_phase
+except ImportError:
+    from contextlib import nullcontext as profile_phase
+
+# Collections and view layers created for the layered render
+STATIC_COLLECTION = "LayeredStatic"
+DYNAMIC_COLLECTION = "LayeredDynamic"
+SHARED_COLLECTION = "LayeredShared"
+BACKGROUND_LAYER = "LayeredBackground"
+FOREGROUND_LAYER = "LayeredForeground"
+# Objects that lived directly in the scene collection (which view layers cannot exclude)
+SCENE_OBJECTS_COLLECTION = "SceneObjects"
+
+def _is_receiver(obj):
+    """Static surfaces that should catch the moving objects' shadows"""
+    if obj.name.startswith("Ground"):
+        return True
+    return obj.rigid_body is not None and obj.rigid_body.type == 'PASSIVE'
+
+def classify_objects(scene=None, frame_start=None, frame_end=None, moving_fraction=0.05, precision=4):
+    """Split the scene into static/dynamic/shared objects and key the background of every frame
+
+    Returns a dict with the three object lists and {frame: background key}. The key covers
+    the camera, the lights and every background object, so it only changes when the
+    background image would.
+    """
+    from baked_transforms import iter_frame_matrices
+
+    scene = scene or bpy.context.scene
+    frame_start = scene.frame_start if frame_start is None else frame_start
+    frame_end = scene.frame_end if frame_end is None else frame_end
+    objects = sorted(scene.objects, key=lambda obj: obj.name)
+    count = len(objects)
+
+    # One pass over the range: rounded matrices and render visibility of every object
+    states = np.empty((frame_end - frame_start + 1, count, 17), dtype=np.float32)
+    light_values = np.empty((frame_end - frame_start + 1, count, 4), dtype=np.float32)
+    for frame, matrices in iter_frame_matrices(objects, frame_start, frame_end, scene):
+        row = frame - frame_start
+        states[row, :, :16] = np.round(matrices.reshape(count, 16), precision) + 0.0
+        states[row, :, 16] = [obj.hide_render for obj in objects]
+        light_values[row] = [(obj.data.energy, *obj.data.color) if obj.type == 'LIGHT' else (0, 0, 0, 0)
+                             for obj in objects]
+
+    # An object "moves" in a frame when its state differs from the frame before
+    changed = np.zeros((len(states), count), dtype=bool)
+    changed[1:] = np.any(states[1:] != states[:-1], axis=2)
+    moving_share = changed.mean(axis=0)
+
+    particle_objects = set()
+    for obj in objects:
+        for system in obj.particle_systems:
+            particle_objects.add(obj.name)
+            instance = system.settings.instance_object
+            if instance is not None:
+                particle_objects.add(instance.name)
+
+    static, dynamic, shared = [], [], []
+    for i, obj in enumerate(objects):
+        if obj.type in {'LIGHT', 'CAMERA'}:
+            shared.append(obj)
+        elif (obj.name in particle_objects or moving_share[i] > moving_fraction or
+              (obj.rigid_body is not None and obj.rigid_body.type == 'ACTIVE')):
+            dynamic.append(obj)
+        elif _is_receiver(obj):
+            shared.append(obj)
+        else:
+            static.append(obj)
+
+    # Background key: everything that is drawn into the background layer
+    dynamic_names = {obj.name for obj in dynamic}
+    columns = [i for i, obj in enumerate(objects) if obj.name not in dynamic_names]
+    names = repr([objects[i].name for i in columns]).encode()
+    keys = {}
+    for row, frame in enumerate(range(frame_start, frame_end + 1)):
+        digest = hashlib.blake2b(names, digest_size=16)
+        digest.update(states[row, columns].tobytes())
+        digest.update(np.round(light_values[row, columns], precision).tobytes())
+        keys[frame] = digest.hexdigest()
+    return {"static": static, "dynamic": dynamic, "shared": shared, "background_keys": keys}
+
+def _layer_collection(name, scene):
+    """Fresh collection under the scene collection"""
+    old = bpy.data.collections.get(name)
+    if old is not None:
+        bpy.data.collections.remove(old)
+    collection = bpy.data.collections.new(name)
+    scene.collection.children.link(collection)
+    return collection
+
+def _move_scene_objects(scene):
+    """Objects directly in the scene collection cannot be excluded per view layer; give them a collection"""
+    loose = list(scene.collection.objects)
+    if not loose:
+        return
+    target = bpy.data.collections.get(SCENE_OBJECTS_COLLECTION)
+    if target is None:
+        target = bpy.data.collections.new(SCENE_OBJECTS_COLLECTION)
+        scene.collection.children.link(target)
+        scene["layered_created_collection"] = True
+    # Remembered on the scene so remove_layers can put them back, even after a save and reload
+    scene["layered_loose_objects"] = list(scene.get("layered_loose_objects", [])) + [obj.name for obj in loose]
+    for obj in loose:
+        target.objects.link(obj)
+        scene.collection.objects.unlink(obj)
+
+def _restore_scene_objects(scene):
+    """Put the objects _move_scene_objects moved back into the scene collection"""
+    target = bpy.data.collections.get(SCENE_OBJECTS_COLLECTION)
+    for name in scene.get("layered_loose_objects", []):
+        obj = bpy.data.objects.get(name)
+        if obj is None:
+            continue
+        if obj.name not in scene.collection.objects:
+            scene.collection.objects.link(obj)
+        if target is not None and obj.name in target.objects:
+            target.objects.unlink(obj)
+    if target is not None and scene.get("layered_created_collection") and not target.all_objects:
+        bpy.data.collections.remove(target)
+    for key in ("layered_loose_objects", "layered_created_collection"):
+        if key in scene:
+            del scene[key]
+
+def setup_layers(classes, scene=None):
+    """Create the background/foreground view layers and the compositor; returns its nodes by role"""
+    scene = scene or bpy.context.scene
+    _move_scene_objects(scene)
+    groups = {STATIC_COLLECTION: classes["static"], DYNAMIC_COLLECTION: classes["dynamic"],
+              SHARED_COLLECTION: classes["shared"]}
+    for name, objects in groups.items():
+        collection = _layer_collection(name, scene)
+        for obj in objects:
+            collection.objects.link(obj)
+
+    # Each layer sees only its own collections; the originals are excluded
+    visible = {BACKGROUND_LAYER: {STATIC_COLLECTION, SHARED_COLLECTION},
+               FOREGROUND_LAYER: {STATIC_COLLECTION, DYNAMIC_COLLECTION, SHARED_COLLECTION}}
+    for layer_name, included in visible.items():
+        layer = scene.view_layers.get(layer_name) or scene.view_layers.new(layer_name)
+        for child in layer.layer_collection.children:
+            child.exclude = child.name not in included
+        layer.use_pass_combined = True
+    foreground = scene.view_layers[FOREGROUND_LAYER]
+    foreground.layer_collection.children[STATIC_COLLECTION].holdout = True
+    foreground.cycles.use_pass_shadow_catcher = True
+    for layer in scene.view_layers:
+        if layer.name not in visible:
+            for name in groups:
+                layer.layer_collection.children[name].exclude = True
+
+    # Compositor: cached background x (catcher pass / static catcher pass), foreground laid over it
+    scene.use_nodes = True
+    tree = scene.node_tree
+    for node in list(tree.nodes):
+        if node.name.startswith("Layered"):
+            tree.nodes.remove(node)
+    render_layer = tree.nodes.new("CompositorNodeRLayers")
+    render_layer.name = "LayeredForeground"
+    render_layer.layer = FOREGROUND_LAYER
+    background = tree.nodes.new("CompositorNodeImage")
+    background.name = "LayeredBackground"
+    static_catcher = tree.nodes.new("CompositorNodeImage")
+    static_catcher.name = "LayeredStaticCatcher"
+    added = tree.nodes.new("CompositorNodeMixRGB")
+    added.name = "LayeredAddedShadow"
+    added.blend_type = 'DIVIDE'
+    added.use_clamp = True  # Moving objects only take light away
+    shadow = tree.nodes.new("CompositorNodeMixRGB")
+    shadow.name = "LayeredShadow"
+    shadow.blend_type = 'MULTIPLY'
+    over = tree.nodes.new("CompositorNodeAlphaOver")
+    over.name = "LayeredOver"
+    composite = tree.nodes.new("CompositorNodeComposite")
+    composite.name = "LayeredComposite"
+    tree.links.new(render_layer.outputs["Shadow Catcher"], added.inputs[1])
+    tree.links.new(static_catcher.outputs["Image"], added.inputs[2])
+    tree.links.new(background.outputs["Image"], shadow.inputs[1])
+    tree.links.new(added.outputs["Image"], shadow.inputs[2])
+    tree.links.new(shadow.outputs["Image"], over.inputs[1])
+    tree.links.new(render_layer.outputs["Image"], over.inputs[2])
+    tree.nodes.active = composite
+    _composite_from(tree, over.outputs["Image"])
+    return {"background": background, "static_catcher": static_catcher, "render_layer": render_layer,
+            "over": over}
+
+def _composite_from(tree, socket):
+    """Feed the layered Composite node from one output socket"""
+    composite = tree.nodes["LayeredComposite"]
+    for link in list(composite.inputs["Image"].links):
+        tree.links.remove(link)
+    tree.links.new(socket, composite.inputs["Image"])
+
+def _load_into(node, path):
+    """Point an Image node at a cached EXR, keeping only one image per node in memory"""
+    image = bpy.data.images.load(path, check_existing=True)
+    if node.image not in (None, image):
+        bpy.data.images.remove(node.image)
+    node.image = image
+
+def remove_layers(scene=None):
+    """Remove the layered render's view layers, collections and compositor nodes"""
+    scene = scene or bpy.context.scene
+    for name in (BACKGROUND_LAYER, FOREGROUND_LAYER):
+        layer = scene.view_layers.get(name)
+        if layer is not None:
+            scene.view_layers.remove(layer)
+    for name in (STATIC_COLLECTION, DYNAMIC_COLLECTION, SHARED_COLLECTION):
+        collection = bpy.data.collections.get(name)
+        if collection is not None:
+            bpy.data.collections.remove(collection)
+    if scene.node_tree:
+        for node in list(scene.node_tree.nodes):
+            if node.name.startswith("Layered"):
+                scene.node_tree.nodes.remove(node)
+    _restore_scene_objects(scene)
+
+def _render_to(scene, path, file_format):
+    """Render the enabled view layers and save the result atomically"""
+    settings = scene.render.image_settings
+    saved_format = settings.file_format
+    partial = path + ".partial" + (".exr" if file_format == 'OPEN_EXR' else ".png")
+    bpy.ops.render.render()
+    settings.file_format = file_format
+    try:
+        bpy.data.images["Render Result"].save_render(filepath=partial, scene=scene)
+    finally:
+        settings.file_format = saved_format
+    os.replace(partial, path)
+
+def render_layered(output_dir, cache_dir=None, frame_start=None, frame_end=None, scene=None,
+                   prefix="frame_", moving_fraction=0.05, keep_layers=False):
+    """Render a PNG sequence with cached backgrounds and per-frame foregrounds; returns timings"""
+    from render_cache import settings_digest
+
+    scene = scene or bpy.context.scene
+    if scene.render.engine != 'CYCLES':
+        raise RuntimeError("Layered rendering needs Cycles (shadow catcher pass)")
+    output_dir = bpy.path.abspath(output_dir)
+    cache_dir = bpy.path.abspath(cache_dir) if cache_dir else os.path.join(output_dir, "backgrounds")
+    os.makedirs(output_dir, exist_ok=True)
+    os.makedirs(cache_dir, exist_ok=True)
+    frame_start = scene.frame_start if frame_start is None else frame_start
+    frame_end = scene.frame_end if frame_end is None else frame_end
+
+    with profile_phase("render_classify"):
+        classes = classify_objects(scene, frame_start, frame_end, moving_fraction)
+    print(f"Layered render: {len(classes['static'])} static, {len(classes['dynamic'])} dynamic, "
+          f"{len(classes['shared'])} shared objects, "
+          f"{len(set(classes['background_keys'].values()))} background states")
+
+    # Cached backgrounds are only valid for the render settings they were made with
+    settings = settings_digest(scene)[:12]
+    nodes = setup_layers(classes, scene)
+    tree = scene.node_tree
+    receivers = [obj for obj in classes["shared"] if obj.type not in {'LIGHT', 'CAMERA'}]
+    dynamic_layer = scene.view_layers[FOREGROUND_LAYER].layer_collection.children[DYNAMIC_COLLECTION]
+    layer_use = {layer.name: layer.use for layer in scene.view_layers}
+    saved = (scene.render.film_transparent, scene.render.use_compositing)
+    timings = {"background": 0.0, "foreground": 0.0, "backgrounds_rendered": 0}
+
+    def use_only(layer_name):
+        for layer in scene.view_layers:
+            layer.use = layer.name == layer_name
+
+    try:
+        for frame in range(frame_start, frame_end + 1):
+            scene.frame_set(frame)
+            background_path = os.path.join(cache_dir, f"{settings}_{classes['background_keys'][frame]}.exr")
+            catcher_path = background_path[:-len(".exr")] + "_catcher.exr"
+            if not os.path.exists(background_path) or not os.path.exists(catcher_path):
+                started = time.perf_counter()
+                with profile_phase("render_background"):
+                    use_only(BACKGROUND_LAYER)
+                    scene.render.film_transparent = False
+                    scene.render.use_compositing = False
+                    for obj in receivers:
+                        obj.is_shadow_catcher = False
+                    _render_to(scene, background_path, 'OPEN_EXR')
+
+                    # The static objects' own shadows on the catchers, to divide out of the foreground pass
+                    use_only(FOREGROUND_LAYER)
+                    dynamic_layer.exclude = True
+                    scene.render.film_transparent = True
+                    scene.render.use_compositing = True
+                    for obj in receivers:
+                        obj.is_shadow_catcher = True
+                    _composite_from(tree, nodes["render_layer"].outputs["Shadow Catcher"])
+                    try:
+                        _render_to(scene, catcher_path, 'OPEN_EXR')
+                    finally:
+                        _composite_from(tree, nodes["over"].outputs["Image"])
+                        dynamic_layer.exclude = False
+                timings["background"] += time.perf_counter() - started
+                timings["backgrounds_rendered"] += 1
+
+            started = time.perf_counter()
+            with profile_phase("render_foreground"):
+                use_only(FOREGROUND_LAYER)
+                scene.render.film_transparent = True
+                scene.render.use_compositing = True
+                for obj in receivers:
+                    obj.is_shadow_catcher = True
+                _load_into(nodes["background"], background_path)
+                _load_into(nodes["static_catcher"], catcher_path)
+                _render_to(scene, os.path.join(output_dir, f"{prefix}{frame:04d}.png"), 'PNG')
+            timings["foreground"] += time.perf_counter() - started
+            print(f"Frame {frame}/{frame_end} done")
+    finally:
+        for obj in receivers:
+            obj.is_shadow_catcher = False
+        scene.render.film_transparent, scene.render.use_compositing = saved
+        for layer in scene.view_layers:
+            layer.use = layer_use.get(layer.name, layer.use)
+        for node in (nodes["background"], nodes["static_catcher"]):
+            if node.image is not None:
+                bpy.data.images.remove(node.image)
+        if not keep_layers:
+            remove_layers(scene)
+
+    frames = frame_end - frame_start + 1
+    print(f"Layered render: {timings['backgrounds_rendered']} backgrounds in {timings['background']:.1f}s, "
+          f"{frames} foregrounds in {timings['foreground']:.1f}s "
+          f"({timings['foreground'] / max(frames, 1):.2f}s per frame) -> {output_dir}")
+    return timings
+
+def main(argv=None):
+    """Command line entry: layered render of the open or built scene"""
+    import argparse
+    import scenarios
+
+    parser = argparse.ArgumentParser(description="Render cached static backgrounds plus per-frame foregrounds")
+    parser.add_argument("--scenario", choices=sorted(scenarios.SCENARIOS), default=None)
+    parser.add_argument("--out", default="frames", help="Output directory for the PNG sequence")
+    parser.add_argument("--cache", default=None, help="Background cache directory (default: <out>/backgrounds)")
+    parser.add_argument("--start", type=int, default=None)
+    parser.add_argument("--end", type=int, default=None)
+    parser.add_argument("--moving-fraction", type=float, default=0.05,
+                        help="Objects moving in more than this share of frames render every frame")
+    args = parser.parse_args(scenarios.script_args() if argv is None else argv)
+
+    if args.scenario:
+        scenarios.run_scenario(args.scenario)
+    bpy.context.scene.render.engine = 'CYCLES'
+    return render_layered(args.out, args.cache, args.start, args.end, moving_fraction=args.moving_fraction)
+
+if __name__ == "__main__":
+    import sys
+    sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+    main()
@@ -0,0 +1,357 @@
+"""
+Blender Python Animation: Light Budget
+Measures what each light adds to the image and prunes the ones that stay below a perceptual error budget
+
+Every light and the world background is rendered on its own in a small, low-sample,
+undenoised Cycles probe, twice with different seeds. Averaging the two gives its
+contribution; their difference gives its noise. The full image is probed the same way.
+Because light adds up linearly, removing or merging lights can then be tried on these
+images without rendering again:
+
+    - merge suns that point within a few degrees of each other into one
+    - disable lights whose removal changes the displayed image by less than the budget
+    - stop importance sampling a plain-colour world (BSDF sampling handles it cleanly)
+
+The error is measured in display space (luminance, gamma 2.2): the mean absolute change
+must stay within the budget and the 99th percentile within the peak budget. With apply,
+the plan is applied, checked with a fresh probe against the original, and reverted if the
+check fails. Probe times before and after give the change in time per frame.
+
+Usage from the command line:
+    blender -b scene.blend --python light_budget.py -- --budget 0.01 --apply --save lit.blend
+    blender -b --python light_budget.py -- --scenario ball --report light_budget.json
+"""
+
+import json
+import math
+import os
+import tempfile
+import time
+from contextlib import contextmanager
+
+import numpy as np
+
+try:
+    import bpy
+except ImportError:  # The budget maths runs on plain arrays
+    bpy = None
+
+# Rec. 709 luminance weights
+LUMINANCE = np.array([0.2126, 0.7152, 0.0722], dtype=np.float32)
+# Suns closer than this (degrees) are merged into one
+MERGE_ANGLE = 10.0
+PROBE_SEEDS = (0, 1)
+
+def display(image):
+    """Display-space luminance in 0..1 (simple gamma 2.2 tone curve)"""
+    luminance = np.clip(image[..., :3] @ LUMINANCE, 0.0, None)
+    return np.minimum(luminance, 1.0) ** (1 / 2.2)
+
+def perceptual_error(reference, image):
+    """(mean, 99th percentile) absolute display-space difference of two linear images"""
+    difference = np.abs(display(reference) - display(image))
+    return float(difference.mean()), float(np.percentile(difference, 99))
+
+def noise_level(first, second):
+    """Display-space noise of a probe from two renders with different seeds"""
+    return float(np.abs(display(first) - display(second)).mean() / math.sqrt(2))
+
+@contextmanager
+def probe_settings(scene, percentage=25, samples=16):
+    """Small, undenoised Cycles renders; the scene's own settings come back afterwards"""
+    render, cycles = scene.render, scene.cycles
+    saved = (render.engine, render.resolution_percentage, render.filepath, render.use_motion_blur,
+             cycles.samples, cycles.seed, cycles.use_animated_seed, cycles.use_denoising)
+    render.engine = 'CYCLES'
+    render.resolution_percentage = percentage
+    render.use_motion_blur = False
+    cycles.samples = samples
+    cycles.use_animated_seed = False
+    cycles.use_denoising = False
+    try:
+        yield
+    finally:
+        (render.engine, render.resolution_percentage, render.filepath, render.use_motion_blur,
+         cycles.samples, cycles.seed, cycles.use_animated_seed, cycles.use_denoising) = saved
+
+def render_pixels(scene, path, seed=0):
+    """Render the current frame with a seed; returns (H, W, 4) linear pixels and seconds"""
+    scene.cycles.seed = seed
+    settings = scene.render.image_settings
+    saved_format = settings.file_format
+    started = time.perf_counter()
+    bpy.ops.render.render()
+    seconds = time.perf_counter() - started
+    settings.file_format = 'OPEN_EXR'  # Linear floats, no view transform
+    try:
+        bpy.data.images["Render Result"].save_render(filepath=path, scene=scene)
+    finally:
+        settings.file_format = saved_format
+    image = bpy.data.images.load(path, check_existing=False)
+    try:
+        width, height = image.size
+        pixels = np.empty(width * height * 4, dtype=np.float32)
+        image.pixels.foreach_get(pixels)
+    finally:
+        bpy.data.images.remove(image)
+        os.remove(path)
+    return pixels.reshape(height, width, 4), seconds
+
+def _background_node(world):
+    """The world's Background node, if it has one"""
+    if world is None or not world.use_nodes:
+        return None
+    return next((node for node in world.node_tree.nodes if node.bl_idname == "ShaderNodeBackground"), None)
+
+def light_sources(scene):
+    """Lights that render, plus the world background when it gives light"""
+    sources = [{"name": obj.name, "kind": "light", "type": obj.data.type, "energy": obj.data.energy}
+               for obj in scene.objects if obj.type == 'LIGHT' and not obj.hide_render]
+    background = _background_node(scene.world)
+    if background is not None and background.inputs["Strength"].default_value > 0:
+        sources.append({"name": scene.world.name, "kind": "world", "type": "WORLD",
+                        "energy": background.inputs["Strength"].default_value,
+                        "textured": background.inputs["Color"].is_linked or background.inputs["Strength"].is_linked})
+    return sources
+
+def _set_enabled(scene, source, enabled, saved_strength):
+    """Switch one source on or off"""
+    if source["kind"] == "light":
+        scene.objects[source["name"]].hide_render = not enabled
+    else:
+        _background_node(scene.world).inputs["Strength"].default_value = saved_strength if enabled else 0.0
+
+def measure_lights(scene=None, frame=None, percentage=25, samples=16):
+    """Probe the full image and every source on its own; returns images, noise and shares"""
+    scene = scene or bpy.context.scene
+    if frame is not None:
+        scene.frame_set(frame)
+    sources = light_sources(scene)
+    background = _background_node(scene.world)
+    strength = background.inputs["Strength"].default_value if background is not None else 0.0
+
+    def probe(workdir, tag):
+        renders = [render_pixels(scene, os.path.join(workdir, f"{tag}_{seed}.exr"), seed) for seed in PROBE_SEEDS]
+        (first, seconds_a), (second, seconds_b) = renders
+        return (first + second) / 2, noise_level(first, second), (seconds_a + seconds_b) / 2
+
+    with probe_settings(scene, percentage, samples), tempfile.TemporaryDirectory() as workdir:
+        full, full_noise, full_seconds = probe(workdir, "full")
+        for index, source in enumerate(sources):
+            for other in sources:
+                _set_enabled(scene, other, other is source, strength)
+            try:
+                source["image"], source["noise"], source["seconds"] = probe(workdir, f"source{index}")
+            finally:
+                for other in sources:
+                    _set_enabled(scene, other, True, strength)
+
+    # Energy in linear light, where the sources add up
+    energies = [float((source["image"][..., :3] @ LUMINANCE).mean()) for source in sources]
+    total = sum(energies) or 1.0
+    for source, energy in zip(sources, energies):
+        source["energy_share"] = energy / total
+        source["removal_error"] = perceptual_error(full, full - source["image"])
+    noise_total = sum(source["noise"] for source in sources) or 1.0
+    for source in sources:
+        source["noise_share"] = source["noise"] / noise_total
+    return {"full": full, "noise": full_noise, "seconds": full_seconds, "sources": sources,
+            "frame": scene.frame_current, "percentage": percentage, "samples": samples}
+
+def plan_light_budget(measurement, scene=None, budget=0.01, peak_budget=0.05, merge_angle=MERGE_ANGLE):
+    """Greedy list of merges, disables and sampling changes that keep the image within budget"""
+    scene = scene or bpy.context.scene
+    full = measurement["full"]
+    sources = {source["name"]: source for source in measurement["sources"]}
+    # Probe noise is not an error the plan causes; allow for it on top of the budget
+    mean_limit = budget + measurement["noise"]
+    peak_limit = peak_budget + 3 * measurement["noise"]
+    candidate = full.copy()
+    actions = []
+
+    def within(image):
+        mean, peak = perceptual_error(full, image)
+        return mean <= mean_limit and peak <= peak_limit, mean, peak
+
+    # Merges first: they keep the energy, only the shadow direction moves a little
+    suns = sorted((source for source in sources.values() if source["type"] == 'SUN'),
+                  key=lambda source: -source["energy"])
+    merged = set()
+    for keep in suns:
+        if keep["name"] in merged:
+            continue
+        keep_direction = -np.array(scene.objects[keep["name"]].matrix_world.col[2][:3])
+        for other in suns:
+            if other is keep or other["name"] in merged or keep["energy"] <= 0:
+                continue
+            direction = -np.array(scene.objects[other["name"]].matrix_world.col[2][:3])
+            cosine = float(np.dot(keep_direction, direction) /
+                           (np.linalg.norm(keep_direction) * np.linalg.norm(direction)))
+            if math.degrees(math.acos(min(max(cosine, -1.0), 1.0))) > merge_angle:
+                continue
+            trial = candidate - other["image"] + keep["image"] * (other["energy"] / keep["energy"])
+            ok, mean, peak = within(trial)
+            if ok:
+                candidate = trial
+                merged.add(other["name"])
+                actions.append({"action": "merge", "light": other["name"], "into": keep["name"],
+                                "energy": other["energy"], "error": round(mean, 5), "peak_error": round(peak, 5)})
+
+    # Then disables, cheapest to lose first, for as long as the budget holds
+    targets = {action["into"] for action in actions}
+    remaining = [source for source in sources.values() if source["name"] not in merged | targets]
+    for source in sorted(remaining, key=lambda source: source["removal_error"][0]):
+        trial = candidate - source["image"]
+        ok, mean, peak = within(trial)
+        if ok:
+            candidate = trial
+            actions.append({"action": "disable", "light": source["name"], "kind": source["kind"],
+                            "energy_share": round(source["energy_share"], 4),
+                            "error": round(mean, 5), "peak_error": round(peak, 5)})
+
+    # Sampling: a plain-colour world needs no importance map
+    kept_names = {source["name"] for source in sources.values()} - {action["light"] for action in actions}
+    for source in sources.values():
+        if source["kind"] == "world" and source["name"] in kept_names and not source["textured"]:
+            world = scene.world
+            if world.cycles.sampling_method != 'NONE':
+                actions.append({"action": "world_sampling", "light": source["name"],
+                                "from": world.cycles.sampling_method, "to": 'NONE'})
+
+    # Recommendations only: noisy for how little they add
+    notes = [f"{source['name']} gives {source['energy_share']:.0%} of the light but {source['noise_share']:.0%} "
+             f"of the noise; a larger (softer) light or fewer shadow rays would help"
+             for source in sources.values()
+             if source["name"] in kept_names and source["noise_share"] > 2 * max(source["energy_share"], 0.05)]
+    return {"actions": actions, "predicted_error": perceptual_error(full, candidate), "notes": notes}
+
+def apply_light_plan(plan, scene=None):
+    """Apply a plan's actions, remembering the original settings on each light"""
+    scene = scene or bpy.context.scene
+    for action in plan["actions"]:
+        if action["action"] == "merge":
+            other, keep = scene.objects[action["light"]], scene.objects[action["into"]]
+            if "light_budget_energy" not in keep.data:
+                keep.data["light_budget_energy"] = keep.data.energy
+            keep.data.energy += other.data.energy
+            other.hide_render = True
+            other["light_budget"] = f"merged into {keep.name}"
+        elif action["action"] == "disable" and action["kind"] == "light":
+            obj = scene.objects[action["light"]]
+            obj.hide_render = True
+            obj["light_budget"] = "disabled"
+        elif action["action"] == "disable":
+            background = _background_node(scene.world)
+            scene.world["light_budget_strength"] = background.inputs["Strength"].default_value
+            background.inputs["Strength"].default_value = 0.0
+        elif action["action"] == "world_sampling":
+            scene.world["light_budget_sampling"] = action["from"]
+            scene.world.cycles.sampling_method = action["to"]
+
+def restore_lights(scene=None):
+    """Undo everything apply_light_plan changed"""
+    scene = scene or bpy.context.scene
+    for obj in scene.objects:
+        if obj.type != 'LIGHT':
+            continue
+        if "light_budget" in obj:
+            obj.hide_render = False
+            del obj["light_budget"]
+        if "light_budget_energy" in obj.data:
+            obj.data.energy = obj.data["light_budget_energy"]
+            del obj.data["light_budget_energy"]
+    world = scene.world
+    if world is not None:
+        if "light_budget_strength" in world:
+            _background_node(world).inputs["Strength"].default_value = world["light_budget_strength"]
+            del world["light_budget_strength"]
+        if "light_budget_sampling" in world:
+            world.cycles.sampling_method = world["light_budget_sampling"]
+            del world["light_budget_sampling"]
+
+def analyze_light_budget(scene=None, frame=None, budget=0.01, peak_budget=0.05, apply=False,
+                         percentage=25, samples=16):
+    """Measure, plan and optionally apply a light budget; returns a JSON-ready report"""
+    scene = scene or bpy.context.scene
+    if frame is None:
+        frame = (scene.frame_start + scene.frame_end) // 2  # Mid-animation, when things are happening
+    measurement = measure_lights(scene, frame, percentage, samples)
+    plan = plan_light_budget(measurement, scene, budget, peak_budget)
+
+    report = {
+        "frame": frame,
+        "probe": {"resolution_percentage": percentage, "samples": samples},
+        "noise_floor": round(measurement["noise"], 5),
+        "seconds_before": round(measurement["seconds"], 3),
+        "sources": [],
+        "actions": plan["actions"],
+        "predicted_error": [round(value, 5) for value in plan["predicted_error"]],
+        "notes": plan["notes"],
+        "applied": False,
+    }
+
+    for source in measurement["sources"]:
+        entry = {key: (round(value, 4) if isinstance(value, float) else value)
+                 for key, value in source.items() if key not in ("image", "removal_error")}
+        entry["removal_error"] = round(source["removal_error"][0], 5)
+        report["sources"].append(entry)
+
+    print(f"Light budget at frame {frame} (probe noise floor {measurement['noise']:.4f}):")
+    for source in measurement["sources"]:
+        print(f"  {source['name']:<20} {source['type']:<6} energy {source['energy_share']:6.1%}  "
+              f"noise {source['noise_share']:6.1%}  error if removed {source['removal_error'][0]:.4f}")
+    for action in plan["actions"]:
+        target = f" into {action['into']}" if action["action"] == "merge" else ""
+        print(f"  -> {action['action']} {action['light']}{target}")
+    for note in plan["notes"]:
+        print(f"  note: {note}")
+
+    if apply and plan["actions"]:
+        apply_light_plan(plan, scene)
+        with probe_settings(scene, percentage, samples), tempfile.TemporaryDirectory() as workdir:
+            renders = [render_pixels(scene, os.path.join(workdir, f"check_{seed}.exr"), seed) for seed in PROBE_SEEDS]
+        checked = (renders[0][0] + renders[1][0]) / 2
+        mean, peak = perceptual_error(measurement["full"], checked)
+        report["measured_error"] = [round(mean, 5), round(peak, 5)]
+        report["seconds_after"] = round((renders[0][1] + renders[1][1]) / 2, 3)
+        if mean <= budget + 2 * measurement["noise"] and peak <= peak_budget + 6 * measurement["noise"]:
+            report["applied"] = True
+            change = 1 - report["seconds_after"] / report["seconds_before"] if report["seconds_before"] else 0.0
+            print(f"Light budget applied: error {mean:.4f} (budget {budget}), probe time per frame "
+                  f"{report['seconds_before']:.2f}s -> {report['seconds_after']:.2f}s ({change:.0%} faster)")
+        else:
+            restore_lights(scene)
+            print(f"Light budget check failed (error {mean:.4f}, peak {peak:.4f}); lights restored")
+    return report
+
+def main(argv=None):
+    """Command line entry: analyze (and optionally prune) the lights of the open or built scene"""
+    import argparse
+    import scenarios
+
+    parser = argparse.ArgumentParser(description="Per-light contribution and noise with budgeted pruning")
+    parser.add_argument("--scenario", choices=sorted(scenarios.SCENARIOS), default=None)
+    parser.add_argument("--frame", type=int, default=None, help="Probe frame (default: middle of the range)")
+    parser.add_argument("--budget", type=float, default=0.01, help="Mean display-space error allowed")
+    parser.add_argument("--peak-budget", type=float, default=0.05, help="99th percentile error allowed")
+    parser.add_argument("--percentage", type=int, default=25, help="Probe resolution percentage")
+    parser.add_argument("--samples", type=int, default=16, help="Probe samples")
+    parser.add_argument("--apply", action="store_true", help="Apply the plan after checking it")
+    parser.add_argument("--report", default=None, help="Write the report as JSON")
+    parser.add_argument("--save", default=None, help="Save the .blend afterwards")
+    args = parser.parse_args(scenarios.script_args() if argv is None else argv)
+
+    if args.scenario:
+        scenarios.run_scenario(args.scenario)
+    report = analyze_light_budget(frame=args.frame, budget=args.budget, peak_budget=args.peak_budget,
+                                  apply=args.apply, percentage=args.percentage, samples=args.samples)
+    if args.report:
+        with open(args.report, "w") as f:
+            json.dump(report, f, indent=2)
+    if args.save:
+        bpy.ops.wm.save_as_mainfile(filepath=bpy.path.abspath(args.save))
+
+if __name__ == "__main__":
+    import sys
+    sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+    main()
@@ -0,0 +1,249 @@
+"""
+Blender Python Animation: Procedural Material Baking
+Bakes procedural base colours (stripes, gradients, noise) into image textures for final renders
+
+A material qualifies when its Principled BSDF Base Color comes from a procedural node graph
+(wave/gradient/noise textures, color ramps, mixes) that does not depend on the view. That
+graph is baked once per object mesh through an Emission shader (Cycles EMIT bake) into an
+image at the chosen resolution. Baked images are cached on disk under a hash of the node
+tree, mesh and resolution, so later runs only load them. The object then gets a plain
+image texture material with the original's other BSDF settings. A short probe render before
+and after each swap reports the speedup per material.
+
+Usage from the command line:
+    blender -b scene.blend --python material_baking.py -- --resolution 1024 --save baked.blend
+    blender -b --python material_baking.py -- --scenario ball --cache material_cache
+"""
+
+import hashlib
+import os
+import time
+
+import numpy as np
+
+try:
+    import bpy
+except ImportError:  # Keeps the module importable outside Blender
+    bpy = None
+
+# Nodes whose output only depends on the surface point, so a bake reproduces them exactly
+BAKEABLE_NODES = {
+    "ShaderNodeTexWave", "ShaderNodeTexGradient", "ShaderNodeTexNoise", "ShaderNodeTexVoronoi",
+    "ShaderNodeTexMagic", "ShaderNodeTexChecker", "ShaderNodeTexBrick", "ShaderNodeTexMusgrave",
+    "ShaderNodeTexWhiteNoise", "ShaderNodeTexImage", "ShaderNodeTexCoord", "ShaderNodeMapping",
+    "ShaderNodeValToRGB", "ShaderNodeMixRGB", "ShaderNodeMix", "ShaderNodeMath", "ShaderNodeVectorMath",
+    "ShaderNodeRGB", "ShaderNodeValue", "ShaderNodeInvert", "ShaderNodeHueSaturation",
+    "ShaderNodeBrightContrast", "ShaderNodeGamma", "ShaderNodeSeparateColor", "ShaderNodeCombineColor",
+    "ShaderNodeSeparateXYZ", "ShaderNodeCombineXYZ", "ShaderNodeRGBCurve", "ShaderNodeMapRange",
+    "ShaderNodeUVMap",
+}
+# Texture coordinates that stay fixed on the surface
+SURFACE_COORDINATES = {"Generated", "UV", "Object"}
+PROCEDURAL_PREFIX = "ShaderNodeTex"
+
+def _upstream_nodes(socket):
+    """All nodes feeding an input socket"""
+    found = []
+    pending = [link.from_node for link in socket.links]
+    while pending:
+        node = pending.pop()
+        if node in found:
+            continue
+        found.append(node)
+        for node_input in node.inputs:
+            pending.extend(link.from_node for link in node_input.links)
+    return found
+
+def procedural_base_color(material):
+    """(bsdf, base colour input) when the base colour is a bakeable procedural graph, else None"""
+    if not material or not material.use_nodes:
+        return None
+    bsdf = next((node for node in material.node_tree.nodes if node.bl_idname == "ShaderNodeBsdfPrincipled"), None)
+    if bsdf is None or not bsdf.inputs["Base Color"].is_linked:
+        return None
+    nodes = _upstream_nodes(bsdf.inputs["Base Color"])
+    if any(node.bl_idname not in BAKEABLE_NODES for node in nodes):
+        return None
+    procedural = [node for node in nodes if node.bl_idname.startswith(PROCEDURAL_PREFIX)
+                  and node.bl_idname not in {"ShaderNodeTexImage", "ShaderNodeTexCoord"}]
+    if not procedural:
+        return None
+    for node in nodes:
+        if node.bl_idname == "ShaderNodeTexCoord":
+            if any(output.is_linked and output.name not in SURFACE_COORDINATES for output in node.outputs):
+                return None
+    return bsdf, bsdf.inputs["Base Color"]
+
+def bake_key(material, mesh, resolution):
+    """Cache key for a baked base colour: node tree, mesh geometry/UVs and resolution"""
+    from render_cache import node_tree_values
+
+    digest = hashlib.blake2b(digest_size=16)
+    digest.update(repr((node_tree_values(material.node_tree), resolution)).encode())
+    coords = np.empty(len(mesh.vertices) * 3, dtype=np.float32)
+    mesh.vertices.foreach_get("co", coords)
+    digest.update(coords.tobytes())
+    if mesh.uv_layers.active:
+        uvs = np.empty(len(mesh.loops) * 2, dtype=np.float32)
+        mesh.uv_layers.active.data.foreach_get("uv", uvs)
+        digest.update(uvs.tobytes())
+    return digest.hexdigest()
+
+def _bake_emit(obj, material, base_color, image, margin=4, samples=4):
+    """Bake the base colour graph of one object's material into an image via an Emission shader"""
+    tree = material.node_tree
+    nodes, links = tree.nodes, tree.links
+    output = next(node for node in nodes if node.bl_idname == "ShaderNodeOutputMaterial" and node.is_active_output)
+    surface_link = output.inputs["Surface"].links[0] if output.inputs["Surface"].is_linked else None
+    surface_source = surface_link.from_socket if surface_link else None
+
+    emission = nodes.new("ShaderNodeEmission")
+    target = nodes.new("ShaderNodeTexImage")
+    target.image = image
+    links.new(base_color.links[0].from_socket, emission.inputs["Color"])
+    links.new(emission.outputs["Emission"], output.inputs["Surface"])
+    nodes.active = target  # The bake writes into the active image node
+
+    for other in bpy.context.view_layer.objects.selected:
+        other.select_set(False)
+    obj.select_set(True)
+    bpy.context.view_layer.objects.active = obj
+    cycles = bpy.context.scene.cycles
+    saved_samples = cycles.samples
+    cycles.samples = samples  # Emission needs no light paths; a few samples anti-alias the texels
+    try:
+        bpy.ops.object.bake(type='EMIT', margin=margin, use_clear=True)
+    finally:
+        cycles.samples = saved_samples
+        nodes.remove(emission)
+        nodes.remove(target)
+        if surface_source is not None:
+            links.new(surface_source, output.inputs["Surface"])
+
+def image_material(material, bsdf, image):
+    """Copy of a material's BSDF settings with the base colour read from a baked image"""
+    baked = bpy.data.materials.new(f"{material.name}_Baked")
+    baked.use_nodes = True
+    nodes = baked.node_tree.nodes
+    new_bsdf = nodes.get("Principled BSDF")
+    for socket in bsdf.inputs:
+        if not socket.is_linked and hasattr(socket, "default_value") and socket.identifier in new_bsdf.inputs:
+            new_bsdf.inputs[socket.identifier].default_value = socket.default_value
+    texture = nodes.new("ShaderNodeTexImage")
+    texture.image = image
+    texture.location = (-400, 0)
+    uv = nodes.new("ShaderNodeUVMap")
+    uv.location = (-600, 0)
+    baked.node_tree.links.new(uv.outputs["UV"], texture.inputs["Vector"])
+    baked.node_tree.links.new(texture.outputs["Color"], new_bsdf.inputs["Base Color"])
+    baked.blend_method = material.blend_method
+    baked["baked_from"] = material.name
+    return baked
+
+def probe_render_seconds(scene, percentage=25, samples=16):
+    """Time a small, low-sample render of the current frame"""
+    render = scene.render
+    saved = (render.resolution_percentage, scene.cycles.samples, render.filepath)
+    render.resolution_percentage = percentage
+    scene.cycles.samples = samples
+    try:
+        started = time.perf_counter()
+        bpy.ops.render.render()
+        return time.perf_counter() - started
+    finally:
+        render.resolution_percentage, scene.cycles.samples, render.filepath = saved
+
+def bake_procedural_materials(objects=None, resolution=1024, cache_dir="material_cache", scene=None,
+                              probe=True):
+    """Bake procedural base colours to cached images and swap in image materials; returns a report"""
+    scene = scene or bpy.context.scene
+    cache_dir = bpy.path.abspath(cache_dir)
+    os.makedirs(cache_dir, exist_ok=True)
+    objects = [obj for obj in (scene.objects if objects is None else objects) if obj.type == 'MESH']
+
+    saved_engine = scene.render.engine
+    scene.render.engine = 'CYCLES'  # Baking and the probe renders need Cycles
+    report = []
+    try:
+        baseline = probe_render_seconds(scene) if probe else None
+        baked_meshes = {}
+        for obj in objects:
+            for slot in obj.material_slots:
+                material = slot.material
+                found = procedural_base_color(material)
+                if found is None:
+                    continue
+                if not obj.data.uv_layers:
+                    print(f"Material baking: {obj.name} has no UVs, keeping {material.name} procedural")
+                    continue
+                bsdf, base_color = found
+
+                # One image per material and mesh; equal meshes share it
+                key = bake_key(material, obj.data, resolution)
+                if key not in baked_meshes:
+                    path = os.path.join(cache_dir, f"{key}.png")
+                    cached = os.path.exists(path)
+                    if cached:
+                        image = bpy.data.images.load(path, check_existing=True)
+                    else:
+                        image = bpy.data.images.new(f"{material.name}_Bake", resolution, resolution)
+                        started = time.perf_counter()
+                        _bake_emit(obj, material, base_color, image)
+                        print(f"Baked {material.name} on {obj.name} in {time.perf_counter() - started:.1f}s")
+                        image.filepath_raw = path
+                        image.file_format = 'PNG'
+                        image.save()
+                    baked_meshes[key] = (image_material(material, bsdf, image), path, cached)
+                baked, path, cached = baked_meshes[key]
+                slot.material = baked
+
+                entry = {"object": obj.name, "material": material.name, "image": path, "cached": cached}
+                if probe:
+                    after = probe_render_seconds(scene)
+                    entry["probe_before"] = round(baseline, 3)
+                    entry["probe_after"] = round(after, 3)
+                    entry["speedup"] = round(baseline / after, 2) if after > 0 else None
+                    baseline = after
+                report.append(entry)
+    finally:
+        scene.render.engine = saved_engine
+
+    for entry in report:
+        speed = f", render {entry['speedup']}x faster" if entry.get("speedup") else ""
+        source = "cache" if entry["cached"] else "baked"
+        print(f"  {entry['material']} on {entry['object']}: {source}{speed}")
+    print(f"Material baking: {len(report)} procedural materials swapped for image textures")
+    return report
+
+def restore_procedural_materials(objects=None, scene=None):
+    """Put the original procedural materials back"""
+    scene = scene or bpy.context.scene
+    for obj in (scene.objects if objects is None else objects):
+        for slot in obj.material_slots:
+            original = slot.material.get("baked_from") if slot.material else None
+            if original and original in bpy.data.materials:
+                slot.material = bpy.data.materials[original]
+
+def main(argv=None):
+    """Command line entry: bake the procedural materials of the open or built scene"""
+    import argparse
+    import scenarios
+
+    parser = argparse.ArgumentParser(description="Bake procedural materials to cached image textures")
+    parser.add_argument("--scenario", choices=sorted(scenarios.SCENARIOS), default=None)
+    parser.add_argument("--resolution", type=int, default=1024)
+    parser.add_argument("--cache", default="material_cache", help="Directory for the baked images")
+    parser.add_argument("--no-probe", action="store_true", help="Skip the speedup probe renders")
+    parser.add_argument("--save", default=None, help="Save the .blend afterwards")
+    args = parser.parse_args(scenarios.script_args() if argv is None else argv)
+
+    if args.scenario:
+        scenarios.run_scenario(args.scenario)
+    bake_procedural_materials(resolution=args.resolution, cache_dir=args.cache, probe=not args.no_probe)
+    if args.save:
+        bpy.ops.wm.save_as_mainfile(filepath=bpy.path.abspath(args.save))
+
+if __name__ == "__main__":
+    import sys
+    sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+    main()
@@ -0,0 +1,219 @@
+"""
+Blender Python Animation: Mesh Level of Detail
+Switches spheres and cylinders between low, mid and high resolution meshes by their size on screen
+
+Every sphere or cylinder (recognised from its vertices, so the balls, missiles and tank parts
+all qualify) gets three child objects that share one precomputed mesh per level and
+primitive. For every frame the projected diameter in pixels picks the level, and the
+children's hide_render/hide_viewport are keyed only where the level changes. The original
+object only leaves the render: its mesh, rigid body settings and any baked point cache stay
+exactly as they were, so the simulation keeps colliding with what it was baked with.
+
+Usage from the command line:
+    blender -b scene.blend --python mesh_lod.py -- --save lod.blend
+    blender -b --python mesh_lod.py -- --scenario ball --thresholds 40 160
+"""
+
+import os
+
+import numpy as np
+
+try:
+    import bpy
+    import bmesh
+    from mathutils import Matrix
+except ImportError:  # Level selection runs on plain arrays
+    bpy = None
+
+# Resolution of each level: sphere (segments, rings), cylinder (vertices around)
+LOD_RESOLUTION = {
+    "sphere": [(8, 4), (16, 8), (48, 24)],
+    "cylinder": [8, 16, 48],
+}
+LOD_NAMES = ["Low", "Mid", "High"]
+# Projected diameter in pixels at which the mid and the high level take over
+DEFAULT_THRESHOLDS = (40.0, 160.0)
+
+def detect_primitive(mesh, tolerance=0.02):
+    """'sphere', 'cylinder' or None, from where a mesh's vertices lie in its bounding box"""
+    if len(mesh.vertices) < 8:
+        return None
+    coords = np.empty(len(mesh.vertices) * 3, dtype=np.float64)
+    mesh.vertices.foreach_get("co", coords)
+    coords = coords.reshape(-1, 3)
+    low, high = coords.min(axis=0), coords.max(axis=0)
+    half = (high - low) / 2
+    if np.any(half <= 0):
+        return None
+    unit = (coords - (low + high) / 2) / half  # Squash the bounding box to a unit cube
+
+    if np.all(np.abs(np.linalg.norm(unit, axis=1) - 1) < tolerance):
+        return "sphere"
+    radial = np.linalg.norm(unit[:, :2], axis=1)
+    on_caps = np.abs(np.abs(unit[:, 2]) - 1) < tolerance
+    on_rim = (np.abs(radial - 1) < tolerance) | (radial < tolerance)  # Rim or cap centre
+    if np.all(on_caps & on_rim):
+        return "cylinder"
+    return None
+
+def lod_mesh(kind, level):
+    """Shared unit-size mesh (fits a -1..1 box) for one primitive and level, built once"""
+    name = f"LOD_{kind}_{LOD_NAMES[level]}"
+    mesh = bpy.data.meshes.get(name)
+    if mesh is not None:
+        return mesh
+    bm = bmesh.new()
+    bm.loops.layers.uv.new("UVMap")
+    if kind == "sphere":
+        segments, rings = LOD_RESOLUTION[kind][level]
+        bmesh.ops.create_uvsphere(bm, u_segments=segments, v_segments=rings, radius=1.0, calc_uvs=True)
+        for face in bm.faces:
+            face.smooth = True
+    else:
+        bmesh.ops.create_cone(bm, cap_ends=True, cap_tris=False, segments=LOD_RESOLUTION[kind][level],
+                              radius1=1.0, radius2=1.0, depth=2.0, calc_uvs=True)
+    mesh = bpy.data.meshes.new(name)
+    bm.to_mesh(mesh)
+    bm.free()
+    mesh.materials.append(None)  # Slot for the object-linked material of each user
+    return mesh
+
+def projected_diameters(camera_matrix, centres, radii, focal_pixels, ortho_scale=None, resolution=None):
+    """Diameter in pixels of bounding spheres (N,) for one camera pose; 0 behind the camera"""
+    inverse = np.linalg.inv(camera_matrix)
+    depth = -(centres @ inverse[:3, :3].T + inverse[:3, 3])[:, 2]
+    if ortho_scale is not None:
+        return np.where(depth > 0, 2 * radii * resolution / ortho_scale, 0.0)
+    return np.where(depth > 0, 2 * radii * focal_pixels / np.maximum(depth, radii), 0.0)
+
+def select_levels(diameters, thresholds=DEFAULT_THRESHOLDS):
+    """LOD level (0 low .. 2 high) for projected diameters"""
+    return np.searchsorted(np.asarray(thresholds), diameters, side="right")
+
+def setup_lod_object(obj, kind):
+    """Give an object its three LOD children and hide the object itself from the render"""
+    if "lod_proxy" in obj:
+        return [bpy.data.objects[f"{obj.name}_LOD{level}"] for level in range(len(LOD_NAMES))]
+    bounds = np.array([corner[:] for corner in obj.bound_box], dtype=np.float64)
+    centre = (bounds.max(axis=0) + bounds.min(axis=0)) / 2
+    half = (bounds.max(axis=0) - bounds.min(axis=0)) / 2
+    fit = Matrix.Translation(centre.tolist()) @ Matrix.Diagonal((*half.tolist(), 1.0))
+    material = obj.active_material
+
+    # The children must not join the rigid body world through its collection
+    rigid_collections = {scene.rigidbody_world.collection for scene in bpy.data.scenes if scene.rigidbody_world}
+    children = []
+    for level in range(len(LOD_NAMES)):
+        child = bpy.data.objects.new(f"{obj.name}_LOD{level}", lod_mesh(kind, level))
+        for collection in obj.users_collection:
+            if collection not in rigid_collections:
+                collection.objects.link(child)
+        child.parent = obj
+        child.matrix_parent_inverse = Matrix.Identity(4)
+        child.matrix_basis = fit
+        child.material_slots[0].link = 'OBJECT'
+        child.material_slots[0].material = material
+        child["lod_level"] = level
+        children.append(child)
+
+    # Render visibility only: mesh, collision shape and point cache stay as simulated
+    obj.hide_render = True
+    obj.display_type = 'WIRE'
+    obj["lod_proxy"] = kind
+    obj["lod_radius"] = float(half.max() if kind == "sphere" else np.linalg.norm(half))
+    obj["lod_centre"] = centre.tolist()
+    return children
+
+def compute_levels(objects, camera=None, frame_start=None, frame_end=None, scene=None,
+                   thresholds=DEFAULT_THRESHOLDS):
+    """(frames, objects) LOD level of each proxy object for the animated camera"""
+    from baked_transforms import iter_frame_matrices
+
+    scene = scene or bpy.context.scene
+    camera = camera or scene.camera
+    frame_start = scene.frame_start if frame_start is None else frame_start
+    frame_end = scene.frame_end if frame_end is None else frame_end
+    render = scene.render
+    resolution = max(render.resolution_x, render.resolution_y) * render.resolution_percentage / 100
+
+    local_centres = np.array([obj["lod_centre"] for obj in objects], dtype=np.float64)
+    local_radii = np.array([obj["lod_radius"] for obj in objects], dtype=np.float64)
+    levels = np.zeros((frame_end - frame_start + 1, len(objects)), dtype=np.int64)
+    for frame, matrices in iter_frame_matrices([camera] + list(objects), frame_start, frame_end, scene):
+        matrices = matrices.astype(np.float64)
+        basis = matrices[1:, :3, :3]
+        centres = np.einsum("nij,nj->ni", basis, local_centres) + matrices[1:, :3, 3]
+        radii = local_radii * np.linalg.norm(basis, axis=1).max(axis=1)
+        data = camera.data
+        focal_pixels = resolution / (2 * np.tan(data.angle / 2))
+        ortho_scale = data.ortho_scale if data.type == 'ORTHO' else None
+        diameters = projected_diameters(matrices[0], centres, radii, focal_pixels, ortho_scale, resolution)
+        levels[frame - frame_start] = select_levels(diameters, thresholds)
+    return levels
+
+def apply_mesh_lod(objects=None, camera=None, frame_start=None, frame_end=None, scene=None,
+                   thresholds=DEFAULT_THRESHOLDS, viewport=True):
+    """Set up LOD children for spheres and cylinders and key the visible level per frame"""
+    from frustum_culling import key_constant_fcurve
+
+    scene = scene or bpy.context.scene
+    frame_start = scene.frame_start if frame_start is None else frame_start
+    frame_end = scene.frame_end if frame_end is None else frame_end
+    if objects is None:
+        # Same rules as culling: meshes that are not particle emitters, particle instances or LOD levels
+        from frustum_culling import cullable_objects
+        objects = cullable_objects(scene) + [obj for obj in scene.objects if "lod_proxy" in obj]
+
+    proxies, children = [], []
+    for obj in sorted(objects, key=lambda obj: obj.name):
+        kind = obj.get("lod_proxy") or detect_primitive(obj.data)
+        if kind is None:
+            continue
+        children.append(setup_lod_object(obj, kind))
+        proxies.append(obj)
+    if not proxies:
+        print("Mesh LOD: no spheres or cylinders found")
+        return None
+
+    levels = compute_levels(proxies, camera, frame_start, frame_end, scene, thresholds)
+    frames = np.arange(frame_start, frame_end + 1)
+    for i, lod_children in enumerate(children):
+        for level, child in enumerate(lod_children):
+            hidden = (levels[:, i] != level).astype(np.float32)
+            rows = np.concatenate([[0], np.flatnonzero(hidden[1:] != hidden[:-1]) + 1])
+            key_constant_fcurve(child, "hide_render", frames[rows], hidden[rows])
+            if viewport:
+                key_constant_fcurve(child, "hide_viewport", frames[rows], hidden[rows])
+
+    # Geometry the renderer sees compared with keeping every object at the high level
+    vertex_counts = np.array([[len(child.data.vertices) for child in lod_children] for lod_children in children])
+    used = np.take_along_axis(vertex_counts[None, :, :], levels[:, :, None], axis=2)[..., 0].sum(axis=1)
+    share = np.bincount(levels.ravel(), minlength=len(LOD_NAMES)) / levels.size
+    print(f"Mesh LOD: {len(proxies)} objects, level share " +
+          ", ".join(f"{name.lower()} {value:.0%}" for name, value in zip(LOD_NAMES, share)) +
+          f", {used.mean():.0f} vertices per frame vs {vertex_counts[:, -1].sum()} at full detail")
+    return levels
+
+def main(argv=None):
+    """Command line entry: add LODs to the open or built scene"""
+    import argparse
+    import scenarios
+
+    parser = argparse.ArgumentParser(description="Screen-size driven LOD for spheres and cylinders")
+    parser.add_argument("--scenario", choices=sorted(scenarios.SCENARIOS), default=None)
+    parser.add_argument("--thresholds", type=float, nargs=2, default=list(DEFAULT_THRESHOLDS),
+                        metavar=("MID", "HIGH"), help="Projected diameters in pixels for the mid and high level")
+    parser.add_argument("--render-only", action="store_true", help="Leave viewport visibility alone")
+    parser.add_argument("--save", default=None, help="Save the .blend afterwards")
+    args = parser.parse_args(scenarios.script_args() if argv is None else argv)
+
+    if args.scenario:
+        scenarios.run_scenario(args.scenario)
+    apply_mesh_lod(thresholds=tuple(args.thresholds), viewport=not args.render_only)
+    if args.save:
+        bpy.ops.wm.save_as_mainfile(filepath=bpy.path.abspath(args.save))
+
+if __name__ == "__main__":
+    import sys
+    sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+    main()
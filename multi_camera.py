@@ -0,0 +1,292 @@
+"""
+Blender Python Animation: Multi-Camera Rendering
+Renders several cameras of one built and baked scene, each into its own frame sequence
+
+The scene is built and baked once; the cameras only change what is rendered. Each camera
+gets its own directory with a resumable sequence (sequence_render.py manifest) and an
+optional video. Cycles keeps its scene data (BVH, loaded textures) between renders through
+persistent data, so only the first render pays for building it.
+
+    sequential   each camera renders its whole range in turn
+    interleaved  every frame is evaluated once and rendered by all cameras before moving
+                 on, so the scene at that frame (and its BVH) is shared by every camera
+
+Camera spec (JSON list); "main" is the scene's own camera, the others are added:
+    [
+        {"name": "main"},
+        {"name": "Wide", "location": [0, -30, 18], "target": [0, 0, 1], "lens": 24},
+        {"name": "CloseUp", "follow": "Ball", "offset": [-3, -4, 1.5], "lens": 85, "frame_start": 20}
+    ]
+Without a spec, a wide shot and a close-up are placed around the scene's objects.
+
+Usage from the command line:
+    blender -b scene.blend --python multi_camera.py -- --out cameras/ --mode interleaved
+    blender -b --python multi_camera.py -- --scenario tank --cameras shots.json --video
+"""
+
+import json
+import os
+import time
+
+import numpy as np
+
+try:
+    import bpy
+except ImportError:  # Keeps the module importable outside Blender
+    bpy = None
+
+MAIN_CAMERA = "main"
+MODES = ("sequential", "interleaved")
+
+def scene_centre(scene):
+    """Centre and radius of the visible mesh objects' bounding boxes (ground excluded)"""
+    corners = []
+    for obj in scene.objects:
+        if obj.type != 'MESH' or obj.hide_render or obj.name == "Ground":
+            continue
+        matrix = np.array(obj.matrix_world, dtype=np.float64)
+        box = np.array([corner[:] for corner in obj.bound_box], dtype=np.float64)
+        corners.append(box @ matrix[:3, :3].T + matrix[:3, 3])
+    if not corners:
+        return np.zeros(3), 10.0
+    corners = np.concatenate(corners)
+    low, high = corners.min(axis=0), corners.max(axis=0)
+    return (low + high) / 2, float(np.linalg.norm(high - low) / 2)
+
+def default_cameras(scene):
+    """The scene camera plus a wide shot and a close-up along its viewing direction"""
+    centre, radius = scene_centre(scene)
+    camera = scene.camera
+    if camera is not None:
+        direction = np.array(camera.matrix_world.translation[:]) - centre
+    else:
+        direction = np.array([0.0, -1.0, 0.5])
+    direction /= np.linalg.norm(direction) or 1.0
+    specs = [{"name": MAIN_CAMERA}] if camera is not None else []
+    specs.append({"name": "Wide", "location": (centre + direction * radius * 2.5).tolist(),
+                  "target": centre.tolist(), "lens": 24})
+    specs.append({"name": "CloseUp", "location": (centre + direction * radius * 1.2).tolist(),
+                  "target": centre.tolist(), "lens": 85})
+    return specs
+
+def add_camera(spec, scene=None):
+    """Create (or update) the camera for a spec; returns the camera object"""
+    scene = scene or bpy.context.scene
+    if spec["name"] == MAIN_CAMERA:
+        if scene.camera is None:
+            raise RuntimeError("The scene has no camera to use as 'main'")
+        return scene.camera
+
+    camera = bpy.data.objects.get(spec["name"])
+    if camera is None:
+        camera = bpy.data.objects.new(spec["name"], bpy.data.cameras.new(spec["name"]))
+        scene.collection.objects.link(camera)
+    camera.data.lens = spec.get("lens", 50)
+    camera.data.clip_end = spec.get("clip_end", camera.data.clip_end)
+    for constraint in list(camera.constraints):
+        camera.constraints.remove(constraint)
+
+    follow = bpy.data.objects.get(spec["follow"]) if spec.get("follow") else None
+    if spec.get("follow") and follow is None:
+        raise KeyError(f"Camera {spec['name']}: no object named '{spec['follow']}' to follow")
+    if follow is not None:
+        # Keep an offset from the followed object and look at it
+        camera.location = spec.get("offset", (0, -6, 2))
+        copy = camera.constraints.new('COPY_LOCATION')
+        copy.target = follow
+        copy.use_offset = True
+        track = camera.constraints.new('TRACK_TO')
+        track.target = follow
+    else:
+        camera.location = spec["location"]
+        target = spec.get("target", (0, 0, 0))
+        if isinstance(target, str):
+            track = camera.constraints.new('TRACK_TO')
+            track.target = bpy.data.objects[target]
+        else:
+            empty = bpy.data.objects.get(f"{spec['name']}_Target")
+            if empty is None:
+                empty = bpy.data.objects.new(f"{spec['name']}_Target", None)
+                scene.collection.objects.link(empty)
+            empty.location = target
+            track = camera.constraints.new('TRACK_TO')
+            track.target = empty
+    track.track_axis = 'TRACK_NEGATIVE_Z'
+    track.up_axis = 'UP_Y'
+    return camera
+
+def _camera_outputs(scene, camera, output_dir, video, file_format, prefix, restart):
+    """Per-camera state: output directory, manifest, frames already done and encoder"""
+    import shutil
+    from render_cache import settings_digest
+    from sequence_render import VideoEncoder, finished_frames, load_manifest
+
+    directory = os.path.join(output_dir, camera["name"])
+    os.makedirs(directory, exist_ok=True)
+    scene.camera = camera["object"]
+    settings = settings_digest(scene)  # Includes the active camera
+    manifest = None if restart else load_manifest(directory)
+    if manifest and manifest.get("settings") != settings:
+        print(f"{camera['name']}: render settings changed, starting its sequence over")
+        manifest = None
+    manifest = manifest or {"frames": {}}
+    fps = scene.render.fps / scene.render.fps_base
+    manifest.update({"settings": settings, "frame_start": camera["frame_start"],
+                     "frame_end": camera["frame_end"], "fps": fps, "format": file_format,
+                     "camera": camera["object"].name})
+    encoder = None
+    if video:
+        if shutil.which("ffmpeg"):
+            encoder = VideoEncoder(os.path.join(output_dir, f"{camera['name']}.mp4"), fps)
+        else:
+            print("ffmpeg not found, writing the image sequences only")
+    done = finished_frames(manifest, directory)
+    if encoder and file_format != "PNG":
+        # EXR frames from a run without encoding have no PNG for the video yet
+        done = {frame for frame in done if os.path.exists(os.path.join(directory, f"{prefix}{frame:04d}.png"))}
+    return {"dir": directory, "manifest": manifest, "done": done, "encoder": encoder}
+
+def _render_interleaved(scene, cameras, output_dir, video, file_format, prefix, restart, timings):
+    """Evaluate each frame once and render it from every camera that covers it"""
+    from sequence_render import EXTENSIONS, MANIFEST_NAME, save_result, write_atomic
+
+    outputs = {camera["name"]: _camera_outputs(scene, camera, output_dir, video, file_format, prefix, restart)
+               for camera in cameras}
+    first = min(camera["frame_start"] for camera in cameras)
+    last = max(camera["frame_end"] for camera in cameras)
+    try:
+        for frame in range(first, last + 1):
+            scene.frame_set(frame)
+            for camera in cameras:
+                if not camera["frame_start"] <= frame <= camera["frame_end"]:
+                    continue
+                output = outputs[camera["name"]]
+                image = os.path.join(output["dir"], f"{prefix}{frame:04d}{EXTENSIONS[file_format]}")
+                preview = os.path.join(output["dir"], f"{prefix}{frame:04d}.png")
+                if frame not in output["done"]:
+                    started = time.perf_counter()
+                    scene.camera = camera["object"]
+                    bpy.ops.render.render()
+                    save_result(scene, image, file_format)
+                    if file_format != "PNG" and output["encoder"]:
+                        save_result(scene, preview, "PNG")
+                    seconds = time.perf_counter() - started
+                    timings[camera["name"]].append(seconds)
+                    files = [path for path in (image, preview) if os.path.exists(path)]
+                    output["manifest"]["frames"][frame] = {
+                        "files": {os.path.basename(path): os.path.getsize(path) for path in files},
+                        "seconds": round(seconds, 3),
+                    }
+                    write_atomic(os.path.join(output["dir"], MANIFEST_NAME),
+                                 json.dumps(output["manifest"], indent=1))
+                if output["encoder"]:
+                    output["encoder"].add(preview if file_format != "PNG" else image)
+            print(f"Frame {frame}/{last} done for every camera")
+    except BaseException:
+        for output in outputs.values():
+            if output["encoder"]:
+                output["encoder"].abort()
+        raise
+    return {name: (output["encoder"].video_path if output["encoder"] and output["encoder"].finish() else None)
+            for name, output in outputs.items()}
+
+def render_cameras(specs=None, output_dir="cameras", mode="interleaved", scene=None, video=False,
+                   file_format="PNG", prefix="frame_", restart=False, persistent_data=True):
+    """Render every camera's frame range from the one loaded scene; returns per-camera timings"""
+    from sequence_render import load_manifest, render_sequence
+
+    scene = scene or bpy.context.scene
+    if mode not in MODES:
+        raise ValueError(f"Unknown mode '{mode}', choose from: {', '.join(MODES)}")
+    output_dir = bpy.path.abspath(output_dir)
+    os.makedirs(output_dir, exist_ok=True)
+    specs = specs or default_cameras(scene)
+    original_camera = scene.camera
+
+    cameras = []
+    for spec in specs:
+        cameras.append({"name": spec["name"], "object": add_camera(spec, scene),
+                        "frame_start": spec.get("frame_start", scene.frame_start),
+                        "frame_end": spec.get("frame_end", scene.frame_end)})
+
+    render = scene.render
+    saved_persistent = render.use_persistent_data
+    render.use_persistent_data = persistent_data  # Cycles keeps BVH and textures between renders
+    timings = {camera["name"]: [] for camera in cameras}
+    videos = {}
+    started = time.perf_counter()
+    try:
+        if mode == "sequential":
+            for camera in cameras:
+                scene.camera = camera["object"]
+                video_path = os.path.join(output_dir, f"{camera['name']}.mp4") if video else None
+                camera_started = time.perf_counter()
+                result = render_sequence(os.path.join(output_dir, camera["name"]), video_path,
+                                         camera["frame_start"], camera["frame_end"], scene,
+                                         file_format=file_format, prefix=prefix, restart=restart)
+                manifest = load_manifest(result["output_dir"])
+                timings[camera["name"]] = [manifest["frames"][frame]["seconds"] for frame in result["rendered"]]
+                videos[camera["name"]] = result["video"]
+                print(f"{camera['name']}: {len(result['rendered'])} frames in "
+                      f"{time.perf_counter() - camera_started:.1f}s")
+        else:
+            videos = _render_interleaved(scene, cameras, output_dir, video, file_format, prefix, restart, timings)
+    finally:
+        render.use_persistent_data = saved_persistent
+        scene.camera = original_camera
+
+    report = {"mode": mode, "persistent_data": persistent_data,
+              "seconds": round(time.perf_counter() - started, 3), "cameras": {}}
+    for camera in cameras:
+        seconds = timings[camera["name"]]
+        report["cameras"][camera["name"]] = {
+            "camera": camera["object"].name,
+            "frames": [camera["frame_start"], camera["frame_end"]],
+            "rendered": len(seconds),
+            "seconds": round(sum(seconds), 3),
+            "seconds_per_frame": round(sum(seconds) / len(seconds), 3) if seconds else None,
+            "first_frame_seconds": round(seconds[0], 3) if seconds else None,
+            "video": videos.get(camera["name"]),
+        }
+    with open(os.path.join(output_dir, "multi_camera.json"), "w") as f:
+        json.dump(report, f, indent=2)
+
+    print("=" * 60)
+    print(f"MULTI-CAMERA RENDER ({mode}, {report['seconds']:.1f}s total)")
+    print("=" * 60)
+    for name, entry in report["cameras"].items():
+        per_frame = f"{entry['seconds_per_frame']:.2f}s per frame" if entry["rendered"] else "nothing to render"
+        print(f"  {name:<12} {entry['rendered']:4d} frames, {per_frame}")
+    print("=" * 60)
+    return report
+
+def main(argv=None):
+    """Command line entry: render several cameras of the open or built scene"""
+    import argparse
+    import scenarios
+
+    parser = argparse.ArgumentParser(description="Render several cameras from one scene load and bake")
+    parser.add_argument("--scenario", choices=sorted(scenarios.SCENARIOS), default=None)
+    parser.add_argument("--cameras", default=None, help="Camera spec JSON (default: main, wide and close-up)")
+    parser.add_argument("--out", default="cameras", help="Directory with one sub-directory per camera")
+    parser.add_argument("--mode", choices=MODES, default="interleaved")
+    parser.add_argument("--video", action="store_true", help="Encode an .mp4 per camera while rendering")
+    parser.add_argument("--format", choices=["PNG", "EXR"], default="PNG")
+    parser.add_argument("--restart", action="store_true", help="Ignore frames from an earlier run")
+    parser.add_argument("--no-persistent-data", action="store_true", help="Rebuild render data for every frame")
+    args = parser.parse_args(scenarios.script_args() if argv is None else argv)
+
+    if args.scenario:
+        scenarios.run_scenario(args.scenario)
+    specs = None
+    if args.cameras:
+        with open(args.cameras) as f:
+            specs = json.load(f)
+    render_cameras(specs, args.out, args.mode, video=args.video,
+                   file_format="OPEN_EXR" if args.format == "EXR" else "PNG",
+                   restart=args.restart, persistent_data=not args.no_persistent_data)
+
+if __name__ == "__main__":
+    import sys
+    sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+    main()
@@ -0,0 +1,321 @@
+"""
+Blender Python Animation: Domino Parameter Sweep
+Runs many domino layouts across a pool of background Blender processes and scores each one
+
+Every run builds the scene with animate_falling_dominoes(**params), bakes it, scores the
+chain reaction (chain_analytics.py) and reports completion against bake cost. Results go to
+a CSV (or Parquet) table plus a Pareto summary of reliability versus bake time.
+
+Sweep spec (JSON), one entry per animate_falling_dominoes parameter:
+    {
+        "spacing": {"min": 0.45, "max": 1.0, "steps": 6},
+        "friction": [0.3, 0.4, 0.6],
+        "substeps": {"min": 5, "max": 20, "steps": 4, "int": true}
+    }
+
+Usage (plain Python, launches Blender itself):
+    python parameter_sweep.py sweep.json --sampler lhs --samples 64 --repeats 3 --jobs 4 --out sweep.csv
+
+Add --prefilter 0.5 to skip layouts the analytic model (chain_predictor.py) rules out before
+half of the dominoes have fallen: overlapping dominoes, or gaps the falling domino cannot
+bridge. The model is a geometric screen, not a calibrated prediction of which layouts work.
+A few of the skipped layouts are still baked (--prefilter-check, default 2) to show whether
+its rejections hold on this setup.
+"""
+
+import csv
+import itertools
+import json
+import os
+import random
+import subprocess
+import sys
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+# Ranges used when no spec file is given (around the hand-tuned values)
+DEFAULT_SPEC = {
+    "spacing": {"min": 0.45, "max": 1.1, "steps": 5},
+    "domino_height": {"min": 1.5, "max": 2.5, "steps": 3},
+    "mass_jitter": {"min": 0.0, "max": 0.2, "steps": 3},
+    "friction": {"min": 0.2, "max": 0.8, "steps": 3},
+    "substeps": [5, 10, 20],
+    "ball_contact_frame": [15, 25, 35],
+}
+
+def parameter_values(entry):
+    """Discrete values for one parameter entry (list or min/max/steps)"""
+    if isinstance(entry, list):
+        return entry
+    steps = max(int(entry.get("steps", 3)), 1)
+    low, high = entry["min"], entry["max"]
+    if steps == 1:
+        values = [low]
+    else:
+        values = [low + (high - low) * i / (steps - 1) for i in range(steps)]
+    if entry.get("int"):
+        values = sorted(set(int(round(v)) for v in values))
+    return values
+
+def _from_unit(entry, u):
+    """Map u in [0, 1) to a value of a parameter entry"""
+    if isinstance(entry, list):
+        return entry[min(int(u * len(entry)), len(entry) - 1)]
+    value = entry["min"] + (entry["max"] - entry["min"]) * u
+    return int(round(value)) if entry.get("int") else value
+
+def grid_samples(spec):
+    """Full factorial grid over every parameter's values"""
+    names = list(spec)
+    for combo in itertools.product(*(parameter_values(spec[name]) for name in names)):
+        yield dict(zip(names, combo))
+
+def random_samples(spec, count, seed=0):
+    """Independent uniform samples inside each parameter's range"""
+    rng = random.Random(seed)
+    for _ in range(count):
+        yield {name: _from_unit(entry, rng.random()) for name, entry in spec.items()}
+
+def latin_hypercube_samples(spec, count, seed=0):
+    """Latin hypercube: each parameter's range is split into count strata, each used once"""
+    rng = random.Random(seed)
+    columns = {}
+    for name in spec:
+        strata = list(range(count))
+        rng.shuffle(strata)
+        columns[name] = [(s + rng.random()) / count for s in strata]
+    for i in range(count):
+        yield {name: _from_unit(spec[name], columns[name][i]) for name in spec}
+
+def make_runs(spec, sampler="grid", samples=32, repeats=1, seed=0):
+    """Expand the spec into run dicts (params plus a per-repeat seed)"""
+    if sampler == "grid":
+        points = list(grid_samples(spec))
+    elif sampler == "random":
+        points = list(random_samples(spec, samples, seed))
+    elif sampler == "lhs":
+        points = list(latin_hypercube_samples(spec, samples, seed))
+    else:
+        raise ValueError(f"Unknown sampler '{sampler}'")
+    runs = []
+    for point_id, params in enumerate(points):
+        for repeat in range(repeats):
+            runs.append({"point": point_id, "repeat": repeat,
+                         "params": dict(params, seed=seed * 1000 + point_id * repeats + repeat)})
+    return runs
+
+def prefilter_runs(runs, min_fraction=0.5):
+    """Split runs into (worth baking, skipped rows) using the analytic chain predictor"""
+    from chain_predictor import filter_layouts, layouts_from_runs
+
+    keep = filter_layouts(layouts_from_runs(runs), min_fraction=min_fraction)
+    selected = [run for run, ok in zip(runs, keep) if ok]
+    skipped = [{"point": run["point"], "repeat": run["repeat"], **run["params"],
+                "status": "skipped", "complete": False} for run, ok in zip(runs, keep) if not ok]
+    return selected, skipped
+
+def run_one_in_blender(run, result_path):
+    """Inside Blender: build, bake and score one layout, then write the result JSON"""
+    import scenarios
+    from pipeline_profiler import profile_pipeline
+    from baked_transforms import sample_baked_transforms
+    from chain_analytics import analyze_chain
+
+    animate = scenarios.load_scenario("dominoes")
+    result = {"point": run["point"], "repeat": run["repeat"], **run["params"]}
+    try:
+        profiler = profile_pipeline(animate, **run["params"])
+        totals = profiler.phase_totals()
+        transforms, index = sample_baked_transforms()
+        report = analyze_chain(transforms, index, trigger_frame=run["params"].get("ball_contact_frame", 25))
+        result.update({
+            "status": "ok",
+            "complete": report["complete"],
+            "completion_fraction": report["completion_fraction"],
+            "completion_seconds": report["completion_seconds"],
+            "wave_speed": report["wave_speed"],
+            "stalls": len(report["stalls"]),
+            "early_falls": len(report["early"]),
+            "bake_seconds": totals.get("bake", {}).get("wall", 0.0),
+            "build_seconds": profiler.root()["wall"],
+        })
+    except Exception as error:  # Record the failure instead of losing the whole sweep
+        result.update({"status": "error", "error": repr(error)})
+    with open(result_path, "w") as f:
+        json.dump(result, f)
+
+def launch_run(run, blender="blender", timeout=1800):
+    """Run one layout in a fresh background Blender process and return its result row"""
+    script = os.path.abspath(__file__)
+    with tempfile.TemporaryDirectory() as workdir:
+        result_path = os.path.join(workdir, "result.json")
+        command = [blender, "-b", "--factory-startup", "--python", script, "--",
+                   "--run-one", json.dumps(run), "--result", result_path]
+        started = time.perf_counter()
+        try:
+            completed = subprocess.run(command, capture_output=True, text=True, timeout=timeout)
+        except subprocess.TimeoutExpired:
+            return {"point": run["point"], "repeat": run["repeat"], **run["params"],
+                    "status": "timeout", "process_seconds": timeout}
+        elapsed = time.perf_counter() - started
+        if not os.path.exists(result_path):
+            tail = (completed.stderr or completed.stdout)[-500:]
+            return {"point": run["point"], "repeat": run["repeat"], **run["params"],
+                    "status": "crashed", "error": tail, "process_seconds": elapsed}
+        with open(result_path) as f:
+            row = json.load(f)
+        row["process_seconds"] = elapsed
+        return row
+
+def run_sweep(runs, jobs=2, blender="blender", timeout=1800):
+    """Run every layout on a pool of background Blender processes"""
+    rows = []
+    with ThreadPoolExecutor(max_workers=jobs) as pool:
+        futures = [pool.submit(launch_run, run, blender, timeout) for run in runs]
+        for done, future in enumerate(as_completed(futures), 1):
+            row = future.result()
+            rows.append(row)
+            status = "complete" if row.get("complete") else row.get("status")
+            print(f"[{done}/{len(runs)}] point {row['point']} repeat {row['repeat']}: {status}")
+    rows.sort(key=lambda row: (row["point"], row["repeat"]))
+    return rows
+
+def summarize_points(rows, parameter_names):
+    """Per-point reliability (share of repeats that completed) and mean bake time"""
+    points = {}
+    for row in rows:
+        entry = points.setdefault(row["point"], {"point": row["point"], "runs": 0, "completed": 0,
+                                                 "bake_seconds": 0.0, "bake_runs": 0})
+        for name in parameter_names:
+            entry[name] = row.get(name)
+        entry["runs"] += 1
+        entry["completed"] += 1 if row.get("complete") else 0
+        if row.get("status") == "ok":
+            entry["bake_seconds"] += row["bake_seconds"]
+            entry["bake_runs"] += 1
+    summary = []
+    for entry in points.values():
+        entry["reliability"] = entry["completed"] / entry["runs"]
+        entry["bake_seconds"] = entry["bake_seconds"] / entry["bake_runs"] if entry["bake_runs"] else None
+        del entry["bake_runs"]
+        summary.append(entry)
+    return summary
+
+def pareto_front(summary):
+    """Points not beaten on both reliability (higher) and bake time (lower)"""
+    candidates = [entry for entry in summary if entry["bake_seconds"] is not None]
+    front = []
+    for entry in candidates:
+        dominated = any(
+            other["reliability"] >= entry["reliability"] and other["bake_seconds"] <= entry["bake_seconds"]
+            and (other["reliability"] > entry["reliability"] or other["bake_seconds"] < entry["bake_seconds"])
+            for other in candidates
+        )
+        if not dominated:
+            front.append(entry)
+    return sorted(front, key=lambda entry: entry["bake_seconds"])
+
+def write_table(rows, path):
+    """Write result rows to CSV, or Parquet when the path ends in .parquet"""
+    if path.endswith(".parquet"):
+        try:
+            import pandas
+        except ImportError:
+            raise RuntimeError("Writing Parquet needs pandas with pyarrow; use a .csv path instead")
+        pandas.DataFrame(rows).to_parquet(path, index=False)
+        return path
+    columns = []
+    for row in rows:
+        for key in row:
+            if key not in columns:
+                columns.append(key)
+    with open(path, "w", newline="") as f:
+        writer = csv.DictWriter(f, fieldnames=columns)
+        writer.writeheader()
+        writer.writerows(rows)
+    return path
+
+def print_pareto(front, parameter_names):
+    """Print the reliability / bake time trade-off"""
+    print("=" * 60)
+    print("PARETO FRONT (reliability vs bake time)")
+    print("=" * 60)
+    for entry in front:
+        params = ", ".join(f"{name}={entry[name]:.3g}" if isinstance(entry[name], float) else f"{name}={entry[name]}"
+                           for name in parameter_names)
+        print(f"  {entry['reliability'] * 100:5.1f}% reliable, {entry['bake_seconds']:7.2f}s bake  ({params})")
+    print("=" * 60)
+
+def main(argv=None):
+    """Command line entry: either run a sweep or (inside Blender) run a single layout"""
+    import argparse
+
+    if argv is None:
+        argv = sys.argv[sys.argv.index("--") + 1:] if "--" in sys.argv else sys.argv[1:]
+    parser = argparse.ArgumentParser(description="Parallel domino parameter sweep")
+    parser.add_argument("spec", nargs="?", default=None, help="Sweep spec JSON (default: built-in ranges)")
+    parser.add_argument("--sampler", choices=["grid", "random", "lhs"], default="grid")
+    parser.add_argument("--samples", type=int, default=32, help="Points for random/lhs samplers")
+    parser.add_argument("--repeats", type=int, default=1, help="Seeds per point (reliability)")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--jobs", type=int, default=max((os.cpu_count() or 2) // 2, 1))
+    parser.add_argument("--blender", default=os.environ.get("BLENDER", "blender"))
+    parser.add_argument("--timeout", type=float, default=1800)
+    parser.add_argument("--out", default="sweep.csv")
+    parser.add_argument("--prefilter", type=float, default=None, metavar="FRACTION",
+                        help="Skip layouts that cannot geometrically topple this share of dominoes")
+    parser.add_argument("--prefilter-check", type=int, default=2, metavar="RUNS",
+                        help="Bake this many skipped layouts anyway to check the prediction")
+    parser.add_argument("--run-one", default=None, help=argparse.SUPPRESS)
+    parser.add_argument("--result", default=None, help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    if args.run_one:
+        run_one_in_blender(json.loads(args.run_one), args.result)
+        return
+
+    spec = DEFAULT_SPEC
+    if args.spec:
+        with open(args.spec) as f:
+            spec = json.load(f)
+    runs = make_runs(spec, args.sampler, args.samples, args.repeats, args.seed)
+    skipped = []
+    checks = []
+    if args.prefilter is not None:
+        all_runs = runs
+        runs, skipped = prefilter_runs(runs, args.prefilter)
+        print(f"Prefilter: {len(skipped)} runs ruled out by the chain geometry, skipped without baking")
+        if skipped and args.prefilter_check > 0:
+            # Spread the spot checks evenly over the skipped runs
+            step = max(len(skipped) // args.prefilter_check, 1)
+            picked = {(row["point"], row["repeat"]) for row in skipped[::step][:args.prefilter_check]}
+            checks = [run for run in all_runs if (run["point"], run["repeat"]) in picked]
+            skipped = [row for row in skipped if (row["point"], row["repeat"]) not in picked]
+            runs = runs + checks
+    print(f"Sweeping {len(runs)} runs on {args.jobs} Blender processes...")
+
+    started = time.perf_counter()
+    rows = run_sweep(runs, jobs=args.jobs, blender=args.blender, timeout=args.timeout)
+    if checks:
+        checked = {(run["point"], run["repeat"]) for run in checks}
+        wrong = sum(1 for row in rows if (row["point"], row["repeat"]) in checked
+                    and row.get("completion_fraction", 0.0) >= args.prefilter)
+        print(f"Prefilter check: {wrong} of {len(checks)} rejected layouts reached the threshold when baked"
+              + (" - the predictor is too strict for this spec, rerun without --prefilter" if wrong else ""))
+    rows = sorted(rows + skipped, key=lambda row: (row["point"], row["repeat"]))
+    write_table(rows, args.out)
+
+    parameter_names = list(spec)
+    summary = summarize_points(rows, parameter_names)
+    front = pareto_front(summary)
+    base = os.path.splitext(args.out)[0]
+    write_table(summary, base + "_points.csv")
+    if front:
+        write_table(front, base + "_pareto.csv")
+    print_pareto(front, parameter_names)
+    print(f"Sweep finished in {time.perf_counter() - started:.1f}s, results in {args.out}")
+
+if __name__ == "__main__":
+    sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+    main()
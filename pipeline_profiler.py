@@ -0,0 +1,261 @@
+"""
+Blender Python Animation: Pipeline Profiler
+Opt-in phase profiler for the animate_* pipelines (wall time, CPU time, memory, bpy.ops and depsgraph counts)
+
+Usage from the command line:
+    blender -b --python pipeline_profiler.py -- dominoes --trace profile_dominoes
+
+Usage from Python:
+    from pipeline_profiler import profile_pipeline
+    profiler = profile_pipeline(animate_falling_dominoes, trace_path="profile_dominoes")
+"""
+
+import json
+import os
+import time
+import tracemalloc
+from contextlib import contextmanager
+
+try:
+    import bpy
+except ImportError:  # Allows reading traces outside Blender
+    bpy = None
+
+# Profiler currently recording, None when profiling is off
+_active_profiler = None
+
+# Callbacks told about phase boundaries even without a profiler: listener(name, entering)
+phase_listeners = []
+
+class PipelineProfiler:
+    """Collects nested phase spans for one pipeline run"""
+
+    def __init__(self, name):
+        self.name = name
+        self.spans = []  # Finished spans, in completion order
+        self.stack = []  # Open spans, innermost last
+        self.origin = time.perf_counter()
+        self.result = None
+
+    def open_span(self, name):
+        """Start a phase span nested inside the current one"""
+        # Fold the running Python peak into the parent before resetting it
+        if self.stack:
+            parent = self.stack[-1]
+            parent["py_peak"] = max(parent["py_peak"], tracemalloc.get_traced_memory()[1])
+        tracemalloc.reset_peak()
+        span = {
+            "name": name,
+            "path": [s["name"] for s in self.stack] + [name],
+            "start": time.perf_counter(),
+            "cpu_start": time.process_time(),
+            "py_peak": 0,
+            "ops": 0,
+            "depsgraph_updates": 0,
+            "frame_changes": 0,
+            "child_wall": 0.0,
+        }
+        self.stack.append(span)
+        return span
+
+    def close_span(self):
+        """Finish the innermost span and fold its numbers into the parent"""
+        span = self.stack.pop()
+        span["wall"] = time.perf_counter() - span["start"]
+        span["cpu"] = time.process_time() - span["cpu_start"]
+        span["py_peak"] = max(span["py_peak"], tracemalloc.get_traced_memory()[1])
+        if self.stack:
+            parent = self.stack[-1]
+            parent["py_peak"] = max(parent["py_peak"], span["py_peak"])
+            parent["ops"] += span["ops"]
+            parent["depsgraph_updates"] += span["depsgraph_updates"]
+            parent["frame_changes"] += span["frame_changes"]
+            parent["child_wall"] += span["wall"]
+        self.spans.append(span)
+        return span
+
+    def count(self, key, amount=1):
+        """Attribute an event (operator call, depsgraph update) to the innermost span"""
+        if self.stack:
+            self.stack[-1][key] += amount
+
+    def root(self):
+        """The outermost span (the whole pipeline)"""
+        for span in self.spans:
+            if len(span["path"]) == 1:
+                return span
+        return None
+
+    def phase_totals(self):
+        """Sum wall/CPU time per phase name over all occurrences"""
+        totals = {}
+        for span in self.spans:
+            if len(span["path"]) == 1:
+                continue
+            entry = totals.setdefault(span["name"], {"wall": 0.0, "cpu": 0.0, "calls": 0, "py_peak": 0})
+            entry["wall"] += span["wall"]
+            entry["cpu"] += span["cpu"]
+            entry["calls"] += 1
+            entry["py_peak"] = max(entry["py_peak"], span["py_peak"])
+        return totals
+
+    def summary(self):
+        """One-line summary of where the time went"""
+        root = self.root()
+        if root is None:
+            return f"profile {self.name}: no data"
+        parts = [f"profile {self.name}: {root['wall']:.2f}s wall / {root['cpu']:.2f}s cpu"]
+        totals = self.phase_totals()
+        for name, entry in sorted(totals.items(), key=lambda item: -item[1]["wall"]):
+            parts.append(f"{name} {entry['wall']:.2f}s")
+        parts.append(f"ops {root['ops']}")
+        parts.append(f"depsgraph {root['depsgraph_updates']}")
+        parts.append(f"frames {root['frame_changes']}")
+        parts.append(f"py-peak {root['py_peak'] / 1e6:.1f}MB")
+        return " | ".join(parts)
+
+    def write_trace(self, path):
+        """Write a Chrome trace (.json) and collapsed stacks (.folded) for flame graphs"""
+        if bpy is not None:
+            path = bpy.path.abspath(path)
+        base = os.path.splitext(path)[0]
+        directory = os.path.dirname(base)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        # Chrome trace event format (chrome://tracing, Perfetto, speedscope)
+        events = []
+        for span in self.spans:
+            events.append({
+                "name": span["name"],
+                "cat": "phase",
+                "ph": "X",
+                "pid": 1,
+                "tid": 1,
+                "ts": round((span["start"] - self.origin) * 1e6),
+                "dur": round(span["wall"] * 1e6),
+                "args": {
+                    "cpu_s": round(span["cpu"], 6),
+                    "py_peak_bytes": span["py_peak"],
+                    "bpy_ops": span["ops"],
+                    "depsgraph_updates": span["depsgraph_updates"],
+                    "frame_changes": span["frame_changes"],
+                },
+            })
+        with open(base + ".json", "w") as f:
+            json.dump({"traceEvents": events, "displayTimeUnit": "ms"}, f)
+
+        # Collapsed stacks with self time in microseconds (flamegraph.pl, speedscope)
+        folded = {}
+        for span in self.spans:
+            stack = ";".join(span["path"])
+            self_time = max(span["wall"] - span["child_wall"], 0.0)
+            folded[stack] = folded.get(stack, 0) + round(self_time * 1e6)
+        with open(base + ".folded", "w") as f:
+            for stack, micros in folded.items():
+                f.write(f"{stack} {micros}\n")
+
+        return base + ".json", base + ".folded"
+
+@contextmanager
+def profile_phase(name):
+    """Record a pipeline phase; does nothing unless a profiler or listener is active"""
+    profiler = _active_profiler
+    listeners = list(phase_listeners)
+    if profiler is None and not listeners:
+        yield None
+        return
+    for listener in listeners:
+        listener(name, True)
+    span = profiler.open_span(name) if profiler is not None else None
+    try:
+        yield span
+    finally:
+        if profiler is not None:
+            profiler.close_span()
+        for listener in listeners:
+            listener(name, False)
+
+def _count_depsgraph_update(scene, depsgraph=None):
+    """Handler: count depsgraph updates for the active phase"""
+    if _active_profiler is not None:
+        _active_profiler.count("depsgraph_updates")
+
+def _count_frame_change(scene, depsgraph=None):
+    """Handler: count frame changes (each one re-evaluates the depsgraph)"""
+    if _active_profiler is not None:
+        _active_profiler.count("frame_changes")
+
+def _install_hooks():
+    """Count bpy.ops calls and depsgraph evaluations while profiling"""
+    import bpy.ops as ops_module
+
+    restore = []
+    op_class = getattr(ops_module, "_BPyOpsSubModOp", None)
+    if op_class is not None:
+        original_call = op_class.__call__
+
+        def counting_call(self, *args, **kwargs):
+            if _active_profiler is not None:
+                _active_profiler.count("ops")
+            return original_call(self, *args, **kwargs)
+
+        op_class.__call__ = counting_call
+        restore.append(lambda: setattr(op_class, "__call__", original_call))
+    else:
+        print("Profiler: bpy.ops call counting is not supported in this Blender version")
+
+    bpy.app.handlers.depsgraph_update_post.append(_count_depsgraph_update)
+    bpy.app.handlers.frame_change_post.append(_count_frame_change)
+    restore.append(lambda: bpy.app.handlers.depsgraph_update_post.remove(_count_depsgraph_update))
+    restore.append(lambda: bpy.app.handlers.frame_change_post.remove(_count_frame_change))
+    return restore
+
+def profile_pipeline(func, *args, trace_path=None, **kwargs):
+    """Run an animate_* pipeline under the profiler and report where time went"""
+    global _active_profiler
+    if _active_profiler is not None:
+        raise RuntimeError("A pipeline is already being profiled")
+
+    profiler = PipelineProfiler(func.__name__)
+    started_tracing = not tracemalloc.is_tracing()
+    if started_tracing:
+        tracemalloc.start()
+    restore = _install_hooks() if bpy is not None else []
+    _active_profiler = profiler
+    try:
+        with profile_phase(func.__name__):
+            profiler.result = func(*args, **kwargs)
+    finally:
+        _active_profiler = None
+        for undo in reversed(restore):
+            undo()
+        if started_tracing:
+            tracemalloc.stop()
+
+    print(profiler.summary())
+    if trace_path:
+        json_path, folded_path = profiler.write_trace(trace_path)
+        print(f"Profile trace written to: {json_path} and {folded_path}")
+    return profiler
+
+def main(argv=None):
+    """Command line entry: profile one scenario by name"""
+    import argparse
+    import scenarios
+
+    parser = argparse.ArgumentParser(description="Profile an animation pipeline")
+    parser.add_argument("scenario", choices=sorted(scenarios.SCENARIOS))
+    parser.add_argument("--trace", default=None, help="Trace output path (without extension)")
+    args = parser.parse_args(scenarios.script_args() if argv is None else argv)
+
+    animate = scenarios.load_scenario(args.scenario)
+    trace_path = args.trace or f"profile_{args.scenario}"
+    profile_pipeline(animate, trace_path=trace_path)
+
+if __name__ == "__main__":
+    import sys
+    sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+    # Re-import so the animation scripts share this module's profiler state
+    import pipeline_profiler
+    pipeline_profiler.main()
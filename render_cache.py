@@ -0,0 +1,330 @@
+"""
+Blender Python Animation: Frame Render Cache
+Renders an animation as a PNG sequence and skips frames whose visible state was already rendered
+
+Every frame gets a key: a hash of the camera, the transforms and render visibility of all
+objects, the particle state, all animated values and the scene-wide render settings
+(materials, world, lights and mesh data included). Finished frames are stored in the cache
+directory under their key, so
+    - settled stretches (identical frames) are rendered once and copied,
+    - re-running after a tweak late in the timeline only renders the frames that changed.
+With motion blur on, a frame also depends on its neighbours, so their state is part of its key.
+
+Usage from the command line (on a saved, baked .blend or by building a scenario):
+    blender -b scene.blend --python render_cache.py -- --out frames/ --cache render_cache/
+    blender -b --python render_cache.py -- --scenario dominoes --out frames/
+"""
+
+import hashlib
+import json
+import os
+import shutil
+
+import numpy as np
+
+try:
+    import bpy
+except ImportError:  # Keeps the module importable for tools that only read the cache index
+    bpy = None
+
+try:
+    from pipeline_profiler import profile_phase
+except ImportError:
+    from contextlib import nullcontext as profile_phase
+
+# Written next to the cached images: frame -> key of the last cached render
+INDEX_NAME = "frames.json"
+
+# Render settings that only say where the result goes
+_OUTPUT_ONLY = {"filepath", "use_file_extension", "use_overwrite", "use_placeholder"}
+
+# Node settings that only change how the node editor looks
+_NODE_LAYOUT_ONLY = {"location", "location_absolute", "width", "width_hidden", "height", "select", "hide",
+                     "label", "use_custom_color", "color", "show_options", "show_preview", "show_texture"}
+
+def _rna_values(struct, skip=()):
+    """(name, value) pairs of a struct's plain RNA properties, in a stable order"""
+    values = []
+    for prop in struct.bl_rna.properties:
+        name = prop.identifier
+        if name == "rna_type" or name in skip or prop.is_readonly or prop.type in {'POINTER', 'COLLECTION'}:
+            continue
+        value = getattr(struct, name, None)
+        if isinstance(value, set):
+            value = sorted(value)  # Enum flags: set order is not stable between runs
+        elif hasattr(value, "__len__") and not isinstance(value, str):
+            value = tuple(value)
+        values.append((name, value))
+    return values
+
+def node_tree_values(tree):
+    """Nodes (settings, unlinked input values, image, color ramp) and links of a node tree"""
+    if tree is None:
+        return None
+    nodes = []
+    for node in sorted(tree.nodes, key=lambda node: node.name):
+        inputs = []
+        for socket in node.inputs:
+            value = getattr(socket, "default_value", None)
+            if hasattr(value, "__len__") and not isinstance(value, str):
+                value = tuple(value)
+            inputs.append((socket.identifier, value))
+        image = getattr(node, "image", None)
+        ramp = getattr(node, "color_ramp", None)
+        ramp_values = (ramp.interpolation, [(element.position, tuple(element.color)) for element in ramp.elements]) \
+            if ramp else None
+        nodes.append((node.bl_idname, node.name, _rna_values(node, skip=_NODE_LAYOUT_ONLY), inputs,
+                      image.name if image else None, ramp_values))
+    links = sorted((link.from_node.name, link.from_socket.identifier, link.to_node.name, link.to_socket.identifier)
+                   for link in tree.links)
+    return nodes, links
+
+def settings_digest(scene):
+    """Hash of everything that affects every frame alike: render settings, shading, lights and meshes"""
+    digest = hashlib.blake2b(digest_size=16)
+    parts = [
+        bpy.app.version_string,
+        _rna_values(scene.render, skip=_OUTPUT_ONLY),
+        _rna_values(scene.view_settings),
+        _rna_values(scene.display_settings),
+        [(layer.name, _rna_values(layer)) for layer in scene.view_layers if layer.use],
+    ]
+    for engine_settings in ("cycles", "eevee"):
+        if hasattr(scene, engine_settings):
+            parts.append(_rna_values(getattr(scene, engine_settings)))
+    if scene.world:
+        parts.append(node_tree_values(scene.world.node_tree))
+    for material in sorted(bpy.data.materials, key=lambda mat: mat.name):
+        if material.users:
+            parts.append((material.name, _rna_values(material), node_tree_values(material.node_tree)))
+    for light in sorted(bpy.data.lights, key=lambda light: light.name):
+        parts.append((light.name, _rna_values(light)))
+    for image in sorted(bpy.data.images, key=lambda image: image.name):
+        parts.append((image.name, image.filepath, tuple(image.size)))
+    digest.update(repr(parts).encode())
+
+    # Mesh data: the per-frame keys only cover object transforms
+    for mesh in sorted(bpy.data.meshes, key=lambda mesh: mesh.name):
+        if not mesh.users:
+            continue
+        coords = np.empty(len(mesh.vertices) * 3, dtype=np.float32)
+        mesh.vertices.foreach_get("co", coords)
+        digest.update(mesh.name.encode())
+        digest.update(coords.tobytes())
+        digest.update(repr([slot.name if slot else None for slot in mesh.materials]).encode())
+    return digest.hexdigest()
+
+def _used_actions():
+    """Actions whose values can change a frame (object, data, material, world and shape key animation)"""
+    actions = set()
+    for collection in (bpy.data.objects, bpy.data.materials, bpy.data.lights, bpy.data.cameras,
+                       bpy.data.worlds, bpy.data.shape_keys, bpy.data.node_groups):
+        for datablock in collection:
+            anim = getattr(datablock, "animation_data", None)
+            if anim and anim.action:
+                actions.add(anim.action)
+            tree = getattr(datablock, "node_tree", None)
+            anim = tree.animation_data if tree else None
+            if anim and anim.action:
+                actions.add(anim.action)
+    return sorted(actions, key=lambda action: action.name)
+
+# Particle alive_state values (DNA PARS_*)
+PARS_UNBORN, PARS_ALIVE, PARS_DYING, PARS_DEAD = 0, 1, 2, 3
+
+def particle_state_bytes(locations, sizes, alive_states, show_unborn=False, show_dead=False):
+    """Bytes that identify what one particle system draws
+
+    Particles that are not drawn (unborn or dead, unless the settings show them) count as a
+    zero location and size wherever the simulation put them; which particles are drawn is
+    part of the bytes.
+    """
+    alive_states = np.asarray(alive_states, dtype=np.int32)
+    drawn = (alive_states == PARS_ALIVE) | (alive_states == PARS_DYING)
+    if show_unborn:
+        drawn |= alive_states == PARS_UNBORN
+    if show_dead:
+        drawn |= alive_states == PARS_DEAD
+    locations = np.asarray(locations, dtype=np.float32).reshape(len(alive_states), 3)
+    sizes = np.asarray(sizes, dtype=np.float32)
+    return [np.where(drawn[:, None], locations, 0.0).astype(np.float32).tobytes(),
+            np.where(drawn, sizes, 0.0).astype(np.float32).tobytes(),
+            drawn.tobytes()]
+
+def _particle_bytes(obj, depsgraph):
+    """Particle bytes of an object's evaluated particle systems, drawn particles only"""
+    chunks = []
+    for system in obj.evaluated_get(depsgraph).particle_systems:
+        count = len(system.particles)
+        if count == 0:
+            continue
+        locations = np.empty(count * 3, dtype=np.float32)
+        sizes = np.empty(count, dtype=np.float32)
+        alive = np.empty(count, dtype=np.int32)
+        system.particles.foreach_get("location", locations)
+        system.particles.foreach_get("size", sizes)
+        system.particles.foreach_get("alive_state", alive)
+        settings = system.settings
+        chunks.extend(particle_state_bytes(locations, sizes, alive,
+                                           show_unborn=settings.show_unborn, show_dead=settings.use_dead))
+    return chunks
+
+def state_digest(names, hidden, matrices, camera, values, particle_chunks=(), precision=5):
+    """Hash of one frame's visible state from the values read out of the scene
+
+    names: object names (bytes), hidden: (N,) hide_render, matrices: (N, 4, 4) world matrices,
+    camera: bytes describing the active camera, values: evaluated F-curve values,
+    particle_chunks: particle_state_bytes output of every emitter.
+    """
+    digest = hashlib.blake2b(names, digest_size=16)
+    hidden = np.asarray(hidden, dtype=bool)
+    # Hidden objects do not show up, wherever they are (+ 0.0 folds -0.0 into 0.0)
+    visible = np.where(hidden[:, None, None], 0.0, np.round(matrices, precision) + 0.0)
+    digest.update(hidden.tobytes())
+    digest.update(visible.astype(np.float32).tobytes())
+    digest.update(camera)
+    digest.update(np.round(np.asarray(values, dtype=np.float64), precision).tobytes())
+    for chunk in particle_chunks:
+        digest.update(chunk)
+    return digest.hexdigest()
+
+def frame_state_digests(frame_start, frame_end, scene=None, precision=5):
+    """Hash of the visible state of every frame in a range: {frame: hex digest}
+
+    Values are rounded to `precision` decimals so simulation noise in settled stretches does
+    not make otherwise identical frames look different.
+    """
+    from baked_transforms import iter_frame_matrices
+
+    scene = scene or bpy.context.scene
+    objects = sorted(scene.objects, key=lambda obj: obj.name)
+    emitters = [obj for obj in objects if obj.particle_systems]
+    actions = _used_actions()
+    names = repr([obj.name for obj in objects]).encode()
+
+    digests = {}
+    for frame, matrices in iter_frame_matrices(objects, frame_start, frame_end, scene):
+        hidden = np.fromiter((obj.hide_render for obj in objects), dtype=bool, count=len(objects))
+        camera = scene.camera
+        camera_bytes = repr(camera.name if camera else None).encode()
+        if camera is not None:
+            camera_bytes += repr(_rna_values(camera.data)).encode()
+        values = np.array([fcurve.evaluate(frame) for action in actions for fcurve in action.fcurves])
+
+        particle_chunks = []
+        if emitters:
+            depsgraph = bpy.context.evaluated_depsgraph_get()
+            for obj in emitters:
+                particle_chunks.extend(_particle_bytes(obj, depsgraph))
+        digests[frame] = state_digest(names, hidden, matrices, camera_bytes, values, particle_chunks, precision)
+    return digests
+
+def frame_keys(scene=None, frame_start=None, frame_end=None, precision=5):
+    """Cache key of every frame to render: {frame: key}"""
+    scene = scene or bpy.context.scene
+    frame_start = scene.frame_start if frame_start is None else frame_start
+    frame_end = scene.frame_end if frame_end is None else frame_end
+
+    blur = scene.render.use_motion_blur
+    # The shutter of a blurred frame reaches into its neighbours
+    margin = 1 if blur else 0
+    states = frame_state_digests(max(frame_start - margin, 0), frame_end + margin, scene, precision)
+    settings = settings_digest(scene)
+    # A seed that changes every frame makes the noise (and so the image) frame specific
+    animated_seed = hasattr(scene, "cycles") and scene.render.engine == 'CYCLES' and scene.cycles.use_animated_seed
+
+    keys = {}
+    for frame in range(frame_start, frame_end + 1):
+        digest = hashlib.blake2b(settings.encode(), digest_size=16)
+        for neighbour in range(frame - margin, frame + margin + 1):
+            digest.update(states.get(neighbour, "").encode())
+        if animated_seed:
+            digest.update(str(frame).encode())
+        keys[frame] = digest.hexdigest()
+    return keys
+
+def _place(source, target):
+    """Put a cached image at its output path, hard linking when the filesystem allows it"""
+    if os.path.exists(target):
+        os.remove(target)
+    try:
+        os.link(source, target)
+    except OSError:
+        shutil.copyfile(source, target)
+
+def _render_still(scene, frame, path):
+    """Render one frame straight to a PNG file"""
+    partial = path + ".partial.png"
+    scene.frame_set(frame)
+    scene.render.filepath = partial
+    bpy.ops.render.render(write_still=True)
+    os.replace(partial, path)  # Only finished renders ever carry a key
+
+def render_with_cache(output_dir, cache_dir=None, frame_start=None, frame_end=None, scene=None,
+                      prefix="frame_", precision=5):
+    """Render the frame range as a PNG sequence, reusing cached frames; returns a summary dict"""
+    scene = scene or bpy.context.scene
+    output_dir = bpy.path.abspath(output_dir)
+    cache_dir = bpy.path.abspath(cache_dir) if cache_dir else os.path.join(output_dir, "render_cache")
+    os.makedirs(output_dir, exist_ok=True)
+    os.makedirs(cache_dir, exist_ok=True)
+
+    render = scene.render
+    saved = (render.filepath, render.use_file_extension, render.image_settings.file_format)
+    render.image_settings.file_format = 'PNG'  # Settings are hashed as they will render
+    render.use_file_extension = False
+
+    with profile_phase("render"):
+        with profile_phase("render_keys"):
+            keys = frame_keys(scene, frame_start, frame_end, precision)
+
+        index_file = os.path.join(cache_dir, INDEX_NAME)
+        previous = {}
+        if os.path.exists(index_file):
+            with open(index_file) as f:
+                previous = {int(frame): key for frame, key in json.load(f).items()}
+
+        rendered = reused = 0
+        try:
+            for frame, key in keys.items():
+                cached = os.path.join(cache_dir, key + ".png")
+                if os.path.exists(cached):
+                    reused += 1
+                else:
+                    with profile_phase("render_frame"):
+                        _render_still(scene, frame, cached)
+                    rendered += 1
+                    print(f"Rendered frame {frame} ({rendered} new, {reused} reused)")
+                _place(cached, os.path.join(output_dir, f"{prefix}{frame:04d}.png"))
+        finally:
+            render.filepath, render.use_file_extension, render.image_settings.file_format = saved
+            with open(index_file, "w") as f:
+                json.dump({**previous, **keys}, f, indent=1)
+
+    changed = [frame for frame, key in keys.items() if previous.get(frame) != key]
+    print(f"Render cache: {rendered} frames rendered, {reused} reused, "
+          f"{len(changed)} changed since the last run -> {output_dir}")
+    return {"frames": len(keys), "rendered": rendered, "reused": reused, "changed": changed,
+            "output_dir": output_dir, "cache_dir": cache_dir}
+
+def main(argv=None):
+    """Command line entry: cached PNG-sequence render of the open or built scene"""
+    import argparse
+    import scenarios
+
+    parser = argparse.ArgumentParser(description="Render a PNG sequence, skipping frames already rendered")
+    parser.add_argument("--scenario", choices=sorted(scenarios.SCENARIOS), default=None)
+    parser.add_argument("--out", default="frames", help="Output directory for the PNG sequence")
+    parser.add_argument("--cache", default=None, help="Cache directory (default: <out>/render_cache)")
+    parser.add_argument("--start", type=int, default=None)
+    parser.add_argument("--end", type=int, default=None)
+    args = parser.parse_args(scenarios.script_args() if argv is None else argv)
+
+    if args.scenario:
+        scenarios.run_scenario(args.scenario)
+    return render_with_cache(args.out, args.cache, args.start, args.end)
+
+if __name__ == "__main__":
+    import sys
+    sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+    main()
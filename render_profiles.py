@@ -0,0 +1,62 @@
+"""
+Blender Python Animation: Render Profiles
+Named quality levels (draft, preview, final) that tools read to scale their work
+
+A profile sets the render resolution, samples and which texture proxy level image_cache.py
+loads (0 = full size, 1 = half, 2 = quarter, 3 = eighth). The active profile is stored on
+the scene; without one the RENDER_PROFILE environment variable decides, then "final".
+
+Usage:
+    from render_profiles import apply_profile
+    apply_profile("draft")
+"""
+
+import os
+
+try:
+    import bpy
+except ImportError:  # Profiles can be read outside Blender
+    bpy = None
+
+PROFILES = {
+    "draft": {"resolution_percentage": 25, "samples": 16, "texture_level": 3, "use_motion_blur": False},
+    "preview": {"resolution_percentage": 50, "samples": 48, "texture_level": 2, "use_motion_blur": False},
+    "final": {"resolution_percentage": 100, "samples": 128, "texture_level": 0},
+}
+DEFAULT_PROFILE = "final"
+
+def active_profile_name(scene=None):
+    """Name of the profile in effect for a scene"""
+    if scene is None and bpy is not None:
+        scene = bpy.context.scene
+    if scene is not None and "render_profile" in scene:
+        return scene["render_profile"]
+    return os.environ.get("RENDER_PROFILE", DEFAULT_PROFILE)
+
+def active_profile(scene=None):
+    """Settings of the profile in effect for a scene"""
+    name = active_profile_name(scene)
+    if name not in PROFILES:
+        raise KeyError(f"Unknown render profile '{name}', choose from: {', '.join(PROFILES)}")
+    return PROFILES[name]
+
+def apply_profile(name, scene=None):
+    """Switch a scene to a profile: render settings now, textures at the profile's proxy level"""
+    if name not in PROFILES:
+        raise KeyError(f"Unknown render profile '{name}', choose from: {', '.join(PROFILES)}")
+    scene = scene or bpy.context.scene
+    profile = PROFILES[name]
+    scene["render_profile"] = name
+    scene.render.resolution_percentage = profile["resolution_percentage"]
+    if "use_motion_blur" in profile:
+        scene.render.use_motion_blur = profile["use_motion_blur"]
+    if hasattr(scene, "cycles"):
+        scene.cycles.samples = profile["samples"]
+    if hasattr(scene.eevee, "taa_render_samples"):
+        scene.eevee.taa_render_samples = profile["samples"]
+
+    from image_cache import refresh_images
+    refresh_images(scene)
+    print(f"Render profile: {name} ({profile['resolution_percentage']}%, {profile['samples']} samples, "
+          f"textures at 1/{2 ** profile['texture_level']})")
+    return profile
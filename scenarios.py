@@ -0,0 +1,52 @@
+"""
+Blender Python Animation: Scenario Registry
+Maps short scenario names to the animation scripts so tools can build any scene by name
+"""
+
+import importlib
+import os
+import sys
+
+# Scenario name -> (module, main animation function)
+SCENARIOS = {
+    "dominoes": ("falling_dominoes_animation", "animate_falling_dominoes"),
+    "ball": ("ball_obstacle_animation", "animate_ball_collision"),
+    "many_balls": ("ball_obstacle_animation", "animate_many_balls"),
+    "tank": ("tank_missile_animation", "animate_tank_missile_destruction"),
+}
+
+def ensure_script_path():
+    """Make the animation scripts importable when running inside Blender"""
+    script_dir = os.path.dirname(os.path.abspath(__file__))
+    if script_dir not in sys.path:
+        sys.path.insert(0, script_dir)
+
+def load_scenario(name):
+    """Return the main animation function for a scenario name"""
+    if name not in SCENARIOS:
+        raise KeyError(f"Unknown scenario '{name}', choose from: {', '.join(sorted(SCENARIOS))}")
+    ensure_script_path()
+    module_name, function_name = SCENARIOS[name]
+    module = importlib.import_module(module_name)
+    return getattr(module, function_name)
+
+def run_scenario(name, params=None):
+    """Build (and bake) a scenario with optional keyword parameters"""
+    animate = load_scenario(name)
+    return animate(**(params or {}))
+
+def apply_render_settings(name):
+    """Run the scenario script's own setup_render_settings, if it has one; returns whether it did"""
+    load_scenario(name)
+    module = sys.modules[SCENARIOS[name][0]]
+    setup = getattr(module, "setup_render_settings", None)
+    if setup is None:
+        return False
+    setup()
+    return True
+
+def script_args():
+    """Arguments passed to a script after Blender's '--' separator"""
+    if "--" in sys.argv:
+        return sys.argv[sys.argv.index("--") + 1:]
+    return []
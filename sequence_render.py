@@ -0,0 +1,240 @@
+"""
+Blender Python Animation: Resumable Sequence Render
+Renders one image file per frame and streams finished frames into an H.264 video while rendering continues
+
+Every frame is written to a temporary file and moved into place only when complete, and a
+manifest.json records the finished frames. After a crash or restart the render resumes at
+the first missing frame instead of starting over. A separate ffmpeg process encodes the
+video from the finished PNG frames (fed by a background thread, in frame order), so the
+video is ready moments after the last frame renders.
+
+With --format EXR each frame is also saved as a display-referred PNG for the encoder.
+
+Usage from the command line (on a saved, baked .blend or by building a scenario):
+    blender -b scene.blend --python sequence_render.py -- --out frames/ --video dominoes.mp4
+    blender -b --python sequence_render.py -- --scenario dominoes --out frames/ --format EXR
+"""
+
+import json
+import os
+import queue
+import shutil
+import subprocess
+import threading
+import time
+
+try:
+    import bpy
+except ImportError:  # The encoder and manifest helpers work without Blender
+    bpy = None
+
+try:
+    from pipeline_profiler import profile_phase
+except ImportError:
+    from contextlib import nullcontext as profile_phase
+
+MANIFEST_NAME = "manifest.json"
+
+# Blender file format -> file extension
+EXTENSIONS = {"PNG": ".png", "OPEN_EXR": ".exr"}
+
+def write_atomic(path, data):
+    """Write text to a file so readers only ever see the old or the complete new version"""
+    partial = path + ".partial"
+    with open(partial, "w") as f:
+        f.write(data)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(partial, path)
+
+def load_manifest(output_dir):
+    """Manifest of a (possibly interrupted) sequence, or None"""
+    path = os.path.join(output_dir, MANIFEST_NAME)
+    if not os.path.exists(path):
+        return None
+    with open(path) as f:
+        manifest = json.load(f)
+    manifest["frames"] = {int(frame): entry for frame, entry in manifest["frames"].items()}
+    return manifest
+
+def finished_frames(manifest, output_dir):
+    """Frames whose files are all present with the recorded size"""
+    done = set()
+    for frame, entry in (manifest or {}).get("frames", {}).items():
+        files = entry["files"]
+        if all(os.path.exists(os.path.join(output_dir, name)) and
+               os.path.getsize(os.path.join(output_dir, name)) == size for name, size in files.items()):
+            done.add(frame)
+    return done
+
+class VideoEncoder:
+    """ffmpeg process fed with PNG frames by a background thread"""
+
+    def __init__(self, video_path, fps, crf=20):
+        self.video_path = video_path
+        self.partial = video_path + ".partial"
+        self.frames = queue.Queue()
+        self.error = None
+        self.encoded = 0
+        command = ["ffmpeg", "-y", "-loglevel", "error",
+                   "-f", "image2pipe", "-framerate", str(fps), "-c:v", "png", "-i", "-",
+                   "-c:v", "libx264", "-pix_fmt", "yuv420p", "-crf", str(crf),
+                   "-movflags", "+faststart", "-f", "mp4", self.partial]
+        self.process = subprocess.Popen(command, stdin=subprocess.PIPE)
+        self.thread = threading.Thread(target=self._feed, name="VideoEncoder", daemon=True)
+        self.thread.start()
+
+    def _feed(self):
+        """Pipe queued frame files into ffmpeg until the end marker (None) arrives"""
+        try:
+            while True:
+                path = self.frames.get()
+                if path is None:
+                    break
+                with open(path, "rb") as f:
+                    self.process.stdin.write(f.read())
+                self.encoded += 1
+        except (OSError, ValueError) as error:  # ffmpeg exited early
+            self.error = error
+        finally:
+            try:
+                self.process.stdin.close()
+            except OSError:
+                pass
+
+    def add(self, path):
+        """Queue a finished frame (frames must be added in order)"""
+        self.frames.put(path)
+
+    def finish(self):
+        """Wait for the encoder and move the video into place; returns True on success"""
+        self.frames.put(None)
+        self.thread.join()
+        code = self.process.wait()
+        if code != 0 or self.error:
+            print(f"Video encoding failed (ffmpeg exit code {code}): {self.error or ''}")
+            return False
+        os.replace(self.partial, self.video_path)
+        return True
+
+    def abort(self):
+        """Stop encoding and drop the unfinished video"""
+        self.process.kill()
+        self.frames.put(None)
+        self.thread.join()
+        self.process.wait()
+        if os.path.exists(self.partial):
+            os.remove(self.partial)
+
+def save_result(scene, path, file_format):
+    """Save the current render result in a format, atomically"""
+    settings = scene.render.image_settings
+    saved_format = settings.file_format
+    settings.file_format = file_format
+    partial = path + ".partial" + EXTENSIONS[file_format]
+    try:
+        bpy.data.images["Render Result"].save_render(filepath=partial, scene=scene)
+    finally:
+        settings.file_format = saved_format
+    os.replace(partial, path)
+
+def render_sequence(output_dir, video_path=None, frame_start=None, frame_end=None, scene=None,
+                    file_format="PNG", prefix="frame_", encode=True, restart=False):
+    """Render missing frames of a range into files, optionally encoding a video as they finish"""
+    from render_cache import settings_digest
+
+    scene = scene or bpy.context.scene
+    output_dir = bpy.path.abspath(output_dir)
+    os.makedirs(output_dir, exist_ok=True)
+    frame_start = scene.frame_start if frame_start is None else frame_start
+    frame_end = scene.frame_end if frame_end is None else frame_end
+    fps = scene.render.fps / scene.render.fps_base
+
+    # Resume only if the frames on disk were rendered with the same settings
+    settings = settings_digest(scene)
+    manifest = None if restart else load_manifest(output_dir)
+    if manifest and manifest.get("settings") != settings:
+        print("Render settings changed since the last run, starting the sequence over")
+        manifest = None
+    manifest = manifest or {"frames": {}}
+    manifest.update({"settings": settings, "frame_start": frame_start, "frame_end": frame_end,
+                     "fps": fps, "format": file_format})
+
+    encoder = None
+    if encode and video_path:
+        if shutil.which("ffmpeg"):
+            encoder = VideoEncoder(bpy.path.abspath(video_path), fps)
+        else:
+            print("ffmpeg not found, writing the image sequence only")
+
+    def frame_path(frame, extension):
+        return os.path.join(output_dir, f"{prefix}{frame:04d}{extension}")
+
+    done = finished_frames(manifest, output_dir)
+    if encoder and file_format != "PNG":
+        # EXR frames from a run without encoding have no PNG for the video yet
+        done = {frame for frame in done if os.path.exists(frame_path(frame, ".png"))}
+    missing = [frame for frame in range(frame_start, frame_end + 1) if frame not in done]
+    if missing and done:
+        print(f"Resuming at frame {missing[0]}: {len(done)} frames already rendered")
+
+    started = time.perf_counter()
+    try:
+        for frame in range(frame_start, frame_end + 1):
+            image = frame_path(frame, EXTENSIONS[file_format])
+            preview = frame_path(frame, ".png")
+            if frame not in done:
+                frame_started = time.perf_counter()
+                with profile_phase("render_frame"):
+                    scene.frame_set(frame)
+                    bpy.ops.render.render()
+                    save_result(scene, image, file_format)
+                    if file_format != "PNG" and encoder:
+                        save_result(scene, preview, "PNG")
+                files = [path for path in (image, preview) if os.path.exists(path)]
+                manifest["frames"][frame] = {
+                    "files": {os.path.basename(path): os.path.getsize(path) for path in files},
+                    "seconds": round(time.perf_counter() - frame_started, 3),
+                }
+                write_atomic(os.path.join(output_dir, MANIFEST_NAME), json.dumps(manifest, indent=1))
+                print(f"Frame {frame}/{frame_end} done ({manifest['frames'][frame]['seconds']:.1f}s)")
+            if encoder:
+                encoder.add(preview if file_format != "PNG" else image)
+    except BaseException:
+        if encoder:
+            encoder.abort()  # The next run re-encodes from the frames on disk
+        raise
+    video_ready = encoder.finish() if encoder else False
+
+    elapsed = time.perf_counter() - started
+    print(f"Sequence complete: {len(missing)} frames rendered in {elapsed:.1f}s -> {output_dir}")
+    if video_ready:
+        print(f"Video written to: {encoder.video_path}")
+    return {"rendered": missing, "reused": sorted(done), "seconds": elapsed,
+            "video": encoder.video_path if video_ready else None, "output_dir": output_dir}
+
+def main(argv=None):
+    """Command line entry: resumable sequence render of the open or built scene"""
+    import argparse
+    import scenarios
+
+    parser = argparse.ArgumentParser(description="Resumable image-sequence render with background video encoding")
+    parser.add_argument("--scenario", choices=sorted(scenarios.SCENARIOS), default=None)
+    parser.add_argument("--out", default="frames", help="Directory for the frames and manifest")
+    parser.add_argument("--video", default=None, help="H.264 .mp4 to encode while rendering")
+    parser.add_argument("--format", choices=["PNG", "EXR"], default="PNG")
+    parser.add_argument("--start", type=int, default=None)
+    parser.add_argument("--end", type=int, default=None)
+    parser.add_argument("--restart", action="store_true", help="Ignore frames from an earlier run")
+    args = parser.parse_args(scenarios.script_args() if argv is None else argv)
+
+    if args.scenario:
+        scenarios.run_scenario(args.scenario)
+    file_format = "OPEN_EXR" if args.format == "EXR" else "PNG"
+    return render_sequence(args.out, args.video, args.start, args.end, file_format=file_format,
+                           restart=args.restart)
+
+if __name__ == "__main__":
+    import sys
+    sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+    main()
@@ -0,0 +1,222 @@
+"""
+Blender Python Animation: Simulation Cache Export
+Writes a baked scene's motion to Alembic once, and rebuilds a render-only scene from it without physics
+
+Export (on the machine that baked):
+    - <name>.abc   every mesh and camera with its evaluated, per-frame transforms
+                   (rigid bodies, the follow camera, missiles, turret)
+    - <name>.blend library with the materials, lights, world and particle emitters
+    - <name>.json  sidecar: frame range, fps, render size, material slots and which objects came from where
+
+Load (on a render worker): an empty scene gets the library data, the Alembic objects and the
+render settings (resolution, engine, samples, denoising, bounces, colour management) back. There is no rigid body world, so nothing is simulated; the transforms
+are read from the cache. Visibility keys (frustum culling, LOD) are not part of the cache;
+run those passes again after loading, they only need the camera and the transforms.
+
+Usage from the command line:
+    blender -b --python sim_cache_export.py -- --scenario dominoes --export cache/dominoes
+    blender -b --python sim_cache_export.py -- --load cache/dominoes.json --save render_only.blend
+"""
+
+import json
+import os
+
+try:
+    import bpy
+except ImportError:  # The sidecar can be read outside Blender
+    bpy = None
+
+# Object types Alembic carries; everything else goes into the library file
+ALEMBIC_TYPES = {'MESH', 'CAMERA', 'EMPTY', 'CURVE'}
+# Scene settings (paths from the scene) that make the cached scene render like the source
+RENDER_SETTINGS = [
+    "render.film_transparent", "render.use_motion_blur", "render.motion_blur_shutter",
+    "render.use_simplify", "render.simplify_subdivision_render",
+    "cycles.device", "cycles.samples", "cycles.use_adaptive_sampling", "cycles.adaptive_threshold",
+    "cycles.use_denoising", "cycles.denoiser", "cycles.max_bounces", "cycles.diffuse_bounces",
+    "cycles.glossy_bounces", "cycles.transmission_bounces", "cycles.volume_bounces",
+    "cycles.transparent_max_bounces", "cycles.sample_clamp_direct", "cycles.sample_clamp_indirect",
+    "cycles.use_persistent_data", "eevee.taa_render_samples",
+    "view_settings.view_transform", "view_settings.look", "view_settings.exposure", "view_settings.gamma",
+]
+
+def read_render_settings(scene):
+    """Values of RENDER_SETTINGS the scene has (engines that are not loaded are skipped)"""
+    settings = {}
+    for path in RENDER_SETTINGS:
+        owner_name, attribute = path.split(".")
+        owner = getattr(scene, owner_name, None)
+        if owner is not None and hasattr(owner, attribute):
+            settings[path] = getattr(owner, attribute)
+    if "render_profile" in scene:
+        settings["render_profile"] = scene["render_profile"]
+    return settings
+
+def write_render_settings(scene, settings):
+    """Set stored render settings back on a scene, skipping those this Blender does not have"""
+    for path, value in settings.items():
+        if path == "render_profile":
+            scene["render_profile"] = value
+            continue
+        owner_name, attribute = path.split(".")
+        owner = getattr(scene, owner_name, None)
+        if owner is None or not hasattr(owner, attribute):
+            print(f"Simulation cache: {path} is not available here, not restored")
+            continue
+        setattr(owner, attribute, value)
+
+def _particle_objects(scene):
+    """Emitters and particle instance objects (particles are simulated from the library copies)"""
+    names = set()
+    for obj in scene.objects:
+        for system in obj.particle_systems:
+            names.add(obj.name)
+            if system.settings.instance_object is not None:
+                names.add(system.settings.instance_object.name)
+    return names
+
+def export_sim_cache(base_path, frame_start=None, frame_end=None, scene=None):
+    """Write <base>.abc, <base>.blend and <base>.json for the baked scene; returns the sidecar path"""
+    scene = scene or bpy.context.scene
+    base_path = os.path.splitext(bpy.path.abspath(base_path))[0]
+    directory = os.path.dirname(base_path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    frame_start = scene.frame_start if frame_start is None else frame_start
+    frame_end = scene.frame_end if frame_end is None else frame_end
+
+    particle_names = _particle_objects(scene)
+    cached = [obj for obj in scene.objects if obj.type in ALEMBIC_TYPES and obj.name not in particle_names]
+    library_objects = [obj for obj in scene.objects if obj not in cached]
+
+    # Alembic: the evaluated transforms of every frame, which is exactly what the bake produced
+    for obj in bpy.context.view_layer.objects:
+        obj.select_set(obj in cached)
+    bpy.ops.wm.alembic_export(filepath=base_path + ".abc", start=frame_start, end=frame_end,
+                              selected=True, visible_objects_only=False, flatten=False,
+                              uvs=True, normals=True, face_sets=True, export_hair=False,
+                              export_particles=False, evaluation_mode='RENDER')
+
+    # Library: shading and the pieces Alembic cannot carry
+    materials = {slot.material for obj in scene.objects for slot in obj.material_slots if slot.material}
+    datablocks = set(materials) | set(library_objects)
+    if scene.world:
+        datablocks.add(scene.world)
+    bpy.data.libraries.write(base_path + ".blend", datablocks, fake_user=True)
+
+    render = scene.render
+    sidecar = {
+        "alembic": os.path.basename(base_path) + ".abc",
+        "library": os.path.basename(base_path) + ".blend",
+        "frame_start": frame_start,
+        "frame_end": frame_end,
+        "fps": render.fps,
+        "fps_base": render.fps_base,
+        "resolution": [render.resolution_x, render.resolution_y, render.resolution_percentage],
+        "engine": render.engine,
+        "render_settings": read_render_settings(scene),
+        "camera": scene.camera.name if scene.camera else None,
+        "world": scene.world.name if scene.world else None,
+        "cached_objects": sorted(obj.name for obj in cached),
+        "library_objects": sorted(obj.name for obj in library_objects),
+        "materials": {obj.name: [slot.material.name if slot.material else None for slot in obj.material_slots]
+                      for obj in cached if obj.material_slots},
+        "hide_render": sorted(obj.name for obj in cached if obj.hide_render),
+    }
+    with open(base_path + ".json", "w") as f:
+        json.dump(sidecar, f, indent=2)
+    print(f"Simulation cache: {len(cached)} objects x {frame_end - frame_start + 1} frames -> {base_path}.abc "
+          f"(+ {len(library_objects)} library objects, {len(materials)} materials)")
+    return base_path + ".json"
+
+def load_sim_cache(sidecar_path, reset=True):
+    """Rebuild a render-only scene from an exported cache; returns the scene"""
+    sidecar_path = bpy.path.abspath(sidecar_path)
+    directory = os.path.dirname(sidecar_path)
+    with open(sidecar_path) as f:
+        sidecar = json.load(f)
+    if reset:
+        bpy.ops.wm.read_homefile(use_empty=True)
+    scene = bpy.context.scene
+
+    render = scene.render
+    scene.frame_start = sidecar["frame_start"]
+    scene.frame_end = sidecar["frame_end"]
+    render.fps = sidecar["fps"]
+    render.fps_base = sidecar["fps_base"]
+    render.resolution_x, render.resolution_y, render.resolution_percentage = sidecar["resolution"]
+    render.engine = sidecar["engine"]
+
+    write_render_settings(scene, sidecar.get("render_settings", {}))
+
+    # Library first: materials, world, lights and particle emitters, mapped by their names in the library
+    library = os.path.join(directory, sidecar["library"])
+    with bpy.data.libraries.load(library, link=False) as (source, target):
+        material_names = list(source.materials)
+        target.materials = material_names
+        world_names = list(source.worlds)
+        target.worlds = world_names
+        target.objects = [name for name in source.objects if name in sidecar["library_objects"]]
+    materials = {name: material for name, material in zip(material_names, target.materials) if material}
+    for obj in target.objects:
+        if obj is not None:
+            scene.collection.objects.link(obj)
+    worlds = dict(zip(world_names, target.worlds))
+    if sidecar["world"]:
+        scene.world = worlds.get(sidecar["world"])
+
+    # Transforms come straight from the Alembic archive (Mesh Sequence Cache / Transform Cache)
+    existing = set(bpy.data.materials)
+    bpy.ops.wm.alembic_import(filepath=os.path.join(directory, sidecar["alembic"]),
+                              set_frame_range=False, as_background_job=False)
+    # The importer adds empty materials named after the face sets; the library ones replace them
+    placeholders = [material for material in bpy.data.materials if material not in existing]
+
+    for name, slot_materials in sidecar["materials"].items():
+        obj = bpy.data.objects.get(name)
+        if obj is None or obj.type != 'MESH':
+            continue
+        obj.data.materials.clear()
+        for material_name in slot_materials:
+            obj.data.materials.append(materials.get(material_name) if material_name else None)
+    for material in placeholders:
+        if material.users == 0:
+            bpy.data.materials.remove(material)
+    for name in sidecar["hide_render"]:
+        if name in bpy.data.objects:
+            bpy.data.objects[name].hide_render = True
+
+    if sidecar["camera"] in bpy.data.objects:
+        scene.camera = bpy.data.objects[sidecar["camera"]]
+    if scene.rigidbody_world:
+        bpy.ops.rigidbody.world_remove()  # Render-only: nothing may simulate
+    scene.frame_set(scene.frame_start)
+    print(f"Simulation cache loaded: {len(sidecar['cached_objects'])} cached objects, "
+          f"frames {scene.frame_start}-{scene.frame_end}, no rigid body world")
+    return scene
+
+def main(argv=None):
+    """Command line entry: export a baked scene or load a cache"""
+    import argparse
+    import scenarios
+
+    parser = argparse.ArgumentParser(description="Export baked motion to Alembic or load it for rendering")
+    parser.add_argument("--scenario", choices=sorted(scenarios.SCENARIOS), default=None)
+    parser.add_argument("--export", default=None, help="Cache base path (writes .abc, .blend and .json)")
+    parser.add_argument("--load", default=None, help="Sidecar .json of a cache to rebuild")
+    parser.add_argument("--save", default=None, help="Save the .blend afterwards")
+    args = parser.parse_args(scenarios.script_args() if argv is None else argv)
+
+    if args.load:
+        load_sim_cache(args.load)
+    else:
+        if args.scenario:
+            scenarios.run_scenario(args.scenario)
+        export_sim_cache(args.export or "sim_cache/scene")
+    if args.save:
+        bpy.ops.wm.save_as_mainfile(filepath=bpy.path.abspath(args.save))
+
+if __name__ == "__main__":
+    import sys
+    sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+    main()
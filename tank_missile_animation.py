@@ -2,6 +2,12 @@ import bpy
 import math
 import random
 
+try:
+    from pipeline_profiler import profile_phase
+except ImportError:
+    # Profiling is optional; without the helper module phases are no-ops
+    from contextlib import nullcontext as profile_phase
+
 def clear_scene():
     """Remove all objects from the scene"""
     bpy.ops.object.select_all(action='SELECT')
@@ -53,8 +59,9 @@ def create_tank(location=(0, -10, 0)):
     body.name = "TankBody"
     body.scale = (3, 4, 1.5)  # Wide and long body
     body.location.z = 0.75  # Half of scaled height (1.5/2), so bottom at Z=0
-    body_mat = create_material("TankBodyMat", (0.2, 0.3, 0.2, 1.0), roughness=0.7, metallic=0.3)
-    apply_material(body, body_mat)
+    with profile_phase("materials"):
+        body_mat = create_material("TankBodyMat", (0.2, 0.3, 0.2, 1.0), roughness=0.7, metallic=0.3)
+        apply_material(body, body_mat)
     tank_parts.append(body)
     
     # Tank turret (rotating part) - centered on body top
@@ -63,8 +70,9 @@ def create_tank(location=(0, -10, 0)):
     turret = bpy.context.active_object
     turret.name = "TankTurret"
     turret.rotation_euler = (0, 0, 0)
-    turret_mat = create_material("TankTurretMat", (0.3, 0.4, 0.3, 1.0), roughness=0.6, metallic=0.4)
-    apply_material(turret, turret_mat)
+    with profile_phase("materials"):
+        turret_mat = create_material("TankTurretMat", (0.3, 0.4, 0.3, 1.0), roughness=0.6, metallic=0.4)
+        apply_material(turret, turret_mat)
     tank_parts.append(turret)
     
     # Tank barrel (gun) - attached to turret front
@@ -74,8 +82,9 @@ def create_tank(location=(0, -10, 0)):
     barrel = bpy.context.active_object
     barrel.name = "TankBarrel"
     barrel.rotation_euler = (math.radians(90), 0, 0)  # Point forward
-    barrel_mat = create_material("TankBarrelMat", (0.1, 0.1, 0.1, 1.0), roughness=0.3, metallic=0.8)
-    apply_material(barrel, barrel_mat)
+    with profile_phase("materials"):
+        barrel_mat = create_material("TankBarrelMat", (0.1, 0.1, 0.1, 1.0), roughness=0.3, metallic=0.8)
+        apply_material(barrel, barrel_mat)
     tank_parts.append(barrel)
     
     # Parent turret and barrel to body properly with keep transform
@@ -96,8 +105,9 @@ def create_tank(location=(0, -10, 0)):
     left_track.name = "LeftTrack"
     left_track.scale = (0.5, 4.5, 0.8)
     left_track.location.z = 0.4
-    left_track_mat = create_material("TrackMat", (0.15, 0.15, 0.15, 1.0), roughness=0.8, metallic=0.2)
-    apply_material(left_track, left_track_mat)
+    with profile_phase("materials"):
+        left_track_mat = create_material("TrackMat", (0.15, 0.15, 0.15, 1.0), roughness=0.8, metallic=0.2)
+        apply_material(left_track, left_track_mat)
     # Parent left track to body
     bpy.context.view_layer.objects.active = body
     left_track.select_set(True)
@@ -148,8 +158,9 @@ def create_target_objects():
         target.location.z = 1.5  # Bottom sits on ground
         
         # Apply colored material
-        target_mat = create_material(f"TargetMat_{i+1}", colors[i], roughness=0.4, metallic=0.1)
-        apply_material(target, target_mat)
+        with profile_phase("materials"):
+            target_mat = create_material(f"TargetMat_{i+1}", colors[i], roughness=0.4, metallic=0.1)
+            apply_material(target, target_mat)
         
         targets.append(target)
     
@@ -163,8 +174,9 @@ def create_missile(start_location):
     missile.rotation_euler = (math.radians(90), 0, 0)  # Point forward
     
     # Missile material (dark gray/black)
-    missile_mat = create_material("MissileMat", (0.15, 0.15, 0.15, 1.0), roughness=0.3, metallic=0.7)
-    apply_material(missile, missile_mat)
+    with profile_phase("materials"):
+        missile_mat = create_material("MissileMat", (0.15, 0.15, 0.15, 1.0), roughness=0.3, metallic=0.7)
+        apply_material(missile, missile_mat)
     
     return missile
 
@@ -223,8 +235,9 @@ def setup_ground():
     ground = bpy.context.active_object
     ground.name = "Ground"
     
-    ground_mat = create_material("GroundMat", (0.4, 0.35, 0.3, 1.0), roughness=0.9, metallic=0.0)
-    apply_material(ground, ground_mat)
+    with profile_phase("materials"):
+        ground_mat = create_material("GroundMat", (0.4, 0.35, 0.3, 1.0), roughness=0.9, metallic=0.0)
+        apply_material(ground, ground_mat)
     
     return ground
 
@@ -252,7 +265,8 @@ def setup_camera(tank_body):
 def animate_tank_missile_destruction():
     """Main animation function"""
     # Clear scene
-    clear_scene()
+    with profile_phase("clear"):
+        clear_scene()
     
     # Setup scene parameters
     bpy.context.scene.render.fps = 24
@@ -264,17 +278,19 @@ def animate_tank_missile_destruction():
     bpy.context.scene.gravity = (0, 0, -9.81)
     
     # Create scene elements
-    ground = setup_ground()
-    sun = setup_lighting()
-    
-    # Create tank
-    tank_body, tank_turret, tank_barrel, tank_parts = create_tank(location=(0, -10, 0))
-    
-    # Create targets
-    targets = create_target_objects()
+    with profile_phase("setup"):
+        ground = setup_ground()
+        sun = setup_lighting()
+        
+        # Create tank
+        tank_body, tank_turret, tank_barrel, tank_parts = create_tank(location=(0, -10, 0))
+        
+        # Create targets
+        targets = create_target_objects()
     
     # Setup camera
-    camera = setup_camera(tank_body)
+    with profile_phase("camera"):
+        camera = setup_camera(tank_body)
     
     # Animation timing
     # Each missile fires 50 frames apart
@@ -341,7 +357,8 @@ def animate_tank_missile_destruction():
         target.keyframe_insert(data_path="scale", frame=impact_frame + 1)
         
         # Create dust particle system at impact
-        emitter, particle_obj = create_dust_particle_system(target, impact_frame)
+        with profile_phase("particles"):
+            emitter, particle_obj = create_dust_particle_system(target, impact_frame)
         emitters.append(emitter)
         particle_objects.append(particle_obj)
     
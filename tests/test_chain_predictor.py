@@ -0,0 +1,41 @@
+"""Known pass and fail layouts for the analytic chain predictor"""
+
+import os
+import sys
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from chain_predictor import predict_chains
+
+def test_hand_tuned_scene_completes():
+    # The default layout is the scene falling_dominoes_animation.py ships with
+    prediction = predict_chains()
+    assert prediction["completes"].all()
+    assert (prediction["first_failure"] == -1).all()
+
+def test_overlapping_dominoes_fail_at_the_first_domino():
+    # Spacing 0.2 with 0.3 thick dominoes: neighbours interpenetrate
+    prediction = predict_chains({"spacing": np.array([0.2, 0.3])})
+    assert not prediction["completes"].any()
+    assert (prediction["first_failure"] == 0).all()
+    assert (prediction["reached"] == 0).all()
+
+def test_one_overlapping_pair_rejects_the_layout():
+    spacing = np.full((1, 15), 0.65)
+    spacing[0, 7] = 0.25
+    prediction = predict_chains({"spacing": spacing})
+    assert not prediction["completes"][0]
+    assert prediction["first_failure"][0] == 0
+
+def test_gap_wider_than_the_domino_breaks_the_chain():
+    # A 2.0 tall domino cannot reach a neighbour 2.4 away (gap 2.1)
+    prediction = predict_chains({"spacing": np.array([2.4, 3.0])})
+    assert not prediction["completes"].any()
+    assert (prediction["reached"] == 1).all()
+
+def test_timing_grows_with_spacing():
+    prediction = predict_chains({"spacing": np.array([0.5, 0.9, 1.4])})
+    assert prediction["completes"].all()
+    assert np.all(np.diff(prediction["chain_seconds"]) > 0)
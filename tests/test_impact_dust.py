@@ -0,0 +1,46 @@
+"""Impact detection on plain arrays, and the emitter setup inside Blender"""
+
+import math
+import os
+import sys
+
+import numpy as np
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from impact_dust import find_impacts
+
+HALF_EXTENTS = [0.15, 0.4, 1.0]
+
+def _toppling_transforms(fall_frames, frame_count=40):
+    """One domino standing still and one tipping over about its front edge after frame 10"""
+    transforms = np.zeros((frame_count, 2, 10), dtype=np.float32)
+    transforms[..., 3] = 1.0
+    transforms[..., 7:10] = 1.0
+    transforms[:, 1, 0] = 2.0
+    transforms[..., 2] = HALF_EXTENTS[2]
+    angle = np.clip((np.arange(frame_count) - 10) / fall_frames, 0.0, 1.0) * math.pi / 2
+    # Rotation about +Y tips the top towards +X; the pivot is the bottom front edge
+    transforms[:, 0, 3] = np.cos(angle / 2)
+    transforms[:, 0, 5] = np.sin(angle / 2)
+    transforms[:, 0, 0] = HALF_EXTENTS[0] + HALF_EXTENTS[2] * np.sin(angle) - HALF_EXTENTS[0] * np.cos(angle)
+    transforms[:, 0, 2] = HALF_EXTENTS[2] * np.cos(angle) + HALF_EXTENTS[0] * np.sin(angle)
+    return transforms
+
+def test_finds_only_the_domino_that_lands():
+    frames, positions = find_impacts(_toppling_transforms(10), [HALF_EXTENTS, HALF_EXTENTS])
+    assert frames[1] == -1
+    assert 15 <= frames[0] <= 20
+    assert positions[0, 0] > 1.5 and positions[0, 2] == 0.0
+
+def test_add_impact_dust_builds_one_emitter():
+    bpy = pytest.importorskip("bpy")
+    import falling_dominoes_animation
+
+    falling_dominoes_animation.animate_falling_dominoes(num_dominoes=5, frame_end=80, impact_dust=True)
+    emitter = bpy.data.objects.get("ImpactDust")
+    assert emitter is not None
+    assert not emitter.show_instancer_for_render
+    assert len(emitter.particle_systems) == 1
+    assert emitter.data.materials[0].name == "DustMaterial"
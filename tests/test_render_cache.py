@@ -0,0 +1,76 @@
+"""Frame keys of the render cache must follow what is drawn, and only that"""
+
+import os
+import sys
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from render_cache import PARS_ALIVE, PARS_DEAD, PARS_DYING, PARS_UNBORN, particle_state_bytes, state_digest
+
+NAMES = repr(["Camera", "Domino_00", "ImpactDust"]).encode()
+CAMERA = b"'Camera'{'lens': 50.0}"
+
+def _particles():
+    locations = np.arange(12, dtype=np.float32).reshape(4, 3)
+    sizes = np.full(4, 0.1, dtype=np.float32)
+    alive = np.array([PARS_ALIVE, PARS_DYING, PARS_DEAD, PARS_UNBORN], dtype=np.int32)
+    return locations, sizes, alive
+
+def _key(locations, sizes, alive, hidden=(False, False, False), **particle_options):
+    matrices = np.tile(np.eye(4), (3, 1, 1))
+    chunks = particle_state_bytes(locations, sizes, alive, **particle_options)
+    return state_digest(NAMES, hidden, matrices, CAMERA, [0.0, 1.5], chunks)
+
+def test_moving_live_particle_changes_key():
+    locations, sizes, alive = _particles()
+    moved = locations.copy()
+    moved[0, 2] += 0.25
+    assert _key(moved, sizes, alive) != _key(locations, sizes, alive)
+
+def test_dying_particle_still_counts():
+    locations, sizes, alive = _particles()
+    moved = locations.copy()
+    moved[1, 0] += 0.25
+    assert _key(moved, sizes, alive) != _key(locations, sizes, alive)
+
+def test_moving_dead_or_unborn_particle_keeps_key():
+    locations, sizes, alive = _particles()
+    moved = locations.copy()
+    moved[2] += 5.0
+    moved[3] -= 5.0
+    resized = sizes.copy()
+    resized[2:] = 3.0
+    assert _key(moved, resized, alive) == _key(locations, sizes, alive)
+
+def test_shown_dead_and_unborn_particles_count():
+    locations, sizes, alive = _particles()
+    moved = locations.copy()
+    moved[2] += 5.0
+    assert _key(moved, sizes, alive, show_dead=True) != _key(locations, sizes, alive, show_dead=True)
+    moved = locations.copy()
+    moved[3] += 5.0
+    assert _key(moved, sizes, alive, show_unborn=True) != _key(locations, sizes, alive, show_unborn=True)
+
+def test_particle_dying_changes_key():
+    locations, sizes, alive = _particles()
+    died = alive.copy()
+    died[0] = PARS_DEAD
+    assert _key(locations, sizes, died) != _key(locations, sizes, alive)
+
+def test_identical_state_gives_identical_key():
+    locations, sizes, alive = _particles()
+    assert _key(locations, sizes, alive) == _key(locations.copy(), sizes.copy(), alive.copy())
+
+def test_hidden_object_position_does_not_matter():
+    locations, sizes, alive = _particles()
+    hidden = (False, True, False)
+    matrices = np.tile(np.eye(4), (3, 1, 1))
+    moved = matrices.copy()
+    moved[1, 0, 3] = 10.0
+    chunks = particle_state_bytes(locations, sizes, alive)
+    assert (state_digest(NAMES, hidden, matrices, CAMERA, [], chunks)
+            == state_digest(NAMES, hidden, moved, CAMERA, [], chunks))
+    assert (state_digest(NAMES, (False,) * 3, matrices, CAMERA, [], chunks)
+            != state_digest(NAMES, (False,) * 3, moved, CAMERA, [], chunks))
@@ -0,0 +1,213 @@
+"""
+Blender Python Animation: Persistent Worker
+Long-lived headless Blender that runs scenario jobs sent over a local Unix socket
+
+Blender starts once and imports the animation scripts once; every job then only pays for
+resetting to an empty scene and building it. Requests and responses are JSON lines:
+
+    {"id": "job-1", "scenario": "dominoes", "params": {"num_dominoes": 30},
+     "save": "out/dominoes.blend", "transforms": "out/dominoes.npy", "frames": "out/frames"}
+    -> {"id": "job-1", "ok": true, "artifacts": {...}, "timings": {...}}
+
+Other commands: {"command": "ping"} and {"command": "shutdown"}.
+
+Start the worker:
+    blender -b --factory-startup --python worker_server.py -- --socket /tmp/blender_worker.sock
+
+Send a job from plain Python (no Blender needed):
+    python worker_server.py --socket /tmp/blender_worker.sock dominoes --params '{"spacing": 0.7}'
+"""
+
+import json
+import os
+import socket
+import time
+import traceback
+
+try:
+    import bpy
+except ImportError:  # Client side runs outside Blender
+    bpy = None
+
+DEFAULT_SOCKET = "/tmp/blender_worker.sock"
+
+def reset_scene():
+    """Start the next job from an empty scene with nothing left over from the previous one"""
+    bpy.ops.wm.read_homefile(use_empty=True)
+
+def run_job(request):
+    """Build one scenario in a fresh scene and write the requested artifacts"""
+    import scenarios
+    from pipeline_profiler import profile_pipeline
+
+    timings = {}
+    artifacts = {}
+    started = time.perf_counter()
+
+    reset_scene()
+    timings["reset"] = time.perf_counter() - started
+
+    animate = scenarios.load_scenario(request["scenario"])
+    profiler = profile_pipeline(animate, **request.get("params", {}))
+    timings["build"] = profiler.root()["wall"]
+    timings["phases"] = {name: round(entry["wall"], 4) for name, entry in profiler.phase_totals().items()}
+
+    if request.get("transforms"):
+        from baked_transforms import export_baked_transforms
+        step = time.perf_counter()
+        artifacts["transforms"] = export_baked_transforms(request["transforms"])
+        timings["transforms"] = time.perf_counter() - step
+
+    if request.get("frames"):
+        from sequence_render import render_sequence
+        step = time.perf_counter()
+        result = render_sequence(request["frames"], video_path=request.get("video"),
+                                 frame_start=request.get("frame_start"), frame_end=request.get("frame_end"))
+        artifacts["frames"] = result["output_dir"]
+        if result["video"]:
+            artifacts["video"] = result["video"]
+        timings["render"] = time.perf_counter() - step
+
+    if request.get("save"):
+        step = time.perf_counter()
+        path = os.path.abspath(request["save"])
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        bpy.ops.wm.save_as_mainfile(filepath=path)
+        artifacts["blend"] = path
+        timings["save"] = time.perf_counter() - step
+
+    timings["total"] = time.perf_counter() - started
+    return artifacts, {key: (round(value, 4) if isinstance(value, float) else value) for key, value in timings.items()}
+
+class WorkerServer:
+    """Serves jobs one at a time on a Unix socket (bpy must stay on the main thread)"""
+
+    def __init__(self, socket_path=DEFAULT_SOCKET):
+        self.socket_path = socket_path
+        self.started = time.perf_counter()
+        self.jobs = 0
+        self.running = False
+
+    def warm_up(self):
+        """Import every animation script once so jobs never pay for it"""
+        import scenarios
+        for name in scenarios.SCENARIOS:
+            scenarios.load_scenario(name)
+
+    def handle(self, request):
+        """Response dict for one request"""
+        command = request.get("command", "run")
+        if command == "ping":
+            return {"ok": True, "pid": os.getpid(), "jobs": self.jobs,
+                    "uptime": round(time.perf_counter() - self.started, 1)}
+        if command == "shutdown":
+            self.running = False
+            return {"ok": True}
+        if command != "run":
+            return {"ok": False, "error": f"Unknown command '{command}'"}
+
+        self.jobs += 1
+        try:
+            artifacts, timings = run_job(request)
+            return {"ok": True, "artifacts": artifacts, "timings": timings}
+        except Exception:
+            return {"ok": False, "error": traceback.format_exc()}
+
+    def serve_connection(self, connection):
+        """Answer every request line on one client connection"""
+        with connection, connection.makefile("rwb") as stream:
+            for line in stream:
+                if not line.strip():
+                    continue
+                try:
+                    request = json.loads(line)
+                except ValueError as error:
+                    response = {"ok": False, "error": f"Invalid JSON: {error}"}
+                else:
+                    response = self.handle(request)
+                    response["id"] = request.get("id")
+                stream.write((json.dumps(response) + "\n").encode())
+                stream.flush()
+                if not self.running:
+                    break
+
+    def serve(self):
+        """Accept clients until a shutdown request arrives"""
+        if os.path.exists(self.socket_path):
+            os.remove(self.socket_path)  # Left over from a worker that did not exit cleanly
+        self.warm_up()
+        server = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        server.bind(self.socket_path)
+        server.listen()
+        self.running = True
+        print(f"Worker ready on {self.socket_path} (startup {time.perf_counter() - self.started:.2f}s)")
+        try:
+            while self.running:
+                connection, _ = server.accept()
+                try:
+                    self.serve_connection(connection)
+                except (BrokenPipeError, ConnectionResetError):
+                    print("Worker: client disconnected mid-request")
+        finally:
+            server.close()
+            if os.path.exists(self.socket_path):
+                os.remove(self.socket_path)
+        print(f"Worker stopped after {self.jobs} jobs")
+
+def send_request(request, socket_path=DEFAULT_SOCKET, timeout=None):
+    """Send one request to a running worker and wait for its response"""
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as client:
+        client.settimeout(timeout)
+        client.connect(socket_path)
+        with client.makefile("rwb") as stream:
+            stream.write((json.dumps(request) + "\n").encode())
+            stream.flush()
+            line = stream.readline()
+    if not line:
+        raise ConnectionError(f"Worker on {socket_path} closed the connection without answering")
+    return json.loads(line)
+
+def submit_job(scenario, params=None, socket_path=DEFAULT_SOCKET, timeout=None, **outputs):
+    """Run a scenario on the worker; outputs: save, transforms, frames, video, frame_start, frame_end"""
+    request = {"id": f"{os.getpid()}-{time.time():.6f}", "scenario": scenario, "params": params or {}}
+    request.update({key: value for key, value in outputs.items() if value is not None})
+    return send_request(request, socket_path, timeout)
+
+def main(argv=None):
+    """Command line entry: serve inside Blender, submit a job outside it"""
+    import argparse
+    import sys
+
+    if argv is None:
+        argv = sys.argv[sys.argv.index("--") + 1:] if "--" in sys.argv else sys.argv[1:]
+    parser = argparse.ArgumentParser(description="Persistent Blender worker for scenario jobs")
+    parser.add_argument("--socket", default=DEFAULT_SOCKET)
+
+    if bpy is not None:
+        args = parser.parse_args(argv)
+        WorkerServer(args.socket).serve()
+        return None
+
+    parser.add_argument("scenario", nargs="?", default=None, help="Scenario to run (omit to ping)")
+    parser.add_argument("--params", default="{}", help="Scenario parameters as JSON")
+    parser.add_argument("--save", default=None, help="Save the built .blend")
+    parser.add_argument("--transforms", default=None, help="Export baked transforms (.npy)")
+    parser.add_argument("--frames", default=None, help="Render a frame sequence into this directory")
+    parser.add_argument("--video", default=None, help="Encode the frames to this .mp4")
+    parser.add_argument("--shutdown", action="store_true", help="Stop the worker")
+    args = parser.parse_args(argv)
+
+    if args.shutdown:
+        response = send_request({"command": "shutdown"}, args.socket)
+    elif args.scenario is None:
+        response = send_request({"command": "ping"}, args.socket)
+    else:
+        response = submit_job(args.scenario, json.loads(args.params), args.socket, save=args.save,
+                              transforms=args.transforms, frames=args.frames, video=args.video)
+    print(json.dumps(response, indent=2))
+    return response
+
+if __name__ == "__main__":
+    import sys
+    sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+    main()